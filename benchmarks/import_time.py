@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measures the cold-start latency of importing apodora.
+
+Each scenario is timed in a fresh interpreter so that no module is already
+cached in sys.modules. The "eager" scenario additionally imports the
+dependencies that apodora used to load at import time (typed_ast, loguru
+and graphviz), and thus serves as a baseline for the lazy scenarios.
+
+Usage: python benchmarks/import_time.py [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+SCENARIOS = (
+    ('lazy', 'import apodora'),
+    ('lazy + py3 (stdlib ast)',
+     "import apodora; "
+     "p = apodora.Program.from_sources('3.6', {'__main__': 'import os'}, stdlib_ast=True); "
+     "p.modules['__main__'].imports"),
+    ('lazy + py3 (typed_ast)',
+     "import apodora; "
+     "p = apodora.Program.from_sources('3.6', {'__main__': 'import os'}); "
+     "p.modules['__main__'].imports"),
+    ('eager (baseline)',
+     'import apodora, typed_ast.ast27, typed_ast.ast3, loguru, graphviz'),
+)
+
+HEAVY_MODULES = ('typed_ast.ast27', 'typed_ast.ast3', 'loguru', 'graphviz')
+
+
+def _time_once(statement: str) -> float:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (SRC_DIR, env.get('PYTHONPATH'))))
+    env['LOGURU_LEVEL'] = 'WARNING'
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def _loaded_heavy_modules(statement: str) -> str:
+    check = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (SRC_DIR, env.get('PYTHONPATH'))))
+    env['LOGURU_LEVEL'] = 'WARNING'
+    output = subprocess.run([sys.executable, '-c', check], env=env, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return output.strip() or '-'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='number of fresh interpreters to time per scenario')
+    args = parser.parse_args()
+
+    interpreter = statistics.median(_time_once('pass') for _ in range(args.repeat))
+    print(f"interpreter start-up: {interpreter * 1000:.1f} ms (subtracted below)")
+    print(f"{'scenario':<28} {'median (ms)':>12} {'min (ms)':>10}  heavy modules loaded")
+    for name, statement in SCENARIOS:
+        timings = [_time_once(statement) - interpreter for _ in range(args.repeat)]
+        median = statistics.median(timings) * 1000
+        fastest = min(timings) * 1000
+        loaded = _loaded_heavy_modules(statement)
+        print(f"{name:<28} {median:>12.1f} {fastest:>10.1f}  {loaded}")
+
+
+if __name__ == '__main__':
+    main()
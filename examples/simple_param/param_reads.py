@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Finds the ROS parameters that are read, directly or transitively, by each
+function in a program, using a summary-based interprocedural analysis.
+Summaries are cached in a file within the user's cache directory, or at a
+given path, such that repeated runs only re-analyse functions whose code
+or callees have changed.
+
+Usage: param_reads.py [FILENAME [CACHE]]
+"""
+from typing import Any, FrozenSet, Optional, Sequence, Tuple
+import os
+import sys
+
+import apodora
+from apodora.analysis import CallSite, Summaries, SummaryAnalysis, SummaryCache
+
+PARAMETER_READERS = frozenset({'rospy.get_param', 'rospy.search_param'})
+
+
+def _string_literal(node: Any) -> Optional[str]:
+    """Returns the value of a string literal, as parsed by either typed_ast
+    or the stdlib parser, or None if the node is not a string literal."""
+    kind = node.__class__.__name__
+    if kind == 'Str':
+        return node.s
+    if kind == 'Constant' and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _default_cache() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'apodora', 'param_reads.cache')
+
+
+class ParamReads(SummaryAnalysis[FrozenSet[str]]):
+    """Summarises each function by the names of the parameters that it may
+    read, where parameters with computed names are reported as :code:`?`."""
+    name = 'param-reads/1'
+
+    def initial(self, method: apodora.models.Method) -> FrozenSet[str]:
+        return frozenset()
+
+    def summarise(self,
+                  method: apodora.models.Method,
+                  calls: Sequence[Tuple[CallSite, Optional[FrozenSet[str]]]]
+                  ) -> FrozenSet[str]:
+        reads = set()
+        for call, callee_reads in calls:
+            if callee_reads is not None:
+                reads |= callee_reads
+            elif call.name in PARAMETER_READERS and call.node.args:
+                reads.add(_string_literal(call.node.args[0]) or '?')
+        return frozenset(reads)
+
+
+def main() -> None:
+    directory = os.path.dirname(os.path.abspath(__file__))
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'simple_param.py'
+    cache_filename = sys.argv[2] if len(sys.argv) > 2 else _default_cache()
+    with open(os.path.join(directory, filename), 'r') as f:
+        contents = f.read()
+    program = apodora.Program.from_sources('3.6', {'__main__': contents})
+
+    os.makedirs(os.path.dirname(os.path.abspath(cache_filename)), exist_ok=True)
+    cache = SummaryCache.load(cache_filename)
+    summaries = Summaries.compute(program, ParamReads(), cache=cache)
+    cache.retain(summaries.keys)
+    cache.save()
+
+    print(f'summarised {summaries.computed} functions '
+          f'(reused {summaries.reused})')
+    for method, reads in summaries.items():
+        print(f'{method.qual_name}: {", ".join(sorted(reads)) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
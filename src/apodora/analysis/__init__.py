@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from .calls import CallGraph, CallSite
+from .changes import ProgramDiff
+from .clones import CloneIndex
+from .dominators import DominatorTree
+from .graph import IndexedGraph
+from .loops import LoopForest
+from .metrics import METRICS, MetricsTable
+from .reachability import ReachabilityIndex
+from .ssa import SSAForm, build_ssa
+from .summaries import Summaries, SummaryAnalysis, SummaryCache
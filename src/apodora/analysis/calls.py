@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+__all__ = ('CallGraph', 'CallSite')
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import typing
+
+import attr
+
+from ..helpers import ResolvedImport
+from ..models import Method
+
+if typing.TYPE_CHECKING:
+    from ..helpers import ModuleIndex
+    from ..models import Module, Program
+
+_NESTED_SCOPES = frozenset({'FunctionDef', 'AsyncFunctionDef', 'ClassDef',
+                            'Lambda'})
+_SELF_NAMES = frozenset({'self', 'cls'})
+
+
+def _dotted_name(node: Any) -> Optional[List[str]]:
+    """Returns the components of a dotted name expression (e.g.,
+    :code:`os.path.join`), or :code:`None` if the expression is not a
+    dotted name."""
+    parts: List[str] = []
+    while node.__class__.__name__ == 'Attribute':
+        parts.append(node.attr)
+        node = node.value
+    if node.__class__.__name__ != 'Name':
+        return None
+    parts.append(node.id)
+    parts.reverse()
+    return parts
+
+
+def _calls_within(function: Any) -> List[Any]:
+    """Returns the call expressions within the body of a function,
+    excluding those within nested functions, classes and lambdas."""
+    calls: List[Any] = []
+    stack = list(function.body)
+    while stack:
+        node = stack.pop()
+        kind = node.__class__.__name__
+        if kind == 'Call':
+            calls.append(node)
+        elif kind in _NESTED_SCOPES:
+            # decorators and defaults are evaluated in the enclosing scope
+            stack += getattr(node, 'decorator_list', ())
+            args = getattr(node, 'args', None)
+            stack += getattr(args, 'defaults', ())
+            continue
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                stack += (v for v in value if hasattr(v, '_fields'))
+            elif hasattr(value, '_fields'):
+                stack.append(value)
+    calls.reverse()
+    return calls
+
+
+@attr.s(slots=True, frozen=True, eq=False)
+class CallSite:
+    """Describes a call expression within a method.
+
+    Attributes
+    ----------
+    caller: Method
+        The method that contains the call.
+    node: Any
+        The call expression.
+    callee: Optional[Method]
+        The method within the program that is called, if it could be
+        determined.
+    name: Optional[str]
+        The absolute dotted name of the called object, if it could be
+        determined (e.g., :code:`rospy.get_param`). Bare names that are not
+        bound within the module are assumed to refer to builtins.
+    """
+    caller: Method = attr.ib(repr=False)
+    node: Any = attr.ib(repr=False)
+    callee: Optional[Method] = attr.ib()
+    name: Optional[str] = attr.ib()
+
+    @property
+    def is_external(self) -> bool:
+        """True if the call refers to an object outside of the program."""
+        return self.callee is None
+
+
+@attr.s(slots=True)
+class _CallResolver:
+    """Resolves the targets of the calls within the methods of a single
+    module."""
+    module: 'Module' = attr.ib()
+    index: 'ModuleIndex' = attr.ib()
+    bindings: Mapping[str, ResolvedImport] = attr.ib()
+
+    def _site(self, caller: Method, node: Any, callee: Method) -> CallSite:
+        name = f'{callee.module.name}.{callee.qual_name}'
+        return CallSite(caller, node, callee, name)
+
+    def _method(self, module: 'Module', qual_name: str) -> Optional[Method]:
+        """Finds the method with a given qualified name within a module,
+        treating the instantiation of a class as a call to its constructor."""
+        methods = module.methods
+        method = methods.get(qual_name)
+        if method is None:
+            method = methods.get(f'{qual_name}.__init__')
+        return method
+
+    def _resolve_absolute(self, name: str) -> Optional[Method]:
+        module, length = self.index.find_longest_prefix(name)
+        if module is None:
+            return None
+        qual_name = '.'.join(name.split('.')[length:])
+        return self._method(module, qual_name) if qual_name else None
+
+    def resolve(self, caller: Method, node: Any) -> CallSite:
+        parts = _dotted_name(node.func)
+        if parts is None:
+            return CallSite(caller, node, None, None)
+        head, rest = parts[0], parts[1:]
+
+        # calls to functions in an enclosing scope
+        if not rest:
+            scope = caller.qual_name
+            while True:
+                callee = self._method(self.module, f'{scope}.<locals>.{head}')
+                if callee is not None:
+                    return self._site(caller, node, callee)
+                if '.<locals>.' not in scope:
+                    break
+                scope = scope.rsplit('.<locals>.', 1)[0]
+
+        # calls to methods of the enclosing class
+        if head in _SELF_NAMES and len(rest) == 1:
+            cls = caller.qual_name.rpartition('.')[0]
+            if cls and not cls.endswith('<locals>'):
+                callee = self._method(self.module, f'{cls}.{rest[0]}')
+                if callee is not None:
+                    return self._site(caller, node, callee)
+
+        # calls to functions and classes defined at the top of the module
+        if self._method(self.module, head) is not None:
+            qual_name = '.'.join(parts)
+            callee = self._method(self.module, qual_name)
+            if callee is not None:
+                return self._site(caller, node, callee)
+            return CallSite(caller, node, None, f'{self.module.name}.{qual_name}')
+
+        # calls to imported objects
+        resolved = self.bindings.get(head)
+        if resolved is None:
+            name = head if not rest else None
+            return CallSite(caller, node, None, name)
+        statement = resolved.statement
+        if statement.name is None and statement.asname is None:
+            # a plain import binds the top-level package
+            prefix = statement.bound_name
+        else:
+            prefix = resolved.name
+        name = '.'.join([prefix] + rest)
+        return CallSite(caller, node, self._resolve_absolute(name), name)
+
+
+@attr.s(slots=True, frozen=True)
+class CallGraph:
+    """Describes the calls between the methods of a program.
+
+    Calls are resolved statically using the imports of each module. A call
+    is resolved to a method within the program if it refers, by a (dotted)
+    name, to a function in an enclosing scope, a method of the enclosing
+    class via :code:`self` or :code:`cls`, a function or class in the same
+    module, or an imported function or class. Calls to classes are treated
+    as calls to their constructors. Calls that cannot be resolved (e.g.,
+    calls to methods of arbitrary objects) have no callee.
+
+    Attributes
+    ----------
+    methods: Sequence[Method]
+        The methods of the program, numbered from zero.
+    index: Mapping[Method, int]
+        The number of each method.
+    calls: Sequence[Sequence[CallSite]]
+        The calls made by each method, in order.
+    successors: Sequence[Sequence[int]]
+        The methods called by each method, without duplicates.
+    """
+    methods: Sequence[Method] = attr.ib(repr=False)
+    index: Mapping[Method, int] = attr.ib(repr=False)
+    calls: Sequence[Sequence[CallSite]] = attr.ib(repr=False)
+    successors: Sequence[Sequence[int]] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls, program: 'Program') -> 'CallGraph':
+        """Builds the call graph for a given program."""
+        resolver = program.resolver
+        methods: List[Method] = []
+        calls: List[Tuple[CallSite, ...]] = []
+        for module in program.modules.values():
+            call_resolver = _CallResolver(module,
+                                          resolver.index,
+                                          resolver.bindings(module))
+            for method in module.methods.values():
+                methods.append(method)
+                calls.append(tuple(call_resolver.resolve(method, node)
+                                   for node in _calls_within(method.ast)))
+
+        index: Dict[Method, int] = {m: n for n, m in enumerate(methods)}
+        successors: List[List[int]] = []
+        for method_calls in calls:
+            callees = {index[c.callee]: None for c in method_calls
+                       if c.callee is not None}
+            successors.append(list(callees))
+        return CallGraph(methods, index, calls, successors)
+
+    def __len__(self) -> int:
+        return len(self.methods)
+
+    def calls_from(self, method: Method) -> Sequence[CallSite]:
+        """Returns the calls made by a given method, in order."""
+        return self.calls[self.index[method]]
+
+    def callees(self, method: Method) -> Sequence[Method]:
+        """Returns the methods that are called by a given method."""
+        return [self.methods[n] for n in self.successors[self.index[method]]]
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+__all__ = ('ProgramDiff',)
+
+from typing import AbstractSet, Iterable, List, Optional, Tuple
+import typing
+
+import attr
+
+if typing.TYPE_CHECKING:
+    from ..models import Program
+
+MethodKey = Tuple[str, str]
+
+
+@attr.s(slots=True, frozen=True)
+class ProgramDiff:
+    """Describes the structural differences between two versions of a
+    program.
+
+    Modules are matched by name, and methods by the name of their module
+    and their qualified name. Modules whose source is unchanged are skipped
+    without being parsed, and modules whose source differs only in its
+    formatting or comments are reported as reformatted rather than changed.
+    Only the methods of added, removed and changed modules are inspected.
+
+    By default, the source of every module is compared, which is cheap but
+    takes time proportional to the size of the program. If the names of the
+    modules that may have changed are known (e.g., from a file watcher),
+    only those modules are compared, and the cost of computing a diff is
+    then proportional to the size of the modules that changed.
+
+    Attributes
+    ----------
+    old: Program
+        The earlier version of the program.
+    new: Program
+        The later version of the program.
+    added_modules: AbstractSet[str]
+        The names of the modules that only belong to the later version.
+    removed_modules: AbstractSet[str]
+        The names of the modules that only belong to the earlier version.
+    changed_modules: AbstractSet[str]
+        The names of the modules whose structure has changed.
+    reformatted_modules: AbstractSet[str]
+        The names of the modules whose source has changed, but whose
+        structure has not.
+    added_methods: AbstractSet[Tuple[str, str]]
+        The module and qualified name of each method that only belongs to
+        the later version.
+    removed_methods: AbstractSet[Tuple[str, str]]
+        The module and qualified name of each method that only belongs to
+        the earlier version.
+    changed_methods: AbstractSet[Tuple[str, str]]
+        The module and qualified name of each method whose structure has
+        changed.
+    """
+    old: 'Program' = attr.ib(repr=False)
+    new: 'Program' = attr.ib(repr=False)
+    added_modules: AbstractSet[str] = attr.ib()
+    removed_modules: AbstractSet[str] = attr.ib()
+    changed_modules: AbstractSet[str] = attr.ib()
+    reformatted_modules: AbstractSet[str] = attr.ib()
+    added_methods: AbstractSet[MethodKey] = attr.ib()
+    removed_methods: AbstractSet[MethodKey] = attr.ib()
+    changed_methods: AbstractSet[MethodKey] = attr.ib()
+
+    @classmethod
+    def compute(cls,
+                old: 'Program',
+                new: 'Program',
+                *,
+                modules: Optional[Iterable[str]] = None
+                ) -> 'ProgramDiff':
+        """Computes the differences between two versions of a program.
+
+        Parameters
+        ----------
+        modules: Optional[Iterable[str]]
+            The names of the modules that may have been added, removed or
+            modified. All other modules are assumed to be unchanged. By
+            default, every module is compared.
+
+        Raises
+        ------
+        ValueError
+            If the two versions were parsed by different parsers, as their
+            structures cannot then be compared (see :attr:`Program.parser`).
+        """
+        if old.parser != new.parser:
+            m = f"cannot compare programs parsed by {old.parser} and {new.parser}"
+            raise ValueError(m)
+        added_modules: List[str] = []
+        changed_modules: List[str] = []
+        reformatted_modules: List[str] = []
+        added_methods: List[MethodKey] = []
+        removed_methods: List[MethodKey] = []
+        changed_methods: List[MethodKey] = []
+
+        old_modules = old.modules
+        new_modules = new.modules
+        if modules is None:
+            candidates: Iterable[str] = new_modules
+            removed_modules = [n for n in old_modules if n not in new_modules]
+        else:
+            names = frozenset(modules)
+            candidates = [n for n in names if n in new_modules]
+            removed_modules = [n for n in names
+                               if n in old_modules and n not in new_modules]
+
+        for name in candidates:
+            module = new_modules[name]
+            previous = old_modules.get(name)
+            if previous is None:
+                added_modules.append(name)
+                added_methods += ((name, q) for q in module.methods)
+                continue
+            if previous.source == module.source:
+                continue
+            if previous.fingerprint == module.fingerprint:
+                reformatted_modules.append(name)
+                continue
+
+            changed_modules.append(name)
+            old_methods = previous.methods
+            new_methods = module.methods
+            for qual_name, method in new_methods.items():
+                old_method = old_methods.get(qual_name)
+                if old_method is None:
+                    added_methods.append((name, qual_name))
+                elif old_method.fingerprint != method.fingerprint:
+                    changed_methods.append((name, qual_name))
+            removed_methods += ((name, q) for q in old_methods
+                                if q not in new_methods)
+
+        for name in removed_modules:
+            removed_methods += ((name, q) for q in old_modules[name].methods)
+
+        return ProgramDiff(old=old,
+                           new=new,
+                           added_modules=frozenset(added_modules),
+                           removed_modules=frozenset(removed_modules),
+                           changed_modules=frozenset(changed_modules),
+                           reformatted_modules=frozenset(reformatted_modules),
+                           added_methods=frozenset(added_methods),
+                           removed_methods=frozenset(removed_methods),
+                           changed_methods=frozenset(changed_methods))
+
+    def __bool__(self) -> bool:
+        """Determines whether the structure of the program has changed."""
+        modules = (self.added_modules, self.removed_modules,
+                   self.changed_modules)
+        return any(modules)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+__all__ = ('CloneIndex', 'MIN_CLONE_SIZE')
+
+from typing import (AbstractSet, Dict, FrozenSet, Iterator, List, Optional,
+                    Set, Tuple)
+import typing
+
+import attr
+
+from .changes import MethodKey, ProgramDiff
+from ..models import Method, Module
+
+if typing.TYPE_CHECKING:
+    from ..models import Program
+
+#: the minimum number of syntax nodes in a method that is indexed
+MIN_CLONE_SIZE = 16
+
+
+@attr.s(slots=True)
+class CloneIndex:
+    """Groups the methods of a program by their structural fingerprint,
+    such that the methods within a group are duplicates of one another
+    (i.e., they differ in at most their names, formatting, comments and
+    locations).
+
+    The index is maintained one module at a time, so that it can be kept
+    up to date with a changing program by updating only those modules that
+    changed (see :meth:`update`). Methods are indexed by the name of their
+    module and their qualified name, and are looked up within the latest
+    version of the program when queried, such that modules that are
+    unchanged by an update need not be visited.
+
+    Attributes
+    ----------
+    min_size: int
+        Methods with fewer syntax nodes than this are not indexed, since
+        small methods are frequently identical without being copies.
+    parser: Optional[str]
+        The parser used by the indexed modules, whose fingerprints are not
+        comparable with those of other parsers.
+    """
+    min_size: int = attr.ib(default=MIN_CLONE_SIZE)
+    parser: Optional[str] = attr.ib(default=None, init=False)
+    _groups: Dict[bytes, Set[MethodKey]] = attr.ib(factory=dict, repr=False)
+    # the program within which indexed methods are looked up, and modules
+    # that were added directly, which need not belong to that program
+    _program: Optional['Program'] = attr.ib(default=None, init=False, repr=False)
+    _modules: Dict[str, Module] = attr.ib(factory=dict, repr=False)
+    # the qualified name and digest of each indexed method of each module
+    _module_methods: Dict[str, List[Tuple[str, bytes]]] = \
+        attr.ib(factory=dict, repr=False)
+    # the digests of groups that contain at least two methods
+    _duplicated: Set[bytes] = attr.ib(factory=set, repr=False)
+    _size: int = attr.ib(default=0, init=False, repr=False)
+
+    @classmethod
+    def for_program(cls,
+                    program: 'Program',
+                    min_size: int = MIN_CLONE_SIZE
+                    ) -> 'CloneIndex':
+        """Builds an index of the methods within a given program."""
+        index = cls(min_size)
+        for module in program.modules.values():
+            index._index(module)
+        index._program = program
+        return index
+
+    def add_module(self, module: Module) -> None:
+        """Adds the methods of a given module to this index, replacing
+        those of any module with the same name.
+
+        Raises
+        ------
+        ValueError
+            If the module was parsed by a different parser to the modules
+            that are already indexed.
+        """
+        self._index(module)
+        self._modules[module.name] = module
+
+    def _index(self, module: Module) -> None:
+        parser = module.program.parser
+        if self.parser is None:
+            self.parser = parser
+        elif parser != self.parser:
+            m = f"cannot index module parsed by {parser} alongside modules parsed by {self.parser}"
+            raise ValueError(m)
+
+        self.remove_module(module.name)
+        indexed: List[Tuple[str, bytes]] = []
+        for qual_name, method in module.methods.items():
+            fingerprint = method.fingerprint
+            if fingerprint.size < self.min_size:
+                continue
+            group = self._groups.setdefault(fingerprint.digest, set())
+            group.add((module.name, qual_name))
+            if len(group) == 2:
+                self._duplicated.add(fingerprint.digest)
+            indexed.append((qual_name, fingerprint.digest))
+        self._module_methods[module.name] = indexed
+        self._size += len(indexed)
+
+    def remove_module(self, name: str) -> None:
+        """Removes the methods of the module with a given name from this
+        index, if it has been indexed."""
+        self._modules.pop(name, None)
+        indexed = self._module_methods.pop(name, ())
+        self._size -= len(indexed)
+        for qual_name, digest in indexed:
+            group = self._groups[digest]
+            group.discard((name, qual_name))
+            if len(group) < 2:
+                self._duplicated.discard(digest)
+            if not group:
+                del self._groups[digest]
+
+    def update(self, diff: ProgramDiff) -> None:
+        """Updates this index to describe the later version of a program,
+        given its differences from the version that was indexed.
+
+        Only the modules that were added, removed or modified are visited.
+        The methods of unchanged modules are subsequently looked up within
+        the later version of the program.
+        """
+        for name in diff.removed_modules:
+            self.remove_module(name)
+        new_modules = diff.new.modules
+        for names in (diff.added_modules, diff.changed_modules,
+                      diff.reformatted_modules):
+            for name in names:
+                self._index(new_modules[name])
+        # every indexed module now belongs to the later version
+        self._program = diff.new
+        self._modules.clear()
+
+    def __len__(self) -> int:
+        """Returns the number of methods within this index."""
+        return self._size
+
+    def _method(self, key: MethodKey) -> Method:
+        module_name, qual_name = key
+        module = self._modules.get(module_name)
+        if module is None:
+            assert self._program is not None
+            module = self._program.modules[module_name]
+        return module.methods[qual_name]
+
+    def clones_of(self, method: Method) -> AbstractSet[Method]:
+        """Returns the indexed methods that are duplicates of a given
+        method, excluding the method itself (or any earlier or later
+        version of it)."""
+        key = (method.module.name, method.qual_name)
+        group = self._groups.get(method.fingerprint.digest, ())
+        return frozenset(self._method(k) for k in group if k != key)
+
+    def groups(self) -> Iterator[FrozenSet[Method]]:
+        """Iterates over the groups of methods that are duplicates of one
+        another. Only groups with at least two members are reported."""
+        for digest in self._duplicated:
+            yield frozenset(self._method(k) for k in self._groups[digest])
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+__all__ = ('DominatorTree',)
+
+from array import array
+from typing import List, Optional, Sequence
+import typing
+
+import attr
+
+from .graph import IndexedGraph
+from ..models import BasicBlock
+
+if typing.TYPE_CHECKING:
+    from ..models import ControlFlowGraph
+
+
+@attr.s(slots=True, frozen=True)
+class DominatorTree:
+    """Describes the dominator tree of a control-flow graph.
+
+    Immediate dominators are computed using the iterative algorithm of
+    Cooper, Harvey and Kennedy over a reverse postorder of the graph.
+    Blocks that are unreachable from the entry have no dominators.
+
+    Attributes
+    ----------
+    cfg: ControlFlowGraph
+        The graph described by this tree.
+    version: int
+        The version of the graph at which this tree was built.
+    graph: IndexedGraph
+        The indexed view of the graph used to compute this tree.
+    idom: Sequence[int]
+        The index of the immediate dominator of each block, or -1 if the
+        block is unreachable. The entry block is its own immediate dominator.
+    rpo: Sequence[int]
+        The reachable blocks, in reverse postorder.
+    children: Sequence[Sequence[int]]
+        The blocks immediately dominated by each block.
+    """
+    cfg: 'ControlFlowGraph' = attr.ib(repr=False)
+    version: int = attr.ib()
+    graph: IndexedGraph = attr.ib(repr=False)
+    idom: Sequence[int] = attr.ib(repr=False)
+    rpo: Sequence[int] = attr.ib(repr=False)
+    children: Sequence[Sequence[int]] = attr.ib(repr=False)
+    _preorder: Sequence[int] = attr.ib(repr=False)
+    _last_descendant: Sequence[int] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls, cfg: 'ControlFlowGraph') -> 'DominatorTree':
+        graph = IndexedGraph.build(cfg)
+        size = len(graph)
+        entry = graph.entry
+        rpo = graph.reverse_postorder()
+        order = [-1] * size
+        for position, node in enumerate(rpo):
+            order[node] = position
+
+        idom = array('i', [-1] * size)
+        idom[entry] = entry
+        predecessors = graph.predecessors
+        changed = True
+        while changed:
+            changed = False
+            for node in rpo[1:]:
+                new_idom = -1
+                for predecessor in predecessors[node]:
+                    if idom[predecessor] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = predecessor
+                        continue
+                    # walk up the tree from both fingers to their common ancestor
+                    finger = predecessor
+                    while finger != new_idom:
+                        while order[finger] > order[new_idom]:
+                            finger = idom[finger]
+                        while order[new_idom] > order[finger]:
+                            new_idom = idom[new_idom]
+                if idom[node] != new_idom:
+                    idom[node] = new_idom
+                    changed = True
+
+        children: List[List[int]] = [[] for _ in range(size)]
+        for node in rpo[1:]:
+            children[idom[node]].append(node)
+
+        # number the tree in preorder so that dominance becomes an interval test
+        preorder = array('i', [-1] * size)
+        last_descendant = array('i', [-1] * size)
+        counter = 0
+        stack = [(entry, False)]
+        while stack:
+            node, finished = stack.pop()
+            if finished:
+                last_descendant[node] = counter - 1
+                continue
+            preorder[node] = counter
+            counter += 1
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children[node]))
+
+        return DominatorTree(cfg=cfg,
+                             version=cfg.version,
+                             graph=graph,
+                             idom=idom,
+                             rpo=rpo,
+                             children=children,
+                             preorder=preorder,
+                             last_descendant=last_descendant)
+
+    def frontiers(self) -> Sequence[Sequence[int]]:
+        """Computes the dominance frontier of each block (i.e., the blocks
+        at which its dominance ends), using the algorithm of Cooper, Harvey
+        and Kennedy."""
+        idom = self.idom
+        entry = self.graph.entry
+        frontiers: List[List[int]] = [[] for _ in range(len(self.graph))]
+        for node in self.rpo:
+            predecessors = [p for p in self.graph.predecessors[node]
+                            if idom[p] != -1]
+            # the entry also has an implicit predecessor outside of the
+            # graph, and so belongs to the frontiers of its predecessors
+            # (including itself) whenever it has any
+            is_entry = node == entry
+            if len(predecessors) + is_entry < 2:
+                continue
+            stop = -1 if is_entry else idom[node]
+            for predecessor in predecessors:
+                runner = predecessor
+                while runner != stop:
+                    runner_frontier = frontiers[runner]
+                    if not runner_frontier or runner_frontier[-1] != node:
+                        runner_frontier.append(node)
+                    runner = -1 if runner == entry else idom[runner]
+        return frontiers
+
+    def dominates_index(self, dominator: int, node: int) -> bool:
+        """Determines whether one block dominates another, where both are
+        given by their index in :attr:`graph`."""
+        position = self._preorder[node]
+        if position == -1 or self._preorder[dominator] == -1:
+            return False
+        return self._preorder[dominator] <= position <= self._last_descendant[dominator]
+
+    def dominates(self, dominator: BasicBlock, block: BasicBlock) -> bool:
+        """Determines whether every path from the entry to a given block
+        passes through another block. Every reachable block dominates
+        itself."""
+        index = self.graph.index
+        return self.dominates_index(index[dominator], index[block])
+
+    def immediate_dominator(self, block: BasicBlock) -> Optional[BasicBlock]:
+        """Returns the immediate dominator of a given block, or None if the
+        block is the entry or is unreachable."""
+        node = self.graph.index[block]
+        dominator = self.idom[node]
+        if dominator == -1 or node == self.graph.entry:
+            return None
+        return self.graph.blocks[dominator]
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a compact, integer-indexed view of control-flow
+graphs, together with graph algorithms that operate upon that view.
+"""
+__all__ = ('IndexedGraph', 'strongly_connected_components')
+
+from typing import Dict, List, Sequence, Tuple
+import typing
+
+import attr
+
+from ..models import BasicBlock
+
+if typing.TYPE_CHECKING:
+    from ..models import ControlFlowGraph
+
+
+@attr.s(slots=True, frozen=True)
+class IndexedGraph:
+    """Describes a control-flow graph whose blocks are numbered from zero
+    in the order in which they appear in the graph, and whose edges are
+    stored as lists of those numbers.
+
+    Edges to blocks that do not belong to the graph are ignored.
+
+    Attributes
+    ----------
+    blocks: Sequence[BasicBlock]
+        The blocks of the graph, indexed by their number.
+    index: Dict[BasicBlock, int]
+        The number assigned to each block.
+    entry: int
+        The number of the entry block.
+    successors: Sequence[Sequence[int]]
+        The successors of each block.
+    predecessors: Sequence[Sequence[int]]
+        The predecessors of each block.
+    """
+    blocks: Sequence[BasicBlock] = attr.ib()
+    index: Dict[BasicBlock, int] = attr.ib(repr=False)
+    entry: int = attr.ib()
+    successors: Sequence[Sequence[int]] = attr.ib(repr=False)
+    predecessors: Sequence[Sequence[int]] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls, cfg: 'ControlFlowGraph') -> 'IndexedGraph':
+        blocks = tuple(cfg.blocks)
+        index = {block: number for number, block in enumerate(blocks)}
+        successors: List[List[int]] = []
+        predecessors: List[List[int]] = [[] for _ in blocks]
+        for number, block in enumerate(blocks):
+            block_successors = []
+            for successor in block.successors:
+                successor_number = index.get(successor)
+                if successor_number is not None:
+                    block_successors.append(successor_number)
+                    predecessors[successor_number].append(number)
+            successors.append(block_successors)
+        return IndexedGraph(blocks, index, index[cfg.entry],
+                            successors, predecessors)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def reachable_from(self, start: int) -> List[bool]:
+        """Computes which blocks are reachable from a given block."""
+        seen = [False] * len(self.blocks)
+        seen[start] = True
+        stack = [start]
+        successors = self.successors
+        while stack:
+            for successor in successors[stack.pop()]:
+                if not seen[successor]:
+                    seen[successor] = True
+                    stack.append(successor)
+        return seen
+
+    def reverse_postorder(self) -> List[int]:
+        """Returns the blocks that are reachable from the entry in reverse
+        postorder of a depth-first search from the entry."""
+        successors = self.successors
+        seen = [False] * len(self.blocks)
+        seen[self.entry] = True
+        postorder: List[int] = []
+        stack: List[Tuple[int, int]] = [(self.entry, 0)]
+        while stack:
+            node, position = stack[-1]
+            node_successors = successors[node]
+            if position < len(node_successors):
+                stack[-1] = (node, position + 1)
+                successor = node_successors[position]
+                if not seen[successor]:
+                    seen[successor] = True
+                    stack.append((successor, 0))
+            else:
+                stack.pop()
+                postorder.append(node)
+        postorder.reverse()
+        return postorder
+
+
+def strongly_connected_components(successors: Sequence[Sequence[int]]
+                                  ) -> Tuple[List[int], int]:
+    """Computes the strongly connected components of a graph using an
+    iterative version of Tarjan's algorithm.
+
+    Returns
+    -------
+    Tuple[List[int], int]
+        The component to which each node belongs, and the number of
+        components. Components are numbered in reverse topological order
+        (i.e., a component can only reach components with lower numbers).
+    """
+    size = len(successors)
+    unvisited = -1
+    order = [unvisited] * size
+    lowlink = [0] * size
+    on_stack = [False] * size
+    component = [unvisited] * size
+    stack: List[int] = []
+    num_components = 0
+    counter = 0
+
+    for root in range(size):
+        if order[root] != unvisited:
+            continue
+        order[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work: List[Tuple[int, int]] = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            node_successors = successors[node]
+            if position < len(node_successors):
+                work[-1] = (node, position + 1)
+                successor = node_successors[position]
+                if order[successor] == unvisited:
+                    order[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, 0))
+                elif on_stack[successor] and order[successor] < lowlink[node]:
+                    lowlink[node] = order[successor]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = num_components
+                    if member == node:
+                        break
+                num_components += 1
+
+    return component, num_components
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+__all__ = ('LoopForest',)
+
+from array import array
+from typing import FrozenSet, Iterator, List, Optional, Sequence, Tuple
+import typing
+
+import attr
+
+from .dominators import DominatorTree
+from .graph import IndexedGraph
+from ..models import BasicBlock
+
+if typing.TYPE_CHECKING:
+    from ..models import ControlFlowGraph
+
+
+@attr.s(slots=True, frozen=True)
+class LoopForest:
+    """Describes the natural loops of a control-flow graph and how they
+    nest within one another.
+
+    A back edge is an edge whose target (the loop header) dominates its
+    source (the latch). The natural loop of a header contains the header
+    together with every block that can reach one of its latches without
+    passing through the header. Loops that share a header are merged.
+    Cycles that are not natural loops (i.e., irreducible control flow) are
+    not reported.
+
+    Loops are numbered from zero such that inner loops come before the
+    loops that contain them. All per-block and per-loop data is stored in
+    compact integer arrays, where blocks are identified by their index in
+    :attr:`graph`, and -1 denotes the absence of a block or loop.
+
+    Attributes
+    ----------
+    cfg: ControlFlowGraph
+        The graph described by this forest.
+    version: int
+        The version of the graph at which this forest was built.
+    graph: IndexedGraph
+        The indexed view of the graph.
+    back_edges: Sequence[Tuple[int, int]]
+        The (latch, header) pairs of every back edge.
+    block_loop: Sequence[int]
+        The innermost loop that contains each block.
+    block_depth: Sequence[int]
+        The number of loops that contain each block.
+    loop_header: Sequence[int]
+        The header block of each loop.
+    loop_parent: Sequence[int]
+        The innermost loop that encloses each loop.
+    loop_depth: Sequence[int]
+        The nesting depth of each loop, where outermost loops have depth 1.
+    """
+    cfg: 'ControlFlowGraph' = attr.ib(repr=False)
+    version: int = attr.ib()
+    graph: IndexedGraph = attr.ib(repr=False)
+    back_edges: Sequence[Tuple[int, int]] = attr.ib(repr=False)
+    block_loop: Sequence[int] = attr.ib(repr=False)
+    block_depth: Sequence[int] = attr.ib(repr=False)
+    loop_header: Sequence[int] = attr.ib(repr=False)
+    loop_parent: Sequence[int] = attr.ib(repr=False)
+    loop_depth: Sequence[int] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls,
+              cfg: 'ControlFlowGraph',
+              dominators: Optional[DominatorTree] = None
+              ) -> 'LoopForest':
+        """Finds the natural loops of a given control-flow graph.
+
+        The dominator tree of the graph is computed unless one is given.
+        """
+        if dominators is None:
+            dominators = cfg.dominators
+        graph = dominators.graph
+        size = len(graph)
+        rpo = dominators.rpo
+        order = [-1] * size
+        for position, node in enumerate(rpo):
+            order[node] = position
+
+        back_edges: List[Tuple[int, int]] = []
+        latches: List[List[int]] = [[] for _ in range(size)]
+        for node in rpo:
+            for successor in graph.successors[node]:
+                if dominators.dominates_index(successor, node):
+                    back_edges.append((node, successor))
+                    latches[successor].append(node)
+
+        block_loop = array('i', [-1] * size)
+        loop_header = array('i')
+        loop_parent = array('i')
+        # the outermost loop found so far that encloses each loop, with
+        # path compression, as in union-find
+        outermost: List[int] = []
+
+        def find_outermost(loop: int) -> int:
+            root = loop
+            while outermost[root] != root:
+                root = outermost[root]
+            while outermost[loop] != root:
+                outermost[loop], loop = root, outermost[loop]
+            return root
+
+        # inner loops have headers that appear later in reverse postorder
+        # than the headers of the loops that enclose them
+        predecessors = graph.predecessors
+        for header in sorted((n for n in rpo if latches[n]),
+                             key=order.__getitem__, reverse=True):
+            loop = len(loop_header)
+            loop_header.append(header)
+            loop_parent.append(-1)
+            outermost.append(loop)
+            if block_loop[header] == -1:
+                block_loop[header] = loop
+
+            worklist = [latch for latch in latches[header] if latch != header]
+            while worklist:
+                node = worklist.pop()
+                inner = block_loop[node]
+                if inner == -1:
+                    block_loop[node] = loop
+                elif node == header:
+                    continue
+                else:
+                    inner = find_outermost(inner)
+                    if inner == loop:
+                        continue
+                    # absorb the inner loop and continue from its header
+                    loop_parent[inner] = loop
+                    outermost[inner] = loop
+                    node = loop_header[inner]
+                for predecessor in predecessors[node]:
+                    if order[predecessor] != -1 and predecessor != header:
+                        worklist.append(predecessor)
+
+        # enclosing loops are numbered after the loops that they enclose
+        num_loops = len(loop_header)
+        loop_depth = array('i', [0] * num_loops)
+        for loop in range(num_loops - 1, -1, -1):
+            parent = loop_parent[loop]
+            loop_depth[loop] = 1 if parent == -1 else loop_depth[parent] + 1
+
+        block_depth = array('i', [0] * size)
+        for node in range(size):
+            loop = block_loop[node]
+            if loop != -1:
+                block_depth[node] = loop_depth[loop]
+
+        return LoopForest(cfg=cfg,
+                          version=cfg.version,
+                          graph=graph,
+                          back_edges=back_edges,
+                          block_loop=block_loop,
+                          block_depth=block_depth,
+                          loop_header=loop_header,
+                          loop_parent=loop_parent,
+                          loop_depth=loop_depth)
+
+    def __len__(self) -> int:
+        return len(self.loop_header)
+
+    @property
+    def max_depth(self) -> int:
+        """The depth of the most deeply nested loop, or zero if the graph
+        has no loops."""
+        return max(self.loop_depth, default=0)
+
+    def depth(self, block: BasicBlock) -> int:
+        """Returns the number of loops that contain a given block."""
+        return self.block_depth[self.graph.index[block]]
+
+    def innermost_loop(self, block: BasicBlock) -> Optional[int]:
+        """Returns the innermost loop that contains a given block, if any."""
+        loop = self.block_loop[self.graph.index[block]]
+        return None if loop == -1 else loop
+
+    def header(self, loop: int) -> BasicBlock:
+        """Returns the header block of a given loop."""
+        return self.graph.blocks[self.loop_header[loop]]
+
+    def is_header(self, block: BasicBlock) -> bool:
+        """Determines whether a given block is the header of a loop."""
+        loop = self.block_loop[self.graph.index[block]]
+        return loop != -1 and self.graph.blocks[self.loop_header[loop]] == block
+
+    def children(self, loop: int) -> Iterator[int]:
+        """Iterates over the loops immediately nested within a given loop."""
+        return (child for child, parent in enumerate(self.loop_parent)
+                if parent == loop)
+
+    def roots(self) -> Iterator[int]:
+        """Iterates over the outermost loops."""
+        return self.children(-1)
+
+    def body(self, loop: int) -> FrozenSet[BasicBlock]:
+        """Returns the blocks that belong to a given loop, including those
+        that belong to loops nested within it."""
+        loop_parent = self.loop_parent
+        blocks = self.graph.blocks
+        members = []
+        for node, innermost in enumerate(self.block_loop):
+            # enclosing loops have higher numbers than the loops they enclose
+            while innermost != -1 and innermost < loop:
+                innermost = loop_parent[innermost]
+            if innermost == loop:
+                members.append(blocks[node])
+        return frozenset(members)
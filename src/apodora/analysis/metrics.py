@@ -0,0 +1,551 @@
+# -*- coding: utf-8 -*-
+"""
+This module computes a table of size and complexity metrics for every
+method within a program.
+"""
+__all__ = ('METRICS', 'MetricsTable')
+
+from array import array
+from types import ModuleType
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, Optional,
+                    Sequence, Tuple, TypeVar)
+import functools
+import typing
+
+import attr
+
+from ..lazy import logger
+
+if typing.TYPE_CHECKING:
+    import numpy
+    from ..models import ControlFlowGraph, Method, Module, Program
+
+T = TypeVar('T')
+
+#: the metrics that are computed for each method, in column order
+METRICS: Tuple[str, ...] = (
+    'size',
+    'depth',
+    'statements',
+    'calls',
+    'returns',
+    'params',
+    'blocks',
+    'edges',
+    'complexity',
+)
+
+#: the metrics that are computed from the syntax of each method
+_SYNTAX_METRICS = ('size', 'depth', 'statements', 'calls', 'returns',
+                   'params', 'complexity')
+#: the metrics that are computed from the control-flow graph of each method
+_GRAPH_METRICS = ('blocks', 'edges')
+
+_NESTED_SCOPES = frozenset({'FunctionDef', 'AsyncFunctionDef', 'ClassDef'})
+_COMPOUND_STATEMENTS = frozenset({
+    'If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try',
+    'TryExcept', 'TryFinally',
+})
+_STATEMENT_LISTS = frozenset({'body', 'orelse', 'finalbody'})
+#: nodes that each add a single decision point
+_DECISIONS = frozenset({
+    'If', 'IfExp', 'For', 'AsyncFor', 'While', 'ExceptHandler', 'match_case',
+})
+
+
+def _syntax_metrics(function: Any) -> Tuple[int, int, int, int, int, int, int]:
+    """Computes the size, nesting depth, and number of statements, calls
+    and returns for the body of a function, together with its number of
+    parameters and its cyclomatic complexity. Nested functions and classes
+    are counted as single statements.
+
+    The complexity is one more than the number of decision points, which
+    are branches and loops (but not their :code:`else` clauses), exception
+    handlers, conditional expressions, match cases, each additional operand
+    of a boolean operator, and each loop and condition of a comprehension.
+    """
+    size = calls = returns = max_depth = decisions = 0
+    stack: List[Tuple[Any, int]] = [(stmt, 1) for stmt in function.body]
+    statements = len(stack)
+    while stack:
+        node, depth = stack.pop()
+        size += 1
+        kind = node.__class__.__name__
+        if kind == 'Call':
+            calls += 1
+        elif kind == 'Return':
+            returns += 1
+        elif kind in _NESTED_SCOPES:
+            continue
+        elif kind == 'BoolOp':
+            decisions += len(node.values) - 1
+        elif kind == 'comprehension':
+            decisions += 1 + len(node.ifs)
+        if kind in _DECISIONS:
+            decisions += 1
+        if kind in _COMPOUND_STATEMENTS:
+            if depth > max_depth:
+                max_depth = depth
+            depth += 1
+
+        for field in node._fields:
+            value: Any = getattr(node, field, None)
+            if value.__class__ is list:
+                if field in _STATEMENT_LISTS:
+                    statements += len(value)
+                # an elif is nested no deeper than the if that it continues
+                item_depth = depth
+                if kind == 'If' and field == 'orelse' and len(value) == 1 \
+                        and value[0].__class__.__name__ == 'If':
+                    item_depth -= 1
+                # operators (e.g., the ops of a Compare) have no fields and
+                # are not counted as nodes, wherever they appear
+                for item in value:
+                    if getattr(item, '_fields', None):
+                        stack.append((item, item_depth))
+            elif getattr(value, '_fields', None):
+                stack.append((value, depth))
+
+    args = function.args
+    params = len(args.args)
+    params += len(getattr(args, 'posonlyargs', ()))
+    params += len(getattr(args, 'kwonlyargs', ()))
+    params += (args.vararg is not None) + (args.kwarg is not None)
+    complexity = decisions + 1
+    return size, max_depth, statements, calls, returns, params, complexity
+
+
+def _graph_metrics(cfg: 'ControlFlowGraph') -> Tuple[int, int]:
+    """Computes the number of blocks and edges in a control-flow graph."""
+    return len(cfg.blocks), cfg.num_edges
+
+
+def _package_of(module: 'Module') -> str:
+    if module.is_package or '.' not in module.name:
+        return module.name
+    return module.name.rpartition('.')[0]
+
+
+def _percentile(ordered: Sequence[int], q: float) -> float:
+    """Computes the q-th percentile of some sorted values using linear
+    interpolation between the closest ranks."""
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy() -> Optional[ModuleType]:
+    """Returns NumPy, if it is installed, which is used to aggregate
+    columns without looping over rows in Python."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _percentiles(numpy: ModuleType,
+                 ordered: 'numpy.ndarray',
+                 starts: 'numpy.ndarray',
+                 lengths: 'numpy.ndarray',
+                 qs: Sequence[float]
+                 ) -> 'numpy.ndarray':
+    """Computes percentiles for several groups of values at once, in the
+    same way as :func:`_percentile`.
+
+    Parameters
+    ----------
+    ordered: numpy.ndarray
+        The values of all groups, where the values of each group are
+        contiguous and sorted.
+    starts: numpy.ndarray
+        The offset of each group within :code:`ordered`.
+    lengths: numpy.ndarray
+        The number of values in each group.
+
+    Returns
+    -------
+    numpy.ndarray
+        A table with a row for each group and a column for each percentile.
+    """
+    last = (lengths - 1)[:, None]
+    position = last * numpy.asarray(qs, dtype=float)[None, :] / 100
+    lower = position.astype(numpy.intp)
+    upper = numpy.minimum(lower + 1, last)
+    fraction = position - lower
+    base = starts[:, None]
+    low = ordered[base + lower].astype(float)
+    high = ordered[base + upper].astype(float)
+    return low + (high - low) * fraction
+
+
+@attr.s(slots=True, frozen=True)
+class MetricsTable:
+    """Holds the metrics of a collection of methods as a columnar table.
+
+    Each row of the table describes a single method, and the position of
+    that row serves as the identifier of the method. Each metric is stored
+    as a compact array column (see :data:`METRICS`):
+
+    * :code:`size`: the number of syntax nodes in the body of the method,
+      excluding operators and expression contexts.
+    * :code:`depth`: the deepest nesting of compound statements, where
+      each :code:`elif` is nested as deeply as the :code:`if` that it
+      continues.
+    * :code:`statements`: the number of statements.
+    * :code:`calls`: the number of call expressions.
+    * :code:`returns`: the number of return statements.
+    * :code:`params`: the number of parameters.
+    * :code:`blocks`: the number of blocks in the control-flow graph.
+    * :code:`edges`: the number of edges in the control-flow graph.
+    * :code:`complexity`: the cyclomatic complexity of the method, computed
+      from the decision points in its syntax rather than from its
+      control-flow graph, which does not model exception handling or
+      boolean operators.
+
+    The syntactic metrics exclude the bodies of nested functions and
+    classes, which are described by rows of their own. The control-flow
+    metrics of methods whose control-flow graph cannot be built are -1.
+
+    Percentiles and rankings are computed with NumPy if it is installed.
+    Otherwise, the order of the rows for each metric, and their partition
+    into modules or packages, are computed once and reused by later queries.
+
+    Attributes
+    ----------
+    methods: Sequence[Method]
+        The method described by each row.
+    modules: Sequence[str]
+        The names of the modules to which the methods belong.
+    packages: Sequence[str]
+        The names of the packages to which the methods belong. The package
+        of a module is the package that contains it, except for top-level
+        modules and packages, which are their own package.
+    module: array[int]
+        The index of the module (in :attr:`modules`) to which the method
+        in each row belongs.
+    package: array[int]
+        The index of the package (in :attr:`packages`) to which the method
+        in each row belongs.
+    columns: Mapping[str, array[int]]
+        The column for each metric.
+    """
+    methods: Sequence['Method'] = attr.ib(repr=False)
+    modules: Sequence[str] = attr.ib(repr=False)
+    packages: Sequence[str] = attr.ib(repr=False)
+    module: 'array[int]' = attr.ib(repr=False)
+    package: 'array[int]' = attr.ib(repr=False)
+    columns: Mapping[str, 'array[int]'] = attr.ib(repr=False)
+    _rows: Dict['Method', int] = attr.ib(repr=False)
+    _cache: Dict[Tuple[str, ...], Any] = \
+        attr.ib(factory=dict, init=False, repr=False, eq=False)
+
+    @classmethod
+    def for_program(cls,
+                    program: 'Program',
+                    *,
+                    modules: Optional[Iterable[str]] = None
+                    ) -> 'MetricsTable':
+        """Computes the metrics of every method within a given program.
+
+        Parameters
+        ----------
+        modules: Optional[Iterable[str]]
+            The names of the modules whose methods should be measured. By
+            default, all modules in the program are measured.
+
+        Raises
+        ------
+        KeyError
+            If a requested module does not belong to this program.
+        """
+        if modules is None:
+            modules = program.modules
+        return cls.build(program.modules[name] for name in modules)
+
+    @classmethod
+    def build(cls, modules: Iterable['Module']) -> 'MetricsTable':
+        """Computes the metrics of every method within the given modules."""
+        methods: List['Method'] = []
+        module_names: List[str] = []
+        package_names: List[str] = []
+        package_index: Dict[str, int] = {}
+        module_column = array('i')
+        package_column = array('i')
+        columns = {name: array('i') for name in METRICS}
+        syntax_columns = [columns[name] for name in _SYNTAX_METRICS]
+        graph_columns = [columns[name] for name in _GRAPH_METRICS]
+
+        for module in modules:
+            module_number = len(module_names)
+            module_names.append(module.name)
+            package = _package_of(module)
+            package_number = package_index.get(package)
+            if package_number is None:
+                package_number = package_index[package] = len(package_names)
+                package_names.append(package)
+
+            for method in module.methods.values():
+                methods.append(method)
+                module_column.append(module_number)
+                package_column.append(package_number)
+                for column, value in zip(syntax_columns,
+                                         _syntax_metrics(method.ast)):
+                    column.append(value)
+                try:
+                    graph_metrics = _graph_metrics(method.cfg)
+                except NotImplementedError:
+                    logger.debug(f'no CFG for method: {method.qual_name}')
+                    graph_metrics = (-1, -1)
+                for column, value in zip(graph_columns, graph_metrics):
+                    column.append(value)
+
+        rows = {method: row for row, method in enumerate(methods)}
+        return MetricsTable(methods=tuple(methods),
+                            modules=tuple(module_names),
+                            packages=tuple(package_names),
+                            module=module_column,
+                            package=package_column,
+                            columns=columns,
+                            rows=rows)
+
+    def __len__(self) -> int:
+        return len(self.methods)
+
+    def row_of(self, method: 'Method') -> int:
+        """Returns the row that describes a given method.
+
+        Raises
+        ------
+        KeyError
+            If the method is not described by this table.
+        """
+        return self._rows[method]
+
+    def row(self, method: 'Method') -> Dict[str, int]:
+        """Returns the metrics of a given method, indexed by name."""
+        row = self._rows[method]
+        return {name: column[row] for name, column in self.columns.items()}
+
+    def column(self, metric: str) -> 'array[int]':
+        """Returns the column for a given metric.
+
+        Raises
+        ------
+        ValueError
+            If the metric is unknown.
+        """
+        try:
+            return self.columns[metric]
+        except KeyError:
+            raise ValueError(f"unknown metric: {metric}") from None
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """Returns the columns of this table as NumPy arrays, together with
+        the :code:`module` and :code:`package` columns. The arrays share
+        memory with the table and should not be modified.
+
+        Raises
+        ------
+        ImportError
+            If NumPy is not installed.
+        """
+        import numpy
+        columns = dict(self.columns)
+        columns['module'] = self.module
+        columns['package'] = self.package
+        return {name: numpy.frombuffer(column, dtype=numpy.intc)
+                for name, column in columns.items()}
+
+    def _cached(self, key: Tuple[str, ...], compute: Callable[[], T]) -> T:
+        """Computes a derived structure at most once per table, as the
+        table is never modified."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute()
+            return value
+
+    def _arrays(self) -> Dict[str, 'numpy.ndarray']:
+        return self._cached(('numpy',), self.to_numpy)
+
+    def _groups(self, by: str) -> Sequence[str]:
+        if by == 'module':
+            return self.modules
+        if by == 'package':
+            return self.packages
+        raise ValueError(f"cannot group methods by: {by}")
+
+    def _descending_rows(self, metric: str) -> Sequence[int]:
+        """Returns the rows that have a value for a given metric, in
+        descending order of that metric, with ties in row order."""
+        column = self.column(metric)
+
+        def compute() -> Sequence[int]:
+            rows = [row for row in range(len(self)) if column[row] >= 0]
+            rows.sort(key=lambda r: -column[r])
+            return rows
+        return self._cached(('descending', metric), compute)
+
+    def _grouped_rows(self, metric: str, by: str) -> Dict[str, List[int]]:
+        """Partitions the rows that have a value for a given metric by
+        module or package, in descending order of that metric."""
+        names = self._groups(by)
+        group_column = self.module if by == 'module' else self.package
+
+        def compute() -> Dict[str, List[int]]:
+            grouped: Dict[str, List[int]] = {}
+            for row in self._descending_rows(metric):
+                grouped.setdefault(names[group_column[row]], []).append(row)
+            return grouped
+        return self._cached(('grouped', metric, by), compute)
+
+    def _grouped_arrays(self,
+                        numpy: ModuleType,
+                        arrays: Dict[str, 'numpy.ndarray'],
+                        metric: str,
+                        by: str,
+                        *,
+                        descending: bool
+                        ) -> Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']:
+        """Sorts the rows that have a value for a given metric by group and
+        then by value, with ties in row order.
+
+        Returns
+        -------
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The sorted rows, and the offset and length of each group within
+            them.
+        """
+        values = arrays[metric]
+        groups = arrays[by]
+        valid = numpy.flatnonzero(values >= 0)
+        order_values = -values[valid] if descending else values[valid]
+        rows = valid[numpy.lexsort((order_values, groups[valid]))]
+        sorted_groups = groups[rows]
+        is_start = numpy.empty(len(rows), dtype=bool)
+        is_start[:1] = True
+        numpy.not_equal(sorted_groups[1:], sorted_groups[:-1], out=is_start[1:])
+        starts = numpy.flatnonzero(is_start)
+        lengths = numpy.diff(numpy.append(starts, len(rows)))
+        return rows, starts, lengths
+
+    def percentiles(self,
+                    metric: str,
+                    qs: Sequence[float] = (50, 90, 99)
+                    ) -> Tuple[float, ...]:
+        """Computes percentiles of a given metric across all methods.
+        Methods for which the metric is unavailable are ignored.
+
+        Raises
+        ------
+        ValueError
+            If the metric is unknown, or if no method has a value for it.
+        """
+        column = self.column(metric)
+        numpy = _numpy()
+        if numpy is not None:
+            arrays = self._arrays()
+            values = numpy.sort(arrays[metric][arrays[metric] >= 0])
+            if not len(values):
+                raise ValueError(f"no values for metric: {metric}")
+            starts = numpy.zeros(1, dtype=numpy.intp)
+            lengths = numpy.array([len(values)])
+            return tuple(_percentiles(numpy, values, starts, lengths, qs)[0])
+
+        ordered = [column[r] for r in reversed(self._descending_rows(metric))]
+        if not ordered:
+            raise ValueError(f"no values for metric: {metric}")
+        return tuple(_percentile(ordered, q) for q in qs)
+
+    def grouped_percentiles(self,
+                            metric: str,
+                            qs: Sequence[float] = (50, 90, 99),
+                            *,
+                            by: str = 'module'
+                            ) -> Dict[str, Tuple[float, ...]]:
+        """Computes percentiles of a given metric for the methods of each
+        module (:code:`by='module'`) or package (:code:`by='package'`).
+
+        Raises
+        ------
+        ValueError
+            If the metric or grouping is unknown.
+        """
+        column = self.column(metric)
+        names = self._groups(by)
+        numpy = _numpy()
+        if numpy is not None:
+            arrays = self._arrays()
+            rows, starts, lengths = self._cached(
+                ('ascending', metric, by),
+                lambda: self._grouped_arrays(numpy, arrays, metric, by, descending=False))
+            values = arrays[metric][rows]
+            table = _percentiles(numpy, values, starts, lengths, qs)
+            groups = arrays[by][rows[starts]]
+            return {names[group]: tuple(percentiles)
+                    for group, percentiles in zip(groups.tolist(), table.tolist())}
+
+        grouped = self._grouped_rows(metric, by)
+        return {name: tuple(_percentile([column[r] for r in reversed(rows)], q)
+                            for q in qs)
+                for name, rows in grouped.items()}
+
+    def top(self, metric: str, k: int = 10) -> List[Tuple['Method', int]]:
+        """Returns the k methods with the highest values for a given
+        metric, in descending order of that metric.
+
+        Raises
+        ------
+        ValueError
+            If the metric is unknown.
+        """
+        column = self.column(metric)
+        numpy = _numpy()
+        if numpy is not None:
+            values = self._arrays()[metric]
+            valid = numpy.flatnonzero(values >= 0)
+            if 0 < k < len(valid):
+                # only the k largest values need to be sorted
+                threshold = numpy.partition(values[valid], len(valid) - k)[len(valid) - k]
+                valid = valid[values[valid] >= threshold]
+            rows = valid[numpy.argsort(-values[valid], kind='stable')[:max(k, 0)]]
+            return [(self.methods[row], column[row]) for row in rows.tolist()]
+
+        return [(self.methods[row], column[row])
+                for row in self._descending_rows(metric)[:k]]
+
+    def grouped_top(self,
+                    metric: str,
+                    k: int = 10,
+                    *,
+                    by: str = 'module'
+                    ) -> Dict[str, List[Tuple['Method', int]]]:
+        """Returns the k methods with the highest values for a given metric
+        within each module or package.
+
+        Raises
+        ------
+        ValueError
+            If the metric or grouping is unknown.
+        """
+        column = self.column(metric)
+        names = self._groups(by)
+        numpy = _numpy()
+        if numpy is not None:
+            arrays = self._arrays()
+            rows, starts, lengths = self._cached(
+                ('descending', metric, by),
+                lambda: self._grouped_arrays(numpy, arrays, metric, by, descending=True))
+            groups = arrays[by][rows[starts]].tolist()
+            ends = starts + numpy.minimum(lengths, k)
+            return {names[group]: [(self.methods[r], column[r])
+                                   for r in rows[start:end].tolist()]
+                    for group, start, end in zip(groups, starts.tolist(), ends.tolist())}
+
+        grouped = self._grouped_rows(metric, by)
+        return {name: [(self.methods[r], column[r]) for r in rows[:k]]
+                for name, rows in grouped.items()}
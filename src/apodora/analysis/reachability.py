@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+__all__ = ('ReachabilityIndex',)
+
+from typing import FrozenSet, List, Optional, Sequence
+import typing
+
+import attr
+
+from .graph import IndexedGraph, strongly_connected_components
+from ..models import BasicBlock
+
+if typing.TYPE_CHECKING:
+    from ..models import ControlFlowGraph
+
+#: graphs whose condensation has at most this many components use a
+#: bitset transitive closure; larger graphs use interval labels instead.
+CLOSURE_LIMIT = 4096
+
+
+@attr.s(slots=True, frozen=True)
+class _IntervalLabels:
+    """Labels the nodes of a DAG using a depth-first search, following the
+    GRAIL scheme: :code:`post` is the postorder number of a node, :code:`low`
+    is the lowest postorder number that the node can reach, and
+    :code:`start` is the lowest postorder number within its DFS subtree.
+
+    If u reaches v then :code:`[low[v], post[v]]` is contained in
+    :code:`[low[u], post[u]]`, and if :code:`start[u] <= post[v] <= post[u]`
+    then u reaches v.
+    """
+    post: Sequence[int] = attr.ib()
+    low: Sequence[int] = attr.ib()
+    start: Sequence[int] = attr.ib()
+
+    @classmethod
+    def build(cls,
+              successors: Sequence[Sequence[int]],
+              reverse: bool
+              ) -> '_IntervalLabels':
+        size = len(successors)
+        post = [-1] * size
+        start = [0] * size
+        counter = 0
+        # components are numbered in reverse topological order, so visiting
+        # roots from the highest number ensures that sources come first
+        for root in range(size - 1, -1, -1):
+            if post[root] != -1:
+                continue
+            start[root] = counter
+            post[root] = -2
+            work = [(root, 0)]
+            while work:
+                node, position = work[-1]
+                node_successors = successors[node]
+                if position < len(node_successors):
+                    work[-1] = (node, position + 1)
+                    index = -1 - position if reverse else position
+                    successor = node_successors[index]
+                    if post[successor] == -1:
+                        start[successor] = counter
+                        post[successor] = -2
+                        work.append((successor, 0))
+                else:
+                    work.pop()
+                    post[node] = counter
+                    counter += 1
+
+        low = list(post)
+        for node in range(size):
+            for successor in successors[node]:
+                if low[successor] < low[node]:
+                    low[node] = low[successor]
+        return _IntervalLabels(post, low, start)
+
+    def excludes(self, source: int, target: int) -> bool:
+        """Determines whether source definitely cannot reach target."""
+        if self.low[target] < self.low[source]:
+            return True
+        return self.post[target] > self.post[source]
+
+    def includes(self, source: int, target: int) -> bool:
+        """Determines whether source definitely reaches target."""
+        return self.start[source] <= self.post[target] <= self.post[source]
+
+
+@attr.s(slots=True, frozen=True)
+class ReachabilityIndex:
+    """Answers reachability queries over a control-flow graph.
+
+    The index condenses the strongly connected components of the graph
+    into a DAG. For graphs with at most :data:`CLOSURE_LIMIT` components,
+    the transitive closure of that DAG is stored as one bitset per
+    component, and every query takes constant time. Larger graphs are
+    labelled with intervals that answer most queries in constant time and
+    prune the search for those that remain.
+
+    The index describes the graph at the time it was built. Queries on an
+    index for a graph that has since been modified raise a
+    :class:`ValueError`; use :attr:`ControlFlowGraph.reachability` to
+    obtain an up-to-date index.
+
+    Attributes
+    ----------
+    cfg: ControlFlowGraph
+        The graph described by this index.
+    version: int
+        The version of the graph at which this index was built.
+    unreachable_blocks: FrozenSet[BasicBlock]
+        The blocks that cannot be reached from the entry of the graph.
+    """
+    cfg: 'ControlFlowGraph' = attr.ib(repr=False)
+    version: int = attr.ib()
+    unreachable_blocks: FrozenSet[BasicBlock] = attr.ib(repr=False)
+    _graph: IndexedGraph = attr.ib(repr=False)
+    _component: Sequence[int] = attr.ib(repr=False)
+    _successors: Sequence[Sequence[int]] = attr.ib(repr=False)
+    _closure: Optional[Sequence[int]] = attr.ib(repr=False)
+    _labels: Sequence[_IntervalLabels] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls,
+              cfg: 'ControlFlowGraph',
+              closure_limit: int = CLOSURE_LIMIT
+              ) -> 'ReachabilityIndex':
+        """Builds a reachability index for a given control-flow graph."""
+        graph = IndexedGraph.build(cfg)
+        component, num_components = \
+            strongly_connected_components(graph.successors)
+
+        condensed: List[List[int]] = [[] for _ in range(num_components)]
+        for node, node_successors in enumerate(graph.successors):
+            from_component = component[node]
+            for successor in node_successors:
+                to_component = component[successor]
+                if to_component != from_component:
+                    condensed[from_component].append(to_component)
+        successors = [sorted(set(s)) for s in condensed]
+
+        closure: Optional[List[int]] = None
+        labels: Sequence[_IntervalLabels] = ()
+        if num_components <= closure_limit:
+            closure = []
+            for node, node_successors in enumerate(successors):
+                bits = 1 << node
+                for successor in node_successors:
+                    bits |= closure[successor]
+                closure.append(bits)
+        else:
+            labels = (_IntervalLabels.build(successors, reverse=False),
+                      _IntervalLabels.build(successors, reverse=True))
+
+        reachable = graph.reachable_from(graph.entry)
+        unreachable = frozenset(block for block, is_reachable
+                                in zip(graph.blocks, reachable)
+                                if not is_reachable)
+
+        return ReachabilityIndex(cfg=cfg,
+                                 version=cfg.version,
+                                 unreachable_blocks=unreachable,
+                                 graph=graph,
+                                 component=component,
+                                 successors=successors,
+                                 closure=closure,
+                                 labels=labels)
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the graph has been modified since this index was built."""
+        return self.cfg.version != self.version
+
+    def _ensure_fresh(self) -> None:
+        if self.is_stale:
+            m = "reachability index is stale: control-flow graph was modified"
+            raise ValueError(m)
+
+    def _components_reach(self, source: int, target: int) -> bool:
+        if source == target:
+            return True
+        # components can only reach components with lower numbers
+        if target > source:
+            return False
+        if self._closure is not None:
+            return bool((self._closure[source] >> target) & 1)
+
+        labels = self._labels
+        if any(label.excludes(source, target) for label in labels):
+            return False
+        if any(label.includes(source, target) for label in labels):
+            return True
+
+        successors = self._successors
+        seen = {source}
+        stack = [source]
+        while stack:
+            for successor in successors[stack.pop()]:
+                if successor == target:
+                    return True
+                if successor in seen or successor < target:
+                    continue
+                if any(label.excludes(successor, target) for label in labels):
+                    continue
+                if any(label.includes(successor, target) for label in labels):
+                    return True
+                seen.add(successor)
+                stack.append(successor)
+        return False
+
+    def reaches(self, source: BasicBlock, target: BasicBlock) -> bool:
+        """Determines whether there is a path from one block to another.
+
+        Every block is considered to reach itself.
+
+        Raises
+        ------
+        KeyError
+            If either block does not belong to the graph.
+        ValueError
+            If the graph has been modified since the index was built.
+        """
+        self._ensure_fresh()
+        index = self._graph.index
+        return self._components_reach(self._component[index[source]],
+                                      self._component[index[target]])
+
+    def is_reachable(self, block: BasicBlock) -> bool:
+        """Determines whether a block can be reached from the entry."""
+        self._ensure_fresh()
+        return block in self._graph.index and block not in self.unreachable_blocks
+
+    def reachable_from(self, block: BasicBlock) -> FrozenSet[BasicBlock]:
+        """Returns the set of blocks that are reachable from a given block,
+        including that block."""
+        self._ensure_fresh()
+        graph = self._graph
+        reachable = graph.reachable_from(graph.index[block])
+        return frozenset(b for b, is_reachable in zip(graph.blocks, reachable)
+                         if is_reachable)
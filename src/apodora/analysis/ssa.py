@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides static single assignment (SSA) form for the local
+variables of control-flow graphs.
+"""
+__all__ = ('SSAForm', 'build_ssa')
+
+from array import array
+from typing import (Any, Dict, Iterable, List, Mapping, Optional, Sequence,
+                    Set, Tuple)
+import typing
+
+import attr
+
+from .dominators import DominatorTree
+from ..lazy import logger
+from ..models import BasicBlock
+from ..util import iter_child_nodes
+
+if typing.TYPE_CHECKING:
+    from ..models import ControlFlowGraph, Method
+
+#: the kinds of definition
+PARAM, ASSIGN, PHI = 0, 1, 2
+
+_STORE_CONTEXTS = frozenset({'Store', 'Del', 'Param', 'AugStore'})
+_SCOPES = frozenset({'FunctionDef', 'AsyncFunctionDef', 'ClassDef', 'Lambda'})
+_COMPREHENSIONS = frozenset({'GeneratorExp', 'SetComp', 'DictComp', 'ListComp'})
+#: statements whose control flow is not described by the control-flow graph
+_UNSUPPORTED_STATEMENTS = frozenset({'Try', 'TryExcept', 'TryFinally', 'TryStar',
+                                     'Match'})
+
+
+class _NameCollector:
+    """Collects the loads and stores of local names within a statement,
+    without entering nested scopes."""
+    def __init__(self, leaky_list_comprehensions: bool) -> None:
+        # in Python 2, list comprehensions bind names in the enclosing scope
+        self._leaky_list_comprehensions = leaky_list_comprehensions
+        self._masked: List[Set[str]] = []
+        self.loads: List[Tuple[str, Any]] = []
+        self.stores: List[Tuple[str, Any]] = []
+
+    def _is_masked(self, name: str) -> bool:
+        return any(name in masked for masked in self._masked)
+
+    def visit(self, node: Any) -> None:
+        kind = node.__class__.__name__
+        if kind == 'Name':
+            if self._is_masked(node.id):
+                return
+            if node.ctx.__class__.__name__ in _STORE_CONTEXTS:
+                self.stores.append((node.id, node))
+            else:
+                self.loads.append((node.id, node))
+        elif kind in _SCOPES:
+            self._visit_scope(node)
+        elif kind == 'ExceptHandler' and isinstance(node.name, str):
+            self.stores.append((node.name, node))
+            for child in iter_child_nodes(node):
+                self.visit(child)
+        elif kind in _COMPREHENSIONS:
+            bound: Set[str] = set()
+            if not (kind == 'ListComp' and self._leaky_list_comprehensions):
+                for generator in node.generators:
+                    for child in _walk(generator.target):
+                        if child.__class__.__name__ == 'Name':
+                            bound.add(child.id)
+            self._masked.append(bound)
+            # the generators are evaluated before the element
+            for generator in node.generators:
+                self.visit(generator)
+            for child in iter_child_nodes(node):
+                if child.__class__.__name__ != 'comprehension':
+                    self.visit(child)
+            self._masked.pop()
+        else:
+            for child in iter_child_nodes(node):
+                self.visit(child)
+
+    def _visit_scope(self, node: Any) -> None:
+        # only decorators and default values are evaluated in this scope
+        for decorator in getattr(node, 'decorator_list', ()):
+            self.visit(decorator)
+        args = getattr(node, 'args', None)
+        if args is not None and args.__class__.__name__ == 'arguments':
+            for default in args.defaults:
+                self.visit(default)
+            for default in getattr(args, 'kw_defaults', ()):
+                if default is not None:
+                    self.visit(default)
+        for base in getattr(node, 'bases', ()):
+            self.visit(base)
+        if hasattr(node, 'name'):
+            self.stores.append((node.name, node))
+
+    def visit_header(self, node: Any) -> None:
+        """Visits the parts of a statement that are evaluated within the
+        block to which the statement belongs.
+
+        The bodies of loops, branches and :code:`with` statements are
+        placed in blocks of their own, or after the statement, by
+        :class:`BlockVisitor`, and so are skipped here. The iterable of a
+        :code:`for` loop is evaluated in the block before the loop.
+
+        Raises
+        ------
+        NotImplementedError
+            If the statement has control flow that is not described by the
+            control-flow graph (e.g., a :code:`try` statement).
+        """
+        kind = node.__class__.__name__
+        if kind in _UNSUPPORTED_STATEMENTS:
+            m = f"no SSA construction for {kind} statements"
+            raise NotImplementedError(m)
+        if kind in ('For', 'AsyncFor'):
+            self.visit(node.target)
+        elif kind in ('If', 'While'):
+            self.visit(node.test)
+        elif kind in ('With', 'AsyncWith'):
+            # Python 2 statements have a single context manager
+            for item in getattr(node, 'items', None) or [node]:
+                self.visit(item.context_expr)
+                if item.optional_vars is not None:
+                    self.visit(item.optional_vars)
+        elif kind == 'AugAssign' and node.target.__class__.__name__ == 'Name':
+            self.visit(node.value)
+            self.loads.append((node.target.id, node.target))
+            self.stores.append((node.target.id, node.target))
+        elif kind in ('Import', 'ImportFrom'):
+            for alias in node.names:
+                if alias.name != '*':
+                    bound = alias.asname or alias.name.partition('.')[0]
+                    self.stores.append((bound, alias))
+        else:
+            self.visit(node)
+
+
+def _walk(node: Any) -> Iterable[Any]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(iter_child_nodes(node))
+
+
+def _parameters(function: Any) -> List[Tuple[str, Any]]:
+    """Returns the names and nodes of the parameters of a function."""
+    args = function.args
+    parameters: List[Tuple[str, Any]] = []
+    positional = list(getattr(args, 'posonlyargs', [])) + list(args.args)
+    for arg in positional + list(getattr(args, 'kwonlyargs', [])):
+        if arg.__class__.__name__ == 'arg':
+            parameters.append((arg.arg, arg))
+        else:
+            # Python 2 parameters are (possibly nested tuples of) names
+            parameters += [(n.id, n) for n in _walk(arg)
+                           if n.__class__.__name__ == 'Name']
+    for arg in (args.vararg, args.kwarg):
+        if arg is None:
+            continue
+        if isinstance(arg, str):
+            parameters.append((arg, args))
+        else:
+            parameters.append((arg.arg, arg))
+    return parameters
+
+
+def _nonlocal_names(function: Any) -> Set[str]:
+    names: Set[str] = set()
+    stack = list(iter_child_nodes(function))
+    while stack:
+        node = stack.pop()
+        kind = node.__class__.__name__
+        if kind in ('Global', 'Nonlocal'):
+            names.update(node.names)
+        elif kind not in _SCOPES:
+            stack.extend(iter_child_nodes(node))
+    return names
+
+
+def _csr(keys: Sequence[int], size: int) -> Tuple[array, array]:
+    """Groups the positions of a sequence by their key, returning offsets
+    and members in compressed sparse row format."""
+    offsets = array('i', [0] * (size + 1))
+    for key in keys:
+        if key != -1:
+            offsets[key + 1] += 1
+    for position in range(size):
+        offsets[position + 1] += offsets[position]
+    members = array('i', [0] * offsets[size])
+    cursor = array('i', offsets[:size])
+    for position, key in enumerate(keys):
+        if key != -1:
+            members[cursor[key]] = position
+            cursor[key] += 1
+    return offsets, members
+
+
+@attr.s(slots=True, frozen=True)
+class SSAForm:
+    """Describes the static single assignment form of the local variables
+    of a control-flow graph, stored as compact tables.
+
+    Every definition and use of a local variable is given an integer
+    identifier. Definitions are either parameters, assignments within a
+    statement, or phi functions, which are placed at the iterated dominance
+    frontiers of assignments to variables that are live across blocks
+    (i.e., semi-pruned SSA). Each use is linked to the single definition
+    that reaches it, or to -1 if the variable may be undefined. The
+    operands of a phi function are uses that belong to the phi definition
+    and are attributed to the predecessor block from which they flow, or
+    to block -1 for values that flow into the entry block from outside of
+    the graph.
+
+    Both use-def and def-use queries are constant-time table lookups.
+    Blocks that are unreachable from the entry are not renamed.
+
+    Attributes
+    ----------
+    cfg: ControlFlowGraph
+        The graph described by this form.
+    version: int
+        The version of the graph at which this form was built.
+    variables: Sequence[str]
+        The names of the local variables, indexed by variable number.
+    def_var: Sequence[int]
+        The variable defined by each definition.
+    def_kind: Sequence[int]
+        The kind of each definition (i.e., PARAM, ASSIGN or PHI).
+    def_block: Sequence[int]
+        The index of the block that contains each definition.
+    def_node: Sequence[Any]
+        The AST node responsible for each definition, or None for phis.
+    use_var: Sequence[int]
+        The variable read by each use.
+    use_block: Sequence[int]
+        The index of the block that contains each use.
+    use_node: Sequence[Any]
+        The AST node for each use, or None for phi operands.
+    use_def: Sequence[int]
+        The definition that reaches each use, or -1 if there is none.
+    use_phi: Sequence[int]
+        The phi definition to which each use belongs as an operand, or -1.
+    """
+    cfg: 'ControlFlowGraph' = attr.ib(repr=False)
+    version: int = attr.ib()
+    variables: Sequence[str] = attr.ib(repr=False)
+    def_var: Sequence[int] = attr.ib(repr=False)
+    def_kind: Sequence[int] = attr.ib(repr=False)
+    def_block: Sequence[int] = attr.ib(repr=False)
+    def_node: Sequence[Any] = attr.ib(repr=False)
+    use_var: Sequence[int] = attr.ib(repr=False)
+    use_block: Sequence[int] = attr.ib(repr=False)
+    use_node: Sequence[Any] = attr.ib(repr=False)
+    use_def: Sequence[int] = attr.ib(repr=False)
+    use_phi: Sequence[int] = attr.ib(repr=False)
+    _dominators: DominatorTree = attr.ib(repr=False)
+    _def_version: Sequence[int] = attr.ib(repr=False)
+    _du_offsets: Sequence[int] = attr.ib(repr=False)
+    _du_uses: Sequence[int] = attr.ib(repr=False)
+    _phi_offsets: Sequence[int] = attr.ib(repr=False)
+    _phi_operands: Sequence[int] = attr.ib(repr=False)
+    _block_phis: Mapping[int, Sequence[int]] = attr.ib(repr=False)
+    _node_to_def: Mapping[Any, int] = attr.ib(repr=False)
+    _node_to_use: Mapping[Any, int] = attr.ib(repr=False)
+
+    @classmethod
+    def build(cls,
+              cfg: 'ControlFlowGraph',
+              function: Optional[Any] = None,
+              *,
+              is_py2: bool = False
+              ) -> 'SSAForm':
+        """Computes the SSA form for a given control-flow graph.
+
+        Parameters
+        ----------
+        cfg: ControlFlowGraph
+            The graph whose local variables should be renamed.
+        function: Optional[Any]
+            The function definition node whose body the graph describes,
+            if any, which supplies the parameters and any names that are
+            declared :code:`global` or :code:`nonlocal`.
+        is_py2: bool
+            Whether or not the statements use Python 2 semantics, under
+            which list comprehensions bind names in the enclosing scope.
+
+        Raises
+        ------
+        NotImplementedError
+            If a reachable block contains a statement whose control flow is
+            not described by the graph (i.e., a :code:`try` or
+            :code:`match` statement), since the resulting def-use chains
+            would be incorrect.
+        """
+        dominators = cfg.dominators
+        graph = dominators.graph
+        size = len(graph)
+        rpo = dominators.rpo
+        entry = graph.entry
+
+        excluded = _nonlocal_names(function) if function is not None else set()
+        variables: List[str] = []
+        variable_ids: Dict[str, int] = {}
+
+        def variable(name: str) -> int:
+            var = variable_ids.get(name)
+            if var is None:
+                var = variable_ids[name] = len(variables)
+                variables.append(name)
+            return var
+
+        # events are (is_def, var, node) triples in evaluation order
+        events: List[List[Tuple[bool, int, Any]]] = [[] for _ in range(size)]
+        parameters: List[Tuple[int, Any]] = []
+        if function is not None:
+            parameters = [(variable(name), node)
+                          for name, node in _parameters(function)
+                          if name not in excluded]
+        for node in rpo:
+            block_events = events[node]
+            for stmt in graph.blocks[node].stmts:
+                collector = _NameCollector(leaky_list_comprehensions=is_py2)
+                collector.visit_header(stmt)
+                block_events += [(False, variable(name), n)
+                                 for name, n in collector.loads
+                                 if name not in excluded]
+                block_events += [(True, variable(name), n)
+                                 for name, n in collector.stores
+                                 if name not in excluded]
+
+        # find the variables that are live across blocks and their defs
+        num_vars = len(variables)
+        def_blocks: List[Set[int]] = [set() for _ in range(num_vars)]
+        live_across = [False] * num_vars
+        for var, _ in parameters:
+            def_blocks[var].add(entry)
+        for node in rpo:
+            defined: Set[int] = set()
+            for is_def, var, _ in events[node]:
+                if is_def:
+                    defined.add(var)
+                    def_blocks[var].add(node)
+                elif var not in defined:
+                    live_across[var] = True
+
+        # place phis at the iterated dominance frontiers
+        frontiers = dominators.frontiers()
+        block_phi_vars: Dict[int, List[int]] = {}
+        for var in range(num_vars):
+            if not live_across[var]:
+                continue
+            has_phi: Set[int] = set()
+            worklist = list(def_blocks[var])
+            while worklist:
+                node = worklist.pop()
+                for frontier in frontiers[node]:
+                    if frontier in has_phi:
+                        continue
+                    has_phi.add(frontier)
+                    block_phi_vars.setdefault(frontier, []).append(var)
+                    if frontier not in def_blocks[var]:
+                        worklist.append(frontier)
+
+        def_var = array('i')
+        def_kind = array('b')
+        def_block = array('i')
+        def_version = array('i')
+        def_node: List[Any] = []
+        use_var = array('i')
+        use_block = array('i')
+        use_def = array('i')
+        use_phi = array('i')
+        use_node: List[Any] = []
+        versions = [0] * num_vars
+        stacks: List[List[int]] = [[] for _ in range(num_vars)]
+
+        def define(var: int, kind: int, node: int, ast_node: Any) -> int:
+            definition = len(def_var)
+            def_var.append(var)
+            def_kind.append(kind)
+            def_block.append(node)
+            def_version.append(versions[var])
+            def_node.append(ast_node)
+            versions[var] += 1
+            return definition
+
+        def use(var: int, node: int, ast_node: Any, phi: int) -> None:
+            use_var.append(var)
+            use_block.append(node)
+            use_node.append(ast_node)
+            stack = stacks[var]
+            use_def.append(stack[-1] if stack else -1)
+            use_phi.append(phi)
+
+        # phis are created up front so that their operands can be filled in
+        # by predecessors that are renamed before the phi's own block
+        block_phis: Dict[int, List[int]] = {
+            node: [define(var, PHI, node, None) for var in phi_vars]
+            for node, phi_vars in block_phi_vars.items()}
+        for var, ast_node in parameters:
+            stacks[var].append(define(var, PARAM, entry, ast_node))
+
+        # the entry may itself be a loop header, in which case its phis
+        # receive the values that flow in from outside of the graph
+        for phi in block_phis.get(entry, ()):
+            use(def_var[phi], -1, None, phi)
+
+        # rename by walking the dominator tree
+        work: List[Tuple[int, Optional[List[int]]]] = [(entry, None)]
+        while work:
+            node, pushed = work.pop()
+            if pushed is not None:
+                for var in pushed:
+                    stacks[var].pop()
+                continue
+            pushed = []
+            for phi in block_phis.get(node, ()):
+                var = def_var[phi]
+                stacks[var].append(phi)
+                pushed.append(var)
+            for is_def, var, ast_node in events[node]:
+                if is_def:
+                    stacks[var].append(define(var, ASSIGN, node, ast_node))
+                    pushed.append(var)
+                else:
+                    use(var, node, ast_node, -1)
+            for successor in graph.successors[node]:
+                for phi in block_phis.get(successor, ()):
+                    use(def_var[phi], node, None, phi)
+            work.append((node, pushed))
+            work.extend((child, None) for child in reversed(dominators.children[node]))
+
+        num_defs = len(def_var)
+        du_offsets, du_uses = _csr(use_def, num_defs)
+        phi_offsets, phi_operands = _csr(use_phi, num_defs)
+        node_to_def = {n: d for d, n in enumerate(def_node) if n is not None}
+        node_to_use = {n: u for u, n in enumerate(use_node) if n is not None}
+        return SSAForm(cfg=cfg,
+                       version=cfg.version,
+                       variables=variables,
+                       def_var=def_var,
+                       def_kind=def_kind,
+                       def_block=def_block,
+                       def_node=def_node,
+                       use_var=use_var,
+                       use_block=use_block,
+                       use_node=use_node,
+                       use_def=use_def,
+                       use_phi=use_phi,
+                       dominators=dominators,
+                       def_version=def_version,
+                       du_offsets=du_offsets,
+                       du_uses=du_uses,
+                       phi_offsets=phi_offsets,
+                       phi_operands=phi_operands,
+                       block_phis=block_phis,
+                       node_to_def=node_to_def,
+                       node_to_use=node_to_use)
+
+    @property
+    def num_defs(self) -> int:
+        return len(self.def_var)
+
+    @property
+    def num_uses(self) -> int:
+        return len(self.use_var)
+
+    def name(self, definition: int) -> str:
+        """Returns the SSA name of a definition (e.g., :code:`x.2`)."""
+        return f'{self.variables[self.def_var[definition]]}.{self._def_version[definition]}'
+
+    def reaching_definition(self, use: int) -> int:
+        """Returns the definition that reaches a given use, or -1 if the
+        variable may be undefined at that use."""
+        return self.use_def[use]
+
+    def uses_of(self, definition: int) -> Sequence[int]:
+        """Returns the uses that are reached by a given definition,
+        including phi operands."""
+        return self._du_uses[self._du_offsets[definition]:self._du_offsets[definition + 1]]
+
+    def phi_operands(self, phi: int) -> Sequence[int]:
+        """Returns the operand uses of a given phi definition, one for each
+        reachable predecessor of the block that contains the phi."""
+        return self._phi_operands[self._phi_offsets[phi]:self._phi_offsets[phi + 1]]
+
+    def phis(self, block: BasicBlock) -> Sequence[int]:
+        """Returns the phi definitions at the start of a given block."""
+        return self._block_phis.get(self._dominators.graph.index[block], ())
+
+    def definition_of_node(self, node: Any) -> Optional[int]:
+        """Returns the definition made by a given AST node (e.g., a
+        :code:`Name` that is assigned to, or a parameter), if any."""
+        return self._node_to_def.get(node)
+
+    def use_of_node(self, node: Any) -> Optional[int]:
+        """Returns the use made by a given :code:`Name` node, if any."""
+        return self._node_to_use.get(node)
+
+
+def build_ssa(methods: Iterable['Method']) -> Dict['Method', SSAForm]:
+    """Computes the SSA form of the bodies of many methods at once.
+
+    Methods whose control-flow graphs or SSA forms cannot be built (e.g.,
+    because they use statements that are not yet supported) are omitted
+    from the result.
+    """
+    forms: Dict['Method', SSAForm] = {}
+    for method in methods:
+        try:
+            forms[method] = SSAForm.build(method.cfg,
+                                          method.ast,
+                                          is_py2=method.module.program.is_py2)
+        except NotImplementedError as err:
+            logger.debug(f'skipping SSA construction for method {method.qual_name}: {err}')
+    return forms
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a framework for summary-based interprocedural
+analyses.
+
+An analysis describes the behaviour of each method by a summary, which is
+computed from the body of the method and the summaries of the methods
+that it calls. Summaries are computed once per method, bottom-up over the
+strongly connected components of the call graph, such that the summary
+of each callee is reused at all of its call sites.
+
+Summaries are memoised by a Merkle key that covers the parser used by the
+program, the structure of the method, the keys of its callees, and the
+names of the external objects that it calls. Summaries that are held in a persistent
+:class:`SummaryCache` are therefore reused across runs for methods whose
+code and callees are unchanged.
+"""
+__all__ = ('SummaryAnalysis', 'SummaryCache', 'Summaries')
+
+from hashlib import blake2b
+from typing import (Any, Dict, Generic, Iterable, List, Mapping, Optional,
+                    Sequence, Tuple, TypeVar)
+import abc
+import os
+import pickle
+import tempfile
+import typing
+
+import attr
+
+from .calls import CallGraph, CallSite
+from .graph import strongly_connected_components
+from ..lazy import logger
+from ..models import Method
+
+if typing.TYPE_CHECKING:
+    from ..models import Program
+
+S = TypeVar('S')
+
+#: the maximum number of rounds used to solve a recursive component
+MAX_ITERATIONS = 100
+
+
+class SummaryAnalysis(Generic[S], abc.ABC):
+    """Describes a summary-based interprocedural analysis.
+
+    Summaries must be comparable for equality, and must be picklable if
+    they are to be stored in a persistent cache. A summary should depend
+    only on the code of its method and the summaries of its callees.
+    """
+    @property
+    @abc.abstractmethod
+    def name(self) -> str:
+        """Identifies this analysis, and the version of its summaries,
+        within cache keys. The name should be changed whenever the
+        analysis changes in a way that affects its summaries."""
+        ...
+
+    @abc.abstractmethod
+    def initial(self, method: Method) -> S:
+        """Returns the summary that is assumed for a method before it has
+        been analysed, which is used for recursive calls. Summaries of
+        recursive methods are recomputed until they reach a fixed point, so
+        this should be the least informative summary (e.g., an empty set)."""
+        ...
+
+    @abc.abstractmethod
+    def summarise(self,
+                  method: Method,
+                  calls: Sequence[Tuple[CallSite, Optional[S]]]
+                  ) -> S:
+        """Computes the summary of a given method.
+
+        Parameters
+        ----------
+        method: Method
+            The method that should be summarised.
+        calls: Sequence[Tuple[CallSite, Optional[S]]]
+            The calls made by the method, in order, each paired with the
+            summary of its callee, or :code:`None` if the callee does not
+            belong to the program.
+        """
+        ...
+
+
+@attr.s(slots=True)
+class SummaryCache:
+    """Stores summaries by their keys, optionally persisting them to disk
+    between runs.
+
+    Attributes
+    ----------
+    filename: Optional[str]
+        The file to which the cache is saved, if any.
+    """
+    filename: Optional[str] = attr.ib(default=None)
+    _entries: Dict[bytes, Any] = attr.ib(factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, filename: str) -> 'SummaryCache':
+        """Loads the cache that was saved to a given file, or creates an
+        empty cache for that file if it does not exist.
+
+        Raises
+        ------
+        ValueError
+            If the file does not contain a summary cache.
+        """
+        if not os.path.exists(filename):
+            return SummaryCache(filename)
+        with open(filename, 'rb') as f:
+            try:
+                entries = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError) as err:
+                m = f"failed to load summary cache: {filename}"
+                raise ValueError(m) from err
+        if not isinstance(entries, dict):
+            raise ValueError(f"not a summary cache: {filename}")
+        return SummaryCache(filename, entries)
+
+    def save(self, filename: Optional[str] = None) -> None:
+        """Saves this cache to a given file, or to the file from which it
+        was loaded. The file is replaced atomically.
+
+        Raises
+        ------
+        ValueError
+            If no file is given and the cache was not loaded from a file.
+        """
+        filename = filename or self.filename
+        if filename is None:
+            raise ValueError("no filename given for summary cache")
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(self._entries, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, filename)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: bytes) -> Optional[Any]:
+        return self._entries.get(key)
+
+    def put(self, key: bytes, summary: Any) -> None:
+        self._entries[key] = summary
+
+    def retain(self, keys: Iterable[bytes]) -> None:
+        """Discards all entries except those with the given keys."""
+        keep = set(keys)
+        for key in [k for k in self._entries if k not in keep]:
+            del self._entries[key]
+
+
+@attr.s(slots=True, frozen=True)
+class Summaries(Generic[S]):
+    """Holds the summaries computed by an analysis for every method within
+    a program.
+
+    Attributes
+    ----------
+    analysis: SummaryAnalysis[S]
+        The analysis that computed the summaries.
+    call_graph: CallGraph
+        The call graph over which the summaries were computed.
+    keys: Sequence[bytes]
+        The cache key of each method in the call graph.
+    computed: int
+        The number of methods that were summarised.
+    reused: int
+        The number of methods whose summaries were taken from the cache.
+    """
+    analysis: SummaryAnalysis[S] = attr.ib()
+    call_graph: CallGraph = attr.ib(repr=False)
+    keys: Sequence[bytes] = attr.ib(repr=False)
+    _summaries: Sequence[S] = attr.ib(repr=False)
+    computed: int = attr.ib()
+    reused: int = attr.ib()
+
+    @classmethod
+    def compute(cls,
+                program: 'Program',
+                analysis: SummaryAnalysis[S],
+                *,
+                cache: Optional[SummaryCache] = None,
+                call_graph: Optional[CallGraph] = None
+                ) -> 'Summaries[S]':
+        """Computes the summary of every method within a given program.
+
+        Parameters
+        ----------
+        cache: Optional[SummaryCache]
+            A cache from which summaries are reused and to which new
+            summaries are added.
+        call_graph: Optional[CallGraph]
+            The call graph of the program, which is built if not given.
+
+        Raises
+        ------
+        RuntimeError
+            If the summaries of a recursive component do not reach a fixed
+            point within :data:`MAX_ITERATIONS` rounds.
+        """
+        if call_graph is None:
+            call_graph = CallGraph.build(program)
+        if cache is None:
+            cache = SummaryCache()
+        methods = call_graph.methods
+        component, num_components = \
+            strongly_connected_components(call_graph.successors)
+        members: List[List[int]] = [[] for _ in range(num_components)]
+        for node, number in enumerate(component):
+            members[number].append(node)
+
+        keys: List[bytes] = [b''] * len(methods)
+        summaries: List[Any] = [None] * len(methods)
+        computed = reused = 0
+
+        # components can only call components with lower numbers
+        for number, nodes in enumerate(members):
+            cls._assign_keys(analysis, program.parser, call_graph, component,
+                             nodes, keys)
+            if all(keys[n] in cache for n in nodes):
+                for node in nodes:
+                    summaries[node] = cache.get(keys[node])
+                reused += len(nodes)
+                continue
+
+            cls._solve(analysis, call_graph, component, nodes, summaries)
+            for node in nodes:
+                cache.put(keys[node], summaries[node])
+            computed += len(nodes)
+
+        logger.debug(f'computed {computed} summaries for {analysis.name} '
+                     f'(reused {reused})')
+        return Summaries(analysis=analysis,
+                         call_graph=call_graph,
+                         keys=keys,
+                         summaries=summaries,
+                         computed=computed,
+                         reused=reused)
+
+    @staticmethod
+    def _assign_keys(analysis: SummaryAnalysis[S],
+                     parser: str,
+                     call_graph: CallGraph,
+                     component: Sequence[int],
+                     nodes: List[int],
+                     keys: List[bytes]
+                     ) -> None:
+        """Computes the keys of the methods within a component, given the
+        keys of the methods that they call."""
+        # order the members by their structure so that the key of the
+        # component does not depend on the order in which they were found
+        methods = call_graph.methods
+        nodes.sort(key=lambda n: methods[n].fingerprint.digest)
+        position = {node: index for index, node in enumerate(nodes)}
+
+        # trees produced by different parsers have different fingerprints
+        parts: List[bytes] = [analysis.name.encode('utf-8'),
+                              parser.encode('utf-8')]
+        for node in nodes:
+            parts.append(methods[node].fingerprint.digest)
+            for call in call_graph.calls[node]:
+                if call.callee is None:
+                    parts.append(b'x' + (call.name or '').encode('utf-8'))
+                    continue
+                callee = call_graph.index[call.callee]
+                if component[callee] == component[node]:
+                    parts.append(b'r%d' % position[callee])
+                else:
+                    parts.append(b'k' + keys[callee])
+        key = blake2b(b'\0'.join(parts), digest_size=16).digest()
+        for index, node in enumerate(nodes):
+            keys[node] = blake2b(key + b'%d' % index, digest_size=16).digest()
+
+    @staticmethod
+    def _solve(analysis: SummaryAnalysis[S],
+               call_graph: CallGraph,
+               component: Sequence[int],
+               nodes: Sequence[int],
+               summaries: List[Any]
+               ) -> None:
+        """Computes the summaries of the methods within a component, given
+        the summaries of the methods that they call."""
+        methods = call_graph.methods
+        index = call_graph.index
+
+        def summarise(node: int) -> Any:
+            calls = [(call, None if call.callee is None
+                      else summaries[index[call.callee]])
+                     for call in call_graph.calls[node]]
+            return analysis.summarise(methods[node], calls)
+
+        number = component[nodes[0]]
+        is_recursive = len(nodes) > 1 or nodes[0] in call_graph.successors[nodes[0]]
+        if not is_recursive:
+            summaries[nodes[0]] = summarise(nodes[0])
+            return
+
+        for node in nodes:
+            summaries[node] = analysis.initial(methods[node])
+        for _ in range(MAX_ITERATIONS):
+            changed = False
+            for node in nodes:
+                summary = summarise(node)
+                if summary != summaries[node]:
+                    summaries[node] = summary
+                    changed = True
+            if not changed:
+                return
+        names = ', '.join(methods[n].qual_name for n in nodes)
+        m = f"summaries did not converge for component {number}: {names}"
+        raise RuntimeError(m)
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def __getitem__(self, method: Method) -> S:
+        """Returns the summary of a given method.
+
+        Raises
+        ------
+        KeyError
+            If the method does not belong to the call graph.
+        """
+        return self._summaries[self.call_graph.index[method]]
+
+    def items(self) -> Iterable[Tuple[Method, S]]:
+        """Iterates over each method together with its summary."""
+        return zip(self.call_graph.methods, self._summaries)
+
+    def as_mapping(self) -> Mapping[Method, S]:
+        return dict(self.items())
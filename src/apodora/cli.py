@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides the :code:`apodora` command-line interface.
+"""
+__all__ = ('main', 'analyse_module_file')
+
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Set, TextIO)
+import argparse
+import itertools
+import json
+import os
+import sys
+import typing
+
+from .lazy import configure_logger
+from .loader import ModuleFile, find_modules
+from .models import Program
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+DEFAULT_PYTHON = '{}.{}'.format(*sys.version_info)
+DEFAULT_SOCKET = '.apodora.sock'
+
+
+def analyse_module_file(module_file: ModuleFile,
+                        python: str = DEFAULT_PYTHON,
+                        *,
+                        stdlib_ast: bool = False
+                        ) -> Dict[str, Any]:
+    """Analyses a single module and returns a JSON-serialisable record of
+    its imports, methods and control-flow graph statistics.
+
+    If the module cannot be analysed, the record instead holds an
+    :code:`error` entry that describes the failure.
+    """
+    record: Dict[str, Any] = {'module': module_file.name,
+                              'filename': module_file.filename,
+                              'package': module_file.is_package}
+    try:
+        source = module_file.read()
+        packages = [module_file.name] if module_file.is_package else []
+        program = Program.from_sources(python,
+                                       {module_file.name: source},
+                                       main_module=module_file.name,
+                                       packages=packages,
+                                       stdlib_ast=stdlib_ast)
+        module = program.modules[module_file.name]
+        cfg = module.cfg
+        record['imports'] = sorted(module.imports)
+        record['methods'] = sorted(module.methods)
+        record['cfg'] = {'blocks': len(cfg),
+                         'edges': cfg.num_edges,
+                         'reachable_blocks': len(cfg.reachable_blocks())}
+    except (SyntaxError, ValueError, NotImplementedError, RecursionError) as err:
+        record['error'] = f'{err.__class__.__name__}: {err}'
+    return record
+
+
+def _analyse_batch(module_files: Sequence[ModuleFile],
+                   python: str,
+                   stdlib_ast: bool
+                   ) -> List[str]:
+    # records are serialised by the worker to keep the parent process idle
+    return [json.dumps(analyse_module_file(m, python, stdlib_ast=stdlib_ast))
+            for m in module_files]
+
+
+def _configure_logging(level: str) -> None:
+    # loguru is only imported once a message is logged
+    configure_logger(level)
+
+
+def _batched(items: Iterable[ModuleFile], size: int) -> Iterator[List[ModuleFile]]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _recover_completed_modules(filename: str) -> Set[str]:
+    """Reads the names of the modules recorded by a previous run.
+
+    If the previous run crashed midway through writing a record, the
+    partial record is truncated from the file so that it can be appended to.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(filename):
+        return completed
+    valid_up_to = 0
+    with open(filename, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                completed.add(json.loads(line)['module'])
+            except (ValueError, KeyError, TypeError):
+                break
+            valid_up_to += len(line)
+    with open(filename, 'ab') as f:
+        f.truncate(valid_up_to)
+    return completed
+
+
+def _write_lines(output: TextIO, lines: Iterable[str]) -> None:
+    for line in lines:
+        output.write(line)
+        output.write('\n')
+    output.flush()
+
+
+def _run_analyse(args: argparse.Namespace) -> int:
+    if args.resume and args.output == '-':
+        print("error: --resume requires --output to name a file", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.directory):
+        print(f"error: not a directory: {args.directory}", file=sys.stderr)
+        return 2
+
+    completed = _recover_completed_modules(args.output) if args.resume else set()
+    module_files = (m for m in find_modules(args.directory)
+                    if m.name not in completed)
+    batches = _batched(module_files, args.batch_size)
+
+    output: TextIO
+    if args.output == '-':
+        output = sys.stdout
+    else:
+        output = open(args.output, 'a' if args.resume else 'w', encoding='utf-8')
+
+    try:
+        if args.jobs == 1:
+            for batch in batches:
+                _write_lines(output, _analyse_batch(batch, args.python, args.stdlib_ast))
+            return 0
+
+        from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                        as_completed, wait)
+
+        # bound the number of batches in flight so that memory use does not
+        # grow with the size of the source tree
+        max_pending = 2 * args.jobs
+        executor: 'Executor'
+        with ProcessPoolExecutor(max_workers=args.jobs,
+                                 initializer=_configure_logging,
+                                 initargs=(args.log_level,)) as executor:
+            pending: Set['Future'] = set()
+            for batch in batches:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _write_lines(output, future.result())
+                pending.add(executor.submit(_analyse_batch, batch,
+                                            args.python, args.stdlib_ast))
+            for future in as_completed(pending):
+                _write_lines(output, future.result())
+        return 0
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def _run_daemon(args: argparse.Namespace) -> int:
+    from .daemon import AnalysisServer, Workspace
+    if not os.path.isdir(args.directory):
+        print(f"error: not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    path = args.socket or os.path.join(args.directory, DEFAULT_SOCKET)
+    workspace = Workspace.load(args.directory, args.python,
+                               stdlib_ast=args.stdlib_ast)
+    try:
+        server = AnalysisServer(path, workspace, interval=args.interval)
+    except ValueError as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+    with server:
+        print(f"listening on {path}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def _run_query(args: argparse.Namespace) -> int:
+    from .daemon import QueryError, query
+    arguments = {name: value
+                 for name, value in (('module', args.module),
+                                     ('method', args.method))
+                 if value is not None}
+    try:
+        result = query(args.socket, args.query, timeout=args.timeout, **arguments)
+    except QueryError as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+    except OSError as err:
+        print(f"error: failed to reach daemon at {args.socket}: {err}",
+              file=sys.stderr)
+        return 2
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='apodora',
+        description='A static analysis framework for Python.')
+    parser.add_argument('--log-level', default='WARNING',
+                        help='the minimum level of log messages to report')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    analyse = subparsers.add_parser(
+        'analyse',
+        help='analyse a source tree and emit one JSON record per module')
+    analyse.add_argument('directory',
+                         help='the root directory of the source tree')
+    analyse.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                         help='the number of worker processes to use')
+    analyse.add_argument('-o', '--output', default='-',
+                         help='the file to which records are written')
+    analyse.add_argument('--resume', action='store_true',
+                         help='skip modules already recorded in the output file')
+    analyse.add_argument('--python', default=DEFAULT_PYTHON,
+                         help='the version of Python used by the source tree')
+    analyse.add_argument('--stdlib-ast', action='store_true',
+                         help='parse Python 3 sources using the stdlib parser')
+    analyse.add_argument('--batch-size', type=int, default=16,
+                         help='the number of modules sent to a worker at once')
+    analyse.set_defaults(func=_run_analyse)
+
+    daemon = subparsers.add_parser(
+        'daemon',
+        help='keep a source tree loaded and answer queries over a socket')
+    daemon.add_argument('directory',
+                        help='the root directory of the source tree')
+    daemon.add_argument('--socket',
+                        help=f'the socket to listen on [default: DIRECTORY/{DEFAULT_SOCKET}]')
+    daemon.add_argument('--interval', type=float, default=1.0,
+                        help='the number of seconds between scans for changes')
+    daemon.add_argument('--python', default=DEFAULT_PYTHON,
+                        help='the version of Python used by the source tree')
+    daemon.add_argument('--stdlib-ast', action='store_true',
+                        help='parse Python 3 sources using the stdlib parser')
+    daemon.set_defaults(func=_run_daemon)
+
+    query = subparsers.add_parser(
+        'query',
+        help='send a query to a running daemon and print its result')
+    query.add_argument('query',
+                       help='the query to send (e.g., modules, imports, cfg)')
+    query.add_argument('--socket', default=DEFAULT_SOCKET,
+                       help='the socket on which the daemon is listening')
+    query.add_argument('--module', help='the module to query')
+    query.add_argument('--method', help='the method to query')
+    query.add_argument('--timeout', type=float, default=30.0,
+                       help='the number of seconds to wait for a response')
+    query.set_defaults(func=_run_query)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'jobs', 1) < 1 or getattr(args, 'batch_size', 1) < 1:
+        parser.error('--jobs and --batch-size must be positive')
+    _configure_logging(args.log_level)
+    return args.func(args)
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a long-running analysis daemon, which keeps a
+program resident in memory, watches its source tree for changes, and
+answers queries about it over a Unix domain socket.
+
+Requests and responses are exchanged as JSON objects, one per line. Each
+request names a :code:`query` together with its arguments, e.g.::
+
+    {"query": "imports", "module": "foo.bar"}
+
+and is answered by either :code:`{"ok": true, "result": ...}` or
+:code:`{"ok": false, "error": "..."}`. A connection may be used for any
+number of requests.
+"""
+__all__ = ('QUERIES', 'QueryError', 'Workspace', 'AnalysisServer', 'query')
+
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, Optional,
+                    Set, Tuple)
+import json
+import os
+import socket
+import socketserver
+import threading
+
+import attr
+
+from .lazy import logger
+from .loader import ModuleFile, find_modules
+from .models import Module, Program
+
+#: the passes that are run on a module as soon as it is loaded or changed
+_EAGER_PASSES = ('ast', 'imports', 'methods')
+
+
+class QueryError(Exception):
+    """Raised when the daemon cannot answer a query."""
+
+
+@attr.s(slots=True, eq=False)
+class Workspace:
+    """Maintains a program that mirrors the Python modules within a source
+    tree.
+
+    When the tree is rescanned, only modules whose files have been added,
+    modified or removed are reloaded; all other modules, and the analyses
+    that have been computed for them, are kept.
+
+    Attributes
+    ----------
+    directory: str
+        The root directory of the source tree.
+    program: Program
+        The program formed by the modules in the tree.
+    generation: int
+        Incremented whenever the program changes.
+    errors: Mapping[str, str]
+        Describes the modules that could not be analysed, indexed by name.
+    """
+    directory: str = attr.ib()
+    program: Program = attr.ib()
+    generation: int = attr.ib(default=0, init=False)
+    errors: Dict[str, str] = attr.ib(factory=dict, init=False, repr=False)
+    # the (modification time, size) of each module file when last loaded
+    _stamps: Dict[str, Tuple[int, int]] = \
+        attr.ib(factory=dict, init=False, repr=False)
+    _names: Dict[str, str] = attr.ib(factory=dict, init=False, repr=False)
+
+    @classmethod
+    def load(cls,
+             directory: str,
+             python: str,
+             *,
+             stdlib_ast: bool = False
+             ) -> 'Workspace':
+        """Loads and analyses all of the modules within a source tree."""
+        program = Program.for_python(python, stdlib_ast=stdlib_ast)
+        workspace = Workspace(os.path.abspath(directory), program)
+        workspace.refresh()
+        return workspace
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """Rescans the source tree and reloads any modules that have been
+        added, modified or removed since the last scan.
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            The names of the added, changed and removed modules.
+        """
+        added: List[str] = []
+        changed: List[str] = []
+        seen: Set[str] = set()
+        for module_file in find_modules(self.directory):
+            filename = module_file.filename
+            seen.add(filename)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(filename) == stamp:
+                continue
+            self._stamps[filename] = stamp
+            is_new = filename not in self._names
+            self._names[filename] = module_file.name
+            self._load(module_file)
+            (added if is_new else changed).append(module_file.name)
+
+        removed: List[str] = []
+        for filename in [f for f in self._names if f not in seen]:
+            name = self._names.pop(filename)
+            del self._stamps[filename]
+            self.errors.pop(name, None)
+            if name in self.program.modules:
+                self.program.remove_module(name)
+            removed.append(name)
+
+        changes = {'added': added, 'changed': changed, 'removed': removed}
+        if added or changed or removed:
+            self.generation += 1
+            logger.info(f'reloaded {len(added) + len(changed)} modules '
+                        f'and removed {len(removed)} (generation {self.generation})')
+        return changes
+
+    def _load(self, module_file: ModuleFile) -> None:
+        try:
+            source = module_file.read()
+        except OSError as err:
+            self.errors[module_file.name] = f'{err.__class__.__name__}: {err}'
+            return
+        module = self.program.load_module(module_file.name,
+                                          source,
+                                          is_package=module_file.is_package)
+        self.program.add_module(module)
+        analysis = module.analyse(_EAGER_PASSES)
+        if analysis.error is None:
+            self.errors.pop(module.name, None)
+        else:
+            error = analysis.error
+            self.errors[module.name] = f'{error.__class__.__name__}: {error}'
+
+    def module(self, name: str) -> Module:
+        """Returns the module with a given name.
+
+        Raises
+        ------
+        QueryError
+            If there is no such module, or if it could not be analysed.
+        """
+        if name in self.errors:
+            raise QueryError(f"module could not be analysed: {name} ({self.errors[name]})")
+        try:
+            return self.program.modules[name]
+        except KeyError:
+            raise QueryError(f"no such module: {name}") from None
+
+    def import_closure(self, name: str, *, reverse: bool = False) -> List[str]:
+        """Returns the names of the modules within the program that are
+        transitively imported by a given module or, if :code:`reverse` is
+        set, that transitively import it."""
+        self.module(name)
+        resolver = self.program.resolver
+        modules = self.program.modules
+        importers: Dict[str, List[str]] = {}
+        if reverse:
+            for importer in modules.values():
+                if importer.name in self.errors:
+                    continue
+                for imported in resolver.imported_modules(importer):
+                    importers.setdefault(imported.name, []).append(importer.name)
+        seen = {name}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            nexts: Iterable[str]
+            if reverse:
+                nexts = importers.get(current, ())
+            elif current in self.errors:
+                continue
+            else:
+                nexts = [m.name for m in resolver.imported_modules(modules[current])]
+            for next_name in nexts:
+                if next_name not in seen:
+                    seen.add(next_name)
+                    stack.append(next_name)
+        seen.discard(name)
+        return sorted(seen)
+
+
+def _query_status(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return {'directory': workspace.directory,
+            'python': workspace.program.python,
+            'generation': workspace.generation,
+            'modules': len(workspace.program.modules),
+            'errors': workspace.errors}
+
+
+def _query_refresh(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return workspace.refresh()
+
+
+def _query_modules(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return sorted(workspace.program.modules)
+
+
+def _query_imports(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return sorted(workspace.module(_argument(request, 'module')).imports)
+
+
+def _query_methods(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return sorted(workspace.module(_argument(request, 'module')).methods)
+
+
+def _query_cfg(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    module = workspace.module(_argument(request, 'module'))
+    method_name = _optional_argument(request, 'method')
+    try:
+        if method_name is None:
+            cfg = module.cfg
+        elif method_name in module.methods:
+            cfg = module.methods[method_name].cfg
+        else:
+            raise QueryError(f"no such method: {method_name}")
+    except NotImplementedError as err:
+        raise QueryError(f"cannot build control-flow graph: {err}") from err
+    return {'entry': cfg.entry.id,
+            'blocks': [block.id for block in cfg],
+            'edges': [[block.id, successor.id]
+                      for block in cfg for successor in block.successors],
+            'unreachable': sorted(b.id for b in cfg.unreachable_blocks())}
+
+
+def _query_reachable(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return workspace.import_closure(_argument(request, 'module'))
+
+
+def _query_dependents(workspace: Workspace, request: Mapping[str, Any]) -> Any:
+    return workspace.import_closure(_argument(request, 'module'), reverse=True)
+
+
+def _argument(request: Mapping[str, Any], name: str) -> str:
+    value = _optional_argument(request, name)
+    if value is None:
+        raise QueryError(f"missing argument: {name}")
+    return value
+
+
+def _optional_argument(request: Mapping[str, Any], name: str) -> Optional[str]:
+    value = request.get(name)
+    if value is not None and not isinstance(value, str):
+        raise QueryError(f"argument must be a string: {name}")
+    return value
+
+
+#: the queries answered by the daemon, indexed by name
+QUERIES: Mapping[str, Callable[[Workspace, Mapping[str, Any]], Any]] = {
+    'status': _query_status,
+    'refresh': _query_refresh,
+    'modules': _query_modules,
+    'imports': _query_imports,
+    'methods': _query_methods,
+    'cfg': _query_cfg,
+    'reachable': _query_reachable,
+    'dependents': _query_dependents,
+}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: 'AnalysisServer'
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.answer(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if response.get('result') == 'shutdown':
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class AnalysisServer(socketserver.ThreadingUnixStreamServer):
+    """Answers queries about a workspace over a Unix domain socket, while
+    periodically rescanning the workspace for changes.
+
+    Queries and rescans are serialised by a lock, so that each query sees
+    a consistent program.
+    """
+    daemon_threads = True
+
+    def __init__(self,
+                 path: str,
+                 workspace: Workspace,
+                 *,
+                 interval: float = 1.0
+                 ) -> None:
+        self.path = path
+        self.workspace = workspace
+        self.interval = interval
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+        _remove_stale_socket(path)
+        super().__init__(path, _RequestHandler)
+
+    def answer(self, line: bytes) -> Dict[str, Any]:
+        """Answers a single request, given as a line of JSON.
+
+        Errors raised while answering a query are reported to the client,
+        rather than closing the connection.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as err:
+            return {'ok': False, 'error': f"malformed request: {err}"}
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "request must be a JSON object"}
+
+        name = request.get('query')
+        if name == 'ping':
+            return {'ok': True, 'result': 'pong'}
+        if name == 'shutdown':
+            return {'ok': True, 'result': 'shutdown'}
+        if not isinstance(name, str) or name not in QUERIES:
+            return {'ok': False, 'error': f"unknown query: {name}"}
+        try:
+            with self.lock:
+                result = QUERIES[name](self.workspace, request)
+        except QueryError as err:
+            return {'ok': False, 'error': str(err)}
+        except Exception as err:
+            logger.exception(f'failed to answer query: {name}')
+            return {'ok': False, 'error': f'{err.__class__.__name__}: {err}'}
+        return {'ok': True, 'result': result}
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self.lock:
+                try:
+                    self.workspace.refresh()
+                except Exception:
+                    logger.exception('failed to rescan workspace')
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Answers queries until the server is shut down, rescanning the
+        workspace every :attr:`interval` seconds in the background."""
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+            watcher.join()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Removes a socket file left behind by a daemon that is no longer
+    running.
+
+    Raises
+    ------
+    ValueError
+        If a daemon is already listening on the socket.
+    """
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise ValueError(f"daemon already running on socket: {path}")
+
+
+def query(path: str,
+          name: str,
+          timeout: Optional[float] = 30.0,
+          **arguments: Any
+          ) -> Any:
+    """Sends a single query to the daemon listening on a given socket and
+    returns its result.
+
+    Raises
+    ------
+    QueryError
+        If the daemon cannot answer the query.
+    OSError
+        If the daemon cannot be reached.
+    """
+    request = dict(arguments, query=name)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with client.makefile('rb') as responses:
+            line = responses.readline()
+    if not line:
+        raise QueryError("daemon closed the connection without responding")
+    response = json.loads(line)
+    if not response.get('ok'):
+        raise QueryError(response.get('error', 'unknown error'))
+    return response['result']
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
 from .blocks import BlockVisitor
-from .imports import ImportVisitor, Py27ImportVisitor, Py3ImportVisitor
+from .fingerprints import Fingerprint, Fingerprinter
+from .imports import (ImportStatement, ImportVisitor, Py27ImportVisitor,
+                      Py3ImportVisitor)
 from .methods import MethodCollector, Py27MethodCollector, Py3MethodCollector
+from .resolution import ImportResolver, ModuleIndex, ResolvedImport
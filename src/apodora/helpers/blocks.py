@@ -4,9 +4,9 @@ __all__ = ('BlockVisitor',)
 from typing import List, Optional
 import typing
 
-from loguru import logger
 import attr
 
+from ..lazy import logger
 from ..util import StmtVisitor, Py27StmtVisitor, Py3StmtVisitor
 
 from ..models import BasicBlock, BlockNumbering
@@ -18,6 +18,7 @@ if typing.TYPE_CHECKING:
 @attr.s(slots=True)
 class BlockVisitor(StmtVisitor):
     numbering: BlockNumbering = attr.ib(factory=BlockNumbering)
+    blocks: List[BasicBlock] = attr.ib(factory=list, init=False, repr=False)
     entry: BasicBlock = attr.ib(init=False)
     _block: BasicBlock = attr.ib(init=False)
     _loop_header_block: Optional[BasicBlock] = attr.ib(default=None)
@@ -51,6 +52,7 @@ class BlockVisitor(StmtVisitor):
                      ) -> BasicBlock:
         block = BasicBlock.create_with_numbering(self.numbering)
         block.terminal = terminal
+        self.blocks.append(block)
         if predecessors:
             block.predecessors = predecessors
         if successors:
@@ -62,26 +64,35 @@ class BlockVisitor(StmtVisitor):
 
     def visit_FunctionDef(self, node) -> None:
         self._block.stmts.append(node)
-        print(f"DO NOT GO INSIDE FUNCTION: {node}")
+        logger.debug(f"Not entering function definition: {node.name}")
 
     def visit_For(self, node) -> None:
-        if node.orelse:
-            m = "no handling of orelse for For statements"
-            raise NotImplementedError(m)
+        # the iterable is evaluated once, before the loop begins
+        self._block.stmts.append(node.iter)
+        self._visit_loop(node)
 
+    def visit_AsyncFor(self, node) -> None:
+        self.visit_For(node)
+
+    def visit_While(self, node) -> None:
+        self._visit_loop(node)
+
+    def _visit_loop(self, node) -> None:
         outer_loop_header_block = self._loop_header_block
         outer_loop_end_block = self._loop_end_block
 
-        # the current block will be known as the loop header block
-        loop_header_block = self._block
+        # the loop header (i.e., the test of a while loop, or the assignment
+        # of the target of a for loop) is placed in a block of its own, as
+        # it is reached again after each iteration
+        loop_header_block = self.create_block()
         loop_header_block.stmts.append(node)
+        self.create_link(self._block, loop_header_block)
         self._loop_header_block = loop_header_block
         logger.debug(f"Loop header block: {loop_header_block}")
 
-        # create a block for after the loop
+        # create a block for after the loop, which breaks jump to directly
         loop_end_block = self.create_block()
         logger.debug(f"Loop end block: {loop_end_block}")
-        self.create_link(loop_header_block, loop_end_block)
         self._loop_end_block = loop_end_block
 
         # handle the body of the loop
@@ -91,18 +102,38 @@ class BlockVisitor(StmtVisitor):
         self._block = loop_body_block
         for stmt in node.body:
             self.visit(stmt)
-
-        # unless we've encountered a break/continue, connect the last
-        # basic block inside the loop to both the header and end of the loop
         if not self._block.successors:
-            self._block.successors += [loop_header_block, loop_end_block]
+            self.create_link(self._block, loop_header_block)
+
+        # the orelse is executed once the loop is exhausted, but not after
+        # a break
+        self._loop_header_block = outer_loop_header_block
+        self._loop_end_block = outer_loop_end_block
+        else_block = self.create_block()
+        logger.debug(f"Loop else block: {else_block}")
+        self.create_link(loop_header_block, else_block)
+        self._block = else_block
+        for stmt in node.orelse:
+            self.visit(stmt)
+        self.create_link(self._block, loop_end_block)
 
         # switch to building the loop end block
         self._block = loop_end_block
 
-        # restore the previous loop header and end blocks, if any
-        self._loop_header_block = outer_loop_header_block
-        self._loop_end_block = outer_loop_end_block
+    def visit_With(self, node) -> None:
+        # the context managers are entered before the body is executed
+        self._block.stmts.append(node)
+        for stmt in node.body:
+            self.visit(stmt)
+
+    def visit_AsyncWith(self, node) -> None:
+        self.visit_With(node)
+
+    def visit_Match(self, node) -> None:
+        self._block.stmts.append(node)
+
+    def visit_TryStar(self, node) -> None:
+        self._block.stmts.append(node)
 
     def visit_If(self, node) -> None:
         # end the current block
@@ -117,6 +148,7 @@ class BlockVisitor(StmtVisitor):
         self._block = body_block
         for stmt in node.body:
             self.visit(stmt)
+        body_end_block = self._block
 
         # orelse
         else_block = self.create_block()
@@ -125,12 +157,14 @@ class BlockVisitor(StmtVisitor):
         self._block = else_block
         for stmt in node.orelse:
             self.visit(stmt)
+        else_end_block = self._block
 
-        # after the ifelse
+        # after the ifelse, which is reached from the last block of each
+        # branch (i.e., after any nested control flow within the branch)
         after_block = self.create_block()
         logger.debug(f"If after block: {after_block}")
-        self.create_link(body_block, after_block)
-        self.create_link(else_block, after_block)
+        self.create_link(body_end_block, after_block)
+        self.create_link(else_end_block, after_block)
         self._block = after_block
 
     def visit_Return(self, node) -> None:
@@ -142,7 +176,14 @@ class BlockVisitor(StmtVisitor):
         assert self.inside_loop
         assert self._loop_end_block
         self._block.stmts.append(node)
-        self._block.successors.append(self._loop_end_block)
+        self.create_link(self._block, self._loop_end_block)
+        self._block = self.create_block(terminal=True)  # unreachable
+
+    def visit_Continue(self, node) -> None:
+        assert self.inside_loop
+        assert self._loop_header_block
+        self._block.stmts.append(node)
+        self.create_link(self._block, self._loop_header_block)
         self._block = self.create_block(terminal=True)  # unreachable
 
 
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+This module computes structural fingerprints of abstract syntax trees.
+
+The fingerprint of a node is a Merkle hash: it is computed from the class
+of the node, its scalar fields, and the fingerprints of its children.
+Two subtrees have the same fingerprint if and only if (barring hash
+collisions) they have the same structure, regardless of their formatting,
+comments and type comments. Locations are ignored unless requested.
+"""
+__all__ = ('Fingerprint', 'Fingerprinter')
+
+from hashlib import blake2b
+from typing import Any, Dict, List, Mapping, Tuple
+
+import attr
+
+#: fields that do not contribute to the structure of a tree
+_IGNORED_FIELDS = frozenset({'type_comment', 'type_ignores'})
+_FUNCTIONS = frozenset({'FunctionDef', 'AsyncFunctionDef'})
+_DIGEST_SIZE = 16
+
+#: the tag, hashed fields, and whether it is a function, for each node class
+_LAYOUTS: Dict[type, Tuple[bytes, Tuple[str, ...], bool]] = {}
+
+
+def _layout(cls: type) -> Tuple[bytes, Tuple[str, ...], bool]:
+    kind = cls.__name__
+    is_function = kind in _FUNCTIONS
+    # the names of functions are hashed separately (see Fingerprinter)
+    ignored = _IGNORED_FIELDS | {'name'} if is_function else _IGNORED_FIELDS
+    fields = tuple(f for f in getattr(cls, '_fields') if f not in ignored)
+    layout = (kind.encode('ascii'), fields, is_function)
+    _LAYOUTS[cls] = layout
+    return layout
+
+
+@attr.s(slots=True, frozen=True, auto_attribs=True)
+class Fingerprint:
+    """Describes the structure of a syntax tree.
+
+    Attributes
+    ----------
+    digest: bytes
+        The structural hash of the tree.
+    size: int
+        The number of nodes in the tree.
+    """
+    digest: bytes = attr.ib(repr=False)
+    size: int
+
+    def __str__(self) -> str:
+        return self.digest.hex()
+
+    def hex(self) -> str:
+        return self.digest.hex()
+
+
+@attr.s(slots=True)
+class Fingerprinter:
+    """Computes the fingerprint of a tree, together with the fingerprints
+    of the functions within it, in a single bottom-up traversal.
+
+    The fingerprint of a function excludes its name, so that functions
+    that differ only in name are recognised as duplicates. The name of the
+    function still contributes to the fingerprint of the tree that
+    contains it.
+
+    Attributes
+    ----------
+    locations: bool
+        If :code:`True`, the locations of nodes contribute to their
+        fingerprints.
+    functions: Dict[Any, Fingerprint]
+        The fingerprint of each function visited so far, indexed by its
+        node.
+    """
+    locations: bool = attr.ib(default=False)
+    functions: Dict[Any, Fingerprint] = attr.ib(factory=dict, repr=False)
+
+    @classmethod
+    def compute(cls,
+                node: Any,
+                *,
+                locations: bool = False
+                ) -> Tuple[Fingerprint, Mapping[Any, Fingerprint]]:
+        """Computes the fingerprint of a given tree and of each function
+        within it."""
+        fingerprinter = cls(locations)
+        return fingerprinter.visit(node), fingerprinter.functions
+
+    def visit(self, node: Any) -> Fingerprint:
+        key, size = self._visit(node)
+        if key.startswith(b'#'):
+            return Fingerprint(key[1:], size)
+        return Fingerprint(blake2b(key, digest_size=_DIGEST_SIZE).digest(), size)
+
+    def _visit(self, node: Any) -> Tuple[bytes, int]:
+        """Returns the key and size of a given node, where the key is either
+        the digest of the node, prefixed by #, or the encoding of a small
+        leaf node, prefixed by =."""
+        layout = _LAYOUTS.get(node.__class__)
+        if layout is None:
+            layout = _layout(node.__class__)
+        tag, fields, is_function = layout
+
+        visit = self._visit
+        encode = self._encode
+        parts: List[bytes] = [tag]
+        size = 1
+        for field in fields:
+            value = getattr(node, field, None)
+            if value.__class__ is list:
+                parts.append(b'[%d' % len(value))
+                for item in value:
+                    if hasattr(item, '_fields'):
+                        key, child_size = visit(item)
+                        parts.append(key)
+                        size += child_size
+                    else:
+                        parts.append(encode(item))
+            elif hasattr(value, '_fields'):
+                key, child_size = visit(value)
+                parts.append(key)
+                size += child_size
+            else:
+                parts.append(encode(value))
+        if self.locations:
+            parts += [encode(getattr(node, a, None)) for a in node._attributes]
+
+        data = b'\0'.join(parts)
+        # leaves whose encoding is no longer than a digest are not hashed
+        if size == 1 and len(data) < _DIGEST_SIZE:
+            return b'=' + data, size
+        digest = blake2b(data, digest_size=_DIGEST_SIZE).digest()
+        if is_function:
+            self.functions[node] = Fingerprint(digest, size)
+            name = encode(node.name)
+            digest = blake2b(digest + name, digest_size=_DIGEST_SIZE).digest()
+        return b'#' + digest, size
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if value is None:
+            return b'n'
+        if isinstance(value, str):
+            encoded = value.encode('utf-8', 'surrogatepass')
+            return b's%d:' % len(encoded) + encoded
+        if isinstance(value, bytes):
+            return b'b%d:' % len(value) + value
+        # numbers (and the singletons of the Python 2 grammar)
+        encoded = f'{type(value).__name__}:{value!r}'.encode('utf-8')
+        return b'v%d:' % len(encoded) + encoded
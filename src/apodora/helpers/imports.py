@@ -1,38 +1,166 @@
 # -*- coding: utf-8 -*-
-__all__ = ('ImportVisitor', 'Py27ImportVisitor', 'Py3ImportVisitor')
+__all__ = ('ImportStatement', 'ImportVisitor', 'Py27ImportVisitor',
+           'Py3ImportVisitor', 'absolute_module_name')
 
-from typing import Sequence, Set
+from typing import List, Optional, Sequence, Set
 
 import attr
 
 from ..util import NodeVisitor, Py27NodeVisitor, Py3NodeVisitor
 
 
+def absolute_module_name(importer: str,
+                         is_package: bool,
+                         level: int,
+                         module: Optional[str]
+                         ) -> str:
+    """Computes the absolute name of the module named by an import.
+
+    Parameters
+    ----------
+    importer: str
+        The name of the module that contains the import.
+    is_package: bool
+        Whether or not the importing module is a package (i.e., the
+        :code:`__init__` module for that package).
+    level: int
+        The number of leading dots in a relative import, or zero for an
+        absolute import.
+    module: Optional[str]
+        The module name that follows the dots, if any.
+
+    Returns
+    -------
+    str
+        The absolute name of the module. If a relative import reaches
+        beyond the top-level package, its name cannot be made absolute and
+        its relative spelling (e.g., :code:`..foo`) is returned instead.
+
+    Raises
+    ------
+    ValueError
+        If the import is relative and the importer is the :code:`__main__`
+        script.
+    """
+    if not level:
+        assert module is not None
+        return module
+    if importer == '__main__':
+        m = 'relative imports not allowed in __main__ script'
+        raise ValueError(m)
+    parts = importer.split('.')
+    # the package of a module is its parent, whereas a package is its own
+    strip = level - 1 if is_package else level
+    if strip >= len(parts):
+        return '.' * level + (module or '')
+    base = parts[:len(parts) - strip]
+    if module:
+        base.append(module)
+    return '.'.join(base)
+
+
+@attr.s(slots=True, auto_attribs=True, frozen=True)
+class ImportStatement:
+    """Describes a single name imported by an import statement.
+
+    Statements that import several names (e.g., :code:`import os, sys`)
+    are described by one :class:`ImportStatement` per name.
+
+    Attributes
+    ----------
+    module: str
+        The absolute name of the module that the import refers to. For
+        :code:`from` imports, this is the module from which names are
+        imported.
+    name: Optional[str]
+        The name imported from :code:`module` by a :code:`from` import,
+        which may be a submodule, an attribute or :code:`*`; :code:`None`
+        for plain imports.
+    asname: Optional[str]
+        The alias given to the imported name, if any.
+    level: int
+        The number of leading dots, for relative imports.
+    relative_module: Optional[str]
+        The module name that follows the leading dots of a relative import,
+        if any.
+    lineno: int
+        The line at which the import occurs.
+    """
+    module: str
+    name: Optional[str] = None
+    asname: Optional[str] = None
+    level: int = 0
+    relative_module: Optional[str] = None
+    lineno: int = 0
+
+    @property
+    def bound_name(self) -> str:
+        """The local name that is bound by this import.
+
+        For plain imports without an alias (e.g., :code:`import os.path`),
+        this is the name of the top-level package.
+        """
+        if self.asname:
+            return self.asname
+        if self.name is not None:
+            return self.name
+        return self.module.partition('.')[0]
+
+
 @attr.s(slots=True)
 class ImportVisitor(NodeVisitor):
-    """
-    Limitation: this doesn't track module aliases.
+    """Collects the imports within a module.
+
+    Attributes
+    ----------
+    module: str
+        The name of the module that is being visited.
+    is_package: bool
+        Whether or not that module is the :code:`__init__` of a package,
+        which determines how its relative imports are resolved.
+    imports: Set[str]
+        The absolute names of the modules that are imported.
+    statements: List[ImportStatement]
+        The individual names imported by the module, including aliases.
     """
     module: str = attr.ib()
+    is_package: bool = attr.ib(default=False)
     imports: Set[str] = attr.ib(factory=set)
-    _module_parts: Sequence[str] = attr.ib(init=False)
-
-    def __attrs_post_init__(self) -> None:
-        self._module_parts = self.module.split('.')
+    statements: List[ImportStatement] = attr.ib(factory=list)
 
     def visit_Import(self, node) -> None:
         for alias in node.names:
             self.imports.add(alias.name)
+            statement = ImportStatement(module=alias.name,
+                                        asname=alias.asname,
+                                        lineno=node.lineno)
+            self.statements.append(statement)
 
     def visit_ImportFrom(self, node) -> None:
-        if node.level:  # relative imports
-            if self.module == '__main__':
-                m = 'relative imports not allowed in __main__ script'
-                raise ValueError(m)
-            import_from = '.'.join(self._module_parts[:-node.level])
-        else:
-            import_from = node.module
+        import_from = absolute_module_name(self.module,
+                                           self.is_package,
+                                           node.level or 0,
+                                           node.module)
         self.imports.add(import_from)
+        for alias in node.names:
+            statement = ImportStatement(module=import_from,
+                                        name=alias.name,
+                                        asname=alias.asname,
+                                        level=node.level or 0,
+                                        relative_module=node.module,
+                                        lineno=node.lineno)
+            self.statements.append(statement)
+
+    @classmethod
+    def collect(cls,
+                module: str,
+                node,
+                *,
+                is_package: bool = False
+                ) -> Sequence[ImportStatement]:
+        visitor = cls(module, is_package)
+        visitor.visit(node)
+        return tuple(visitor.statements)
 
 
 class Py27ImportVisitor(ImportVisitor, Py27NodeVisitor):
@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 __all__ = ('MethodCollector', 'Py27MethodCollector', 'Py3MethodCollector')
 
-from typed_ast import ast27 as _ast27
-from typed_ast import ast3 as _ast3
 from typing import AbstractSet, Generic, MutableSet, Tuple, TypeVar
 import abc
 import typing
@@ -13,10 +11,12 @@ from ..models import Py27Method, Py3Method
 from ..util import NodeVisitor, Py27NodeVisitor, Py3NodeVisitor
 
 if typing.TYPE_CHECKING:
+    from typed_ast import ast27 as _ast27  # noqa: F401
+    from typed_ast import ast3 as _ast3  # noqa: F401
     from ..models import Module, Py27Module, Py3Module  # noqa: F401
 
 
-AT = TypeVar('AT', _ast27.FunctionDef, _ast3.FunctionDef)
+AT = TypeVar('AT', '_ast27.FunctionDef', '_ast3.FunctionDef')
 MOD = TypeVar('MOD', 'Py27Module', 'Py3Module')
 MTH = TypeVar('MTH', Py27Method, Py3Method)
 
@@ -34,18 +34,24 @@ class MethodCollector(Generic[AT, MOD, MTH], NodeVisitor):
         visitor.visit(module.ast)
         return frozenset(visitor.methods)
 
-    # TODO maintain qual name
+    def visit_ClassDef(self, node) -> None:
+        outer_dot_prefix = self._dot_prefix
+        self._dot_prefix = outer_dot_prefix + (node.name,)
+        self.generic_visit(node)
+        self._dot_prefix = outer_dot_prefix
 
     def visit_FunctionDef(self, node: AT) -> None:
         name = node.name
-        self._dot_prefix = self._dot_prefix + (name,)
-        qual_name = '.'.join(self._dot_prefix)
+        outer_dot_prefix = self._dot_prefix
+        qual_name = '.'.join(outer_dot_prefix + (name,))
 
         method = self._create_method(name, qual_name, node)
         self.methods.add(method)
 
+        # names defined inside a function are qualified by <locals>
+        self._dot_prefix = outer_dot_prefix + (name, '<locals>')
         self.generic_visit(node)
-        self._dot_prefix = self._dot_prefix[:-1]
+        self._dot_prefix = outer_dot_prefix
 
     @abc.abstractmethod
     def _create_method(self, name: str, qual_name: str, node: AT) -> MTH:
@@ -53,12 +59,12 @@ class MethodCollector(Generic[AT, MOD, MTH], NodeVisitor):
 
 
 class Py27MethodCollector(
-        MethodCollector[_ast27.FunctionDef, 'Py27Module', Py27Method],
+        MethodCollector['_ast27.FunctionDef', 'Py27Module', Py27Method],
         Py27NodeVisitor):
     def _create_method(self,
                        name: str,
                        qual_name: str,
-                       node: _ast27.FunctionDef
+                       node: '_ast27.FunctionDef'
                        ) -> Py27Method:
         return Py27Method(module=self.module,
                           name=name,
@@ -67,12 +73,12 @@ class Py27MethodCollector(
 
 
 class Py3MethodCollector(
-        MethodCollector[_ast3.FunctionDef, 'Py3Module', Py3Method],
+        MethodCollector['_ast3.FunctionDef', 'Py3Module', Py3Method],
         Py3NodeVisitor):
     def _create_method(self,
                        name: str,
                        qual_name: str,
-                       node: _ast3.FunctionDef
+                       node: '_ast3.FunctionDef'
                        ) -> Py3Method:
         return Py3Method(module=self.module,
                          name=name,
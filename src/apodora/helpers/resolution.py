@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+__all__ = ('ImportResolver', 'ModuleIndex', 'ResolvedImport')
+
+from typing import (Dict, Iterable, Iterator, Mapping, MutableMapping,
+                    Optional, Sequence, Tuple)
+import typing
+
+import attr
+
+from .imports import ImportStatement, absolute_module_name
+
+if typing.TYPE_CHECKING:
+    from ..models import Module, Program
+
+
+@attr.s(slots=True, eq=False)
+class _TrieNode:
+    children: Dict[str, '_TrieNode'] = attr.ib(factory=dict)
+    module: Optional['Module'] = attr.ib(default=None)
+
+
+@attr.s(slots=True, eq=False)
+class ModuleIndex:
+    """Indexes modules by their dotted names using a trie, where each node
+    corresponds to one component of a dotted name.
+
+    Lookups take time proportional to the length of the name, regardless
+    of the number of indexed modules.
+
+    Attributes
+    ----------
+    version: int
+        Incremented whenever a module is added to or removed from the index.
+    """
+    _root: _TrieNode = attr.ib(factory=_TrieNode, repr=False)
+    _size: int = attr.ib(default=0)
+    version: int = attr.ib(default=0)
+
+    @classmethod
+    def build(cls, modules: Iterable['Module']) -> 'ModuleIndex':
+        """Builds an index for a given collection of modules."""
+        index = ModuleIndex()
+        for module in modules:
+            index.add(module)
+        return index
+
+    @classmethod
+    def for_program(cls, program: 'Program') -> 'ModuleIndex':
+        """Builds an index for all modules within a given program."""
+        return cls.build(program.modules.values())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.find(name) is not None
+
+    def __iter__(self) -> Iterator['Module']:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.module is not None:
+                yield node.module
+            stack.extend(node.children.values())
+
+    def _node(self, name: str) -> Optional[_TrieNode]:
+        node: Optional[_TrieNode] = self._root
+        for part in name.split('.'):
+            assert node is not None
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def add(self, module: 'Module') -> None:
+        """Adds a module to the index, replacing any existing module with
+        the same name."""
+        node = self._root
+        for part in module.name.split('.'):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _TrieNode()
+            node = child
+        if node.module is None:
+            self._size += 1
+        node.module = module
+        self.version += 1
+
+    def remove(self, name: str) -> None:
+        """Removes the module with a given name from the index.
+
+        Raises
+        ------
+        KeyError
+            If no module with the given name is indexed.
+        """
+        path = [self._root]
+        parts = name.split('.')
+        for part in parts:
+            child = path[-1].children.get(part)
+            if child is None:
+                raise KeyError(name)
+            path.append(child)
+        if path[-1].module is None:
+            raise KeyError(name)
+        path[-1].module = None
+        self._size -= 1
+        self.version += 1
+
+        # prune nodes that no longer lead to any module
+        for part, node, parent in zip(reversed(parts),
+                                      reversed(path),
+                                      reversed(path[:-1])):
+            if node.module is not None or node.children:
+                break
+            del parent.children[part]
+
+    def find(self, name: str) -> Optional['Module']:
+        """Returns the module with a given name, if it is indexed."""
+        node = self._node(name)
+        return node.module if node else None
+
+    def find_longest_prefix(self, name: str) -> Tuple[Optional['Module'], int]:
+        """Finds the indexed module whose name is the longest prefix of a
+        given dotted name.
+
+        Returns
+        -------
+        Tuple[Optional[Module], int]
+            The module, if any, and the number of name components that it
+            covers.
+        """
+        best: Optional['Module'] = None
+        best_length = 0
+        node = self._root
+        for length, part in enumerate(name.split('.'), start=1):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.module is not None:
+                best, best_length = node.module, length
+        return best, best_length
+
+    def is_package(self, name: str) -> bool:
+        """Determines whether the module with a given name is a package,
+        either because it was loaded from an :code:`__init__` file or
+        because other indexed modules are nested beneath it."""
+        node = self._node(name)
+        if node is None:
+            return False
+        if node.module is not None and node.module.is_package:
+            return True
+        return bool(node.children)
+
+
+@attr.s(slots=True, auto_attribs=True, frozen=True)
+class ResolvedImport:
+    """Describes the result of resolving a single imported name.
+
+    Attributes
+    ----------
+    statement: ImportStatement
+        The import that was resolved.
+    name: str
+        The absolute dotted name of the imported object.
+    module: Optional[Module]
+        The module within the program to which the import refers, or
+        :code:`None` if the import refers to an external module.
+    attribute: Optional[str]
+        If the import refers to a name defined inside :code:`module`,
+        rather than to the module itself, the name of that attribute.
+    """
+    statement: ImportStatement
+    name: str
+    module: Optional['Module'] = attr.ib(default=None)
+    attribute: Optional[str] = None
+
+    @property
+    def bound_name(self) -> str:
+        """The local name bound by the import."""
+        return self.statement.bound_name
+
+    @property
+    def is_external(self) -> bool:
+        """True if the import refers to a module outside of the program."""
+        return self.module is None
+
+
+@attr.s(slots=True, eq=False)
+class ImportResolver:
+    """Maps the imports of modules within a program to the modules that
+    they refer to.
+
+    Resolutions are cached per module and are discarded whenever the
+    underlying index is modified.
+    """
+    index: ModuleIndex = attr.ib()
+    _cache: MutableMapping[str, Sequence[ResolvedImport]] = \
+        attr.ib(factory=dict, repr=False)
+    _cache_version: int = attr.ib(default=-1, repr=False)
+
+    @classmethod
+    def for_program(cls, program: 'Program') -> 'ImportResolver':
+        return ImportResolver(ModuleIndex.for_program(program))
+
+    def _absolute_module_name(self,
+                              importer: 'Module',
+                              statement: ImportStatement
+                              ) -> str:
+        if not statement.level:
+            return statement.module
+        # the statement was resolved by the import visitor using the
+        # module's own knowledge of whether or not it is a package, which
+        # the index may be able to correct
+        is_package = self.index.is_package(importer.name)
+        if is_package == importer.is_package:
+            return statement.module
+        return absolute_module_name(importer.name, is_package,
+                                    statement.level, statement.relative_module)
+
+    def resolve_statement(self,
+                          importer: 'Module',
+                          statement: ImportStatement
+                          ) -> ResolvedImport:
+        """Resolves a single import statement within a given module."""
+        from_name = self._absolute_module_name(importer, statement)
+
+        if statement.name is None or statement.name == '*':
+            return ResolvedImport(statement, from_name,
+                                  self.index.find(from_name))
+
+        # relative imports that could not be made absolute end with a dot
+        separator = '' if from_name.endswith('.') else '.'
+        name = f'{from_name}{separator}{statement.name}'
+        submodule = self.index.find(name)
+        if submodule is not None:
+            return ResolvedImport(statement, name, submodule)
+        module = self.index.find(from_name)
+        if module is not None:
+            return ResolvedImport(statement, name, module, statement.name)
+        return ResolvedImport(statement, name)
+
+    def resolve(self, module: 'Module') -> Sequence[ResolvedImport]:
+        """Resolves all imports within a given module, in order."""
+        if self._cache_version != self.index.version:
+            self._cache.clear()
+            self._cache_version = self.index.version
+        resolved = self._cache.get(module.name)
+        if resolved is None:
+            resolved = tuple(self.resolve_statement(module, statement)
+                             for statement in module.import_statements)
+            self._cache[module.name] = resolved
+        return resolved
+
+    def bindings(self, module: 'Module') -> Mapping[str, ResolvedImport]:
+        """Returns the resolved imports of a module, indexed by the local
+        names that they bind. Later imports shadow earlier ones, and star
+        imports are omitted."""
+        return {r.bound_name: r for r in self.resolve(module)
+                if r.statement.name != '*'}
+
+    def imported_modules(self, module: 'Module') -> Sequence['Module']:
+        """Returns the modules within the program that are imported by a
+        given module, without duplicates."""
+        seen: Dict[str, 'Module'] = {}
+        for resolved in self.resolve(module):
+            if resolved.module is not None and resolved.module is not module:
+                seen.setdefault(resolved.module.name, resolved.module)
+        return tuple(seen.values())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides deferred access to apodora's heavyweight dependencies
+(i.e., the typed_ast grammars, the stdlib ast module, and loguru) so that
+importing apodora remains cheap. Each dependency is only loaded when it is
+first used.
+"""
+__all__ = ('ast27', 'ast3', 'stdlib_ast', 'logger', 'configure_logger')
+
+from types import ModuleType
+from typing import Any, Optional
+import functools
+import sys
+import typing
+
+if typing.TYPE_CHECKING:
+    import loguru
+
+
+def ast27() -> ModuleType:
+    """Returns the typed_ast module for the Python 2.7 grammar."""
+    from typed_ast import ast27 as module
+    return module
+
+
+def ast3() -> ModuleType:
+    """Returns the typed_ast module for the Python 3 grammar."""
+    from typed_ast import ast3 as module
+    return module
+
+
+def stdlib_ast() -> ModuleType:
+    """Returns the standard library's ast module."""
+    import ast as module
+    return module
+
+
+_log_level: Optional[str] = None
+
+
+def _add_sink(logger: 'loguru.Logger', level: str) -> None:
+    logger.remove()
+    logger.add(sys.stderr, level=level)
+
+
+@functools.lru_cache(maxsize=None)
+def _loguru_logger() -> 'loguru.Logger':
+    from loguru import logger as _logger
+    if _log_level is not None:
+        _add_sink(_logger, _log_level)
+    return _logger
+
+
+def configure_logger(level: str) -> None:
+    """Reports log messages of at least a given level to stderr.
+
+    If loguru has not yet been imported, its configuration is deferred until
+    the first message is logged, so that processes that never log do not
+    pay for the import.
+    """
+    global _log_level
+    _log_level = level
+    if _loguru_logger.cache_info().currsize:
+        _add_sink(_loguru_logger(), level)
+
+
+class _LazyLogger:
+    """Forwards all attribute accesses to loguru's logger, which is only
+    imported when the first message is logged. The logger is looked up once
+    and then reused, as repeating the import on every call is costly within
+    hot loops."""
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_loguru_logger(), name)
+
+
+logger = typing.cast('loguru.Logger', _LazyLogger())
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides utilities for discovering the Python modules that
+belong to a source tree.
+"""
+__all__ = ('ModuleFile', 'find_modules', 'module_name_for_path')
+
+from typing import Iterator, Tuple
+import os
+
+import attr
+
+_IGNORED_DIRECTORIES = frozenset({'__pycache__', 'node_modules'})
+
+
+@attr.s(slots=True, auto_attribs=True, frozen=True)
+class ModuleFile:
+    """Describes a Python source file within a source tree.
+
+    Attributes
+    ----------
+    name: str
+        The fully qualified name of the module provided by the file.
+    filename: str
+        The absolute path to the file.
+    is_package: bool
+        True if the file is the :code:`__init__.py` of a package.
+    """
+    name: str
+    filename: str
+    is_package: bool = False
+
+    def read(self) -> str:
+        """Reads the source code for this module."""
+        with open(self.filename, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+
+def module_name_for_path(directory: str, filename: str) -> Tuple[str, bool]:
+    """Determines the name of the module provided by a given file.
+
+    Returns
+    -------
+    Tuple[str, bool]
+        The fully qualified name of the module, relative to the given root
+        directory, and whether or not that module is a package.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a Python source file inside the directory.
+    """
+    relative = os.path.relpath(filename, directory)
+    if relative.startswith(os.pardir) or not relative.endswith('.py'):
+        raise ValueError(f"not a Python source file inside {directory}: {filename}")
+    parts = relative[:-3].split(os.sep)
+    is_package = parts[-1] == '__init__'
+    if is_package:
+        parts = parts[:-1]
+    if not parts:
+        raise ValueError(f"cannot name the root package of {directory}")
+    return '.'.join(parts), is_package
+
+
+def find_modules(directory: str) -> Iterator[ModuleFile]:
+    """Finds all Python modules inside a given directory, in sorted order.
+
+    Hidden directories, :code:`__pycache__` directories, and files whose
+    names are not valid module names are skipped.
+    """
+    directory = os.path.abspath(directory)
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d.isidentifier() and d not in _IGNORED_DIRECTORIES)
+        for filename in sorted(filenames):
+            stem, ext = os.path.splitext(filename)
+            if ext != '.py' or not stem.isidentifier():
+                continue
+            if root == directory and stem == '__init__':
+                continue
+            path = os.path.join(root, filename)
+            name, is_package = module_name_for_path(directory, path)
+            yield ModuleFile(name, path, is_package)
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+This module attributes the memory retained by a program to its modules,
+and to the kinds of data (e.g., sources and syntax trees) held for each
+module.
+"""
+__all__ = ('CATEGORIES', 'MemoryReport', 'PhaseUsage', 'deep_sizeof',
+           'measure_phases')
+
+from types import FunctionType, ModuleType
+from typing import (Any, Collection, Dict, Iterable, List, Mapping, Optional,
+                    Set, Tuple)
+import sys
+import tracemalloc
+import typing
+
+import attr
+
+if typing.TYPE_CHECKING:
+    from .models import Module, Program
+
+#: the categories to which memory is attributed, in order of attribution
+CATEGORIES: Tuple[str, ...] = (
+    'source',
+    'ast',
+    'cfg',
+    'methods',
+    'imports',
+    'fingerprints',
+)
+
+# the lazily computed fields of a module that belong to each category
+_MODULE_FIELDS: Mapping[str, Tuple[str, ...]] = {
+    'ast': ('_ast',),
+    'cfg': ('_cfg',),
+    'methods': ('_methods',),
+    'imports': ('_import_statements', '_imports'),
+    'fingerprints': ('_fingerprint', '_function_fingerprints'),
+}
+
+_OPAQUE_TYPES = (type, ModuleType, FunctionType)
+
+
+def _slots(cls: type) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        yield from slots
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Computes the number of bytes retained by an object, including the
+    objects that it (transitively) refers to.
+
+    Objects whose identities belong to :code:`seen` are not counted, and
+    every object that is counted is added to :code:`seen`, such that a
+    shared set may be used to count each object at most once across many
+    calls. Classes, functions and modules are never counted.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        identity = id(obj)
+        if identity in seen or isinstance(obj, _OPAQUE_TYPES):
+            continue
+        seen.add(identity)
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack += obj.keys()
+            stack += obj.values()
+            continue
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            stack += obj
+            continue
+        if isinstance(obj, Mapping):
+            # e.g., a read-only view of a mapping
+            stack += obj.keys()
+            stack += obj.values()
+        attributes = getattr(obj, '__dict__', None)
+        if attributes is not None:
+            stack.append(attributes)
+        for slot in _slots(type(obj)):
+            value = getattr(obj, slot, None)
+            if value is not None:
+                stack.append(value)
+    return size
+
+
+@attr.s(slots=True, frozen=True, auto_attribs=True)
+class PhaseUsage:
+    """Describes the memory allocated while an analysis phase was run.
+
+    Attributes
+    ----------
+    allocated: int
+        The net number of bytes allocated by the phase and still held once
+        it had finished.
+    peak: int
+        The largest number of bytes held at once during the phase, relative
+        to the start of the phase.
+    """
+    allocated: int
+    peak: int
+
+
+def measure_phases(program: 'Program',
+                   passes: Iterable[str]
+                   ) -> Dict[str, PhaseUsage]:
+    """Runs the given analysis passes over every module of a program, one
+    pass at a time, and uses tracemalloc to measure the memory allocated
+    by each pass.
+
+    Passes that have already been computed for a module are not rerun, and
+    errors raised by a pass are ignored. Tracing slows down analysis
+    considerably, and is stopped afterwards unless it was already running.
+
+    Raises
+    ------
+    ValueError
+        If an unknown pass is given.
+    """
+    from .models.module import validate_passes
+    passes = list(passes)
+    validate_passes(passes)
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    reset_peak = getattr(tracemalloc, 'reset_peak', None)
+    usage: Dict[str, PhaseUsage] = {}
+    try:
+        for name in passes:
+            if reset_peak is not None:
+                reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            sampled_peak = start
+            for module in list(program.modules.values()):
+                try:
+                    getattr(module, name)
+                except Exception:
+                    pass
+                sampled_peak = max(sampled_peak, tracemalloc.get_traced_memory()[0])
+            current, peak = tracemalloc.get_traced_memory()
+            if reset_peak is None:
+                # without reset_peak, only the peak between modules is known
+                peak = sampled_peak
+            usage[name] = PhaseUsage(allocated=current - start,
+                                     peak=max(peak - start, 0))
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return usage
+
+
+def _module_usage(module: 'Module', seen: Set[int]) -> Dict[str, int]:
+    usage = {'source': deep_sizeof(module.source, seen)}
+    for category in CATEGORIES[1:]:
+        size = 0
+        for field in _MODULE_FIELDS[category]:
+            # only fields that have already been computed are counted
+            if hasattr(module, field):
+                size += deep_sizeof(getattr(module, field), seen)
+        if category == 'cfg' and hasattr(module, '_methods'):
+            for method in module.methods.values():
+                if hasattr(method, '_cfg'):
+                    size += deep_sizeof(getattr(method, '_cfg'), seen)
+        usage[category] = size
+    return usage
+
+
+@attr.s(slots=True, frozen=True)
+class MemoryReport:
+    """Describes the memory retained by each module of a program, broken
+    down by category (see :data:`CATEGORIES`).
+
+    Each object is counted once: an object that is shared between
+    categories or modules is attributed to whichever category, and then
+    module, is counted first. Only analyses that have already been
+    computed are counted.
+
+    Attributes
+    ----------
+    modules: Mapping[str, Mapping[str, int]]
+        The number of bytes retained in each category, for each module.
+    phases: Mapping[str, PhaseUsage]
+        The memory allocated by each analysis phase, if it was measured.
+    """
+    modules: Mapping[str, Mapping[str, int]] = attr.ib(repr=False)
+    phases: Mapping[str, PhaseUsage] = attr.ib(factory=dict, repr=False)
+
+    @classmethod
+    def for_program(cls,
+                    program: 'Program',
+                    *,
+                    phases: Optional[Collection[str]] = None
+                    ) -> 'MemoryReport':
+        """Measures the memory retained by a given program.
+
+        Parameters
+        ----------
+        phases: Optional[Collection[str]]
+            If given, these analysis passes are first run for every module
+            while their allocations are measured (see
+            :func:`measure_phases`).
+        """
+        usage = measure_phases(program, phases) if phases else {}
+        # objects that are shared by all modules are not attributed to any
+        seen: Set[int] = {id(program)}
+        seen.update(id(m) for m in program.modules.values())
+        modules = {name: _module_usage(module, seen)
+                   for name, module in program.modules.items()}
+        return MemoryReport(modules, usage)
+
+    @property
+    def totals(self) -> Dict[str, int]:
+        """The number of bytes retained in each category, across all
+        modules."""
+        totals = dict.fromkeys(CATEGORIES, 0)
+        for usage in self.modules.values():
+            for category, size in usage.items():
+                totals[category] = totals.get(category, 0) + size
+        return totals
+
+    @property
+    def total(self) -> int:
+        """The number of bytes retained by all modules."""
+        return sum(self.totals.values())
+
+    def module_totals(self) -> Dict[str, int]:
+        """Returns the number of bytes retained by each module."""
+        return {name: sum(usage.values())
+                for name, usage in self.modules.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-serialisable description of this report."""
+        return {'modules': {n: dict(u) for n, u in self.modules.items()},
+                'phases': {n: attr.asdict(u) for n, u in self.phases.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> 'MemoryReport':
+        """Loads a report from its dictionary description."""
+        phases = {n: PhaseUsage(**u) for n, u in d.get('phases', {}).items()}
+        return MemoryReport(dict(d['modules']), phases)
+
+    def diff(self, baseline: 'MemoryReport') -> 'MemoryReport':
+        """Returns a report that holds the change in memory use from a
+        given baseline to this report. Modules that only belong to one of
+        the reports are treated as retaining no memory in the other."""
+        modules: Dict[str, Dict[str, int]] = {}
+        for name in set(self.modules) | set(baseline.modules):
+            after = self.modules.get(name, {})
+            before = baseline.modules.get(name, {})
+            modules[name] = {c: after.get(c, 0) - before.get(c, 0)
+                             for c in set(after) | set(before)}
+        phases = {}
+        for name in set(self.phases) & set(baseline.phases):
+            after_phase = self.phases[name]
+            before_phase = baseline.phases[name]
+            phases[name] = PhaseUsage(
+                allocated=after_phase.allocated - before_phase.allocated,
+                peak=after_phase.peak - before_phase.peak)
+        return MemoryReport(modules, phases)
+
+    def format(self, top: int = 10) -> str:
+        """Formats this report as a table of the totals for each category
+        and the modules that retain the most memory."""
+        lines: List[str] = [f'{"category":<12} {"bytes":>12}']
+        for category, size in self.totals.items():
+            lines.append(f'{category:<12} {size:>12,}')
+        lines.append(f'{"total":<12} {self.total:>12,}')
+
+        module_totals = self.module_totals()
+        largest = sorted(module_totals, key=lambda n: abs(module_totals[n]),
+                         reverse=True)[:top]
+        if largest:
+            lines += ['', f'{"module":<30} {"bytes":>14}']
+            lines += [f'{name:<30} {module_totals[name]:>14,}' for name in largest]
+        if self.phases:
+            lines += ['', f'{"phase":<12} {"allocated":>14} {"peak":>14}']
+            lines += [f'{n:<12} {u.allocated:>14,} {u.peak:>14,}'
+                      for n, u in self.phases.items()]
+        return '\n'.join(lines)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from .block import BasicBlock, BlockNumbering
+from .cfg import ControlFlowGraph
 from .method import Method, Py27Method, Py3Method
-from .module import Module, Py27Module, Py3Module
+from .module import Module, ModuleAnalysis, Py27Module, Py3Module
 from .program import Program, Py27Program, Py3Program
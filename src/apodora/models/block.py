@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
-__all__ = ('BasicBlock', 'BlockNumbering')
+__all__ = ('BasicBlock', 'BlockNumbering', 'EdgeList')
 
 from collections import deque
-from typing import Any, Deque, Iterator, List, Set
+from typing import Any, Deque, Iterable, Iterator, List, NoReturn, Set, Tuple
 
 import attr
 
@@ -21,12 +21,84 @@ class BlockNumbering(Iterator[int]):
         return num
 
 
+class EdgeList(List['BasicBlock']):
+    """Holds the predecessors or successors of a block that belongs to a
+    control-flow graph. The list is read-only, as edges must be modified
+    via the graph (see :meth:`ControlFlowGraph.add_edge`) so that the
+    indexes derived from it are rebuilt."""
+    __slots__ = ()
+
+    def _read_only(self) -> NoReturn:
+        m = "edges of a block within a control-flow graph must be modified via the graph"
+        raise TypeError(m)
+
+    def __reduce__(self) -> Tuple[type, Tuple[List['BasicBlock']]]:
+        return EdgeList, (list(self),)
+
+    def append(self, block: 'BasicBlock') -> None:
+        self._read_only()
+
+    def extend(self, blocks: Iterable['BasicBlock']) -> None:
+        self._read_only()
+
+    def insert(self, index: Any, block: 'BasicBlock') -> None:
+        self._read_only()
+
+    def remove(self, block: 'BasicBlock') -> None:
+        self._read_only()
+
+    def pop(self, index: Any = -1) -> 'BasicBlock':
+        self._read_only()
+
+    def clear(self) -> None:
+        self._read_only()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._read_only()
+
+    def reverse(self) -> None:
+        self._read_only()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._read_only()
+
+    def __delitem__(self, index: Any) -> None:
+        self._read_only()
+
+    # += and *= would modify the list in place; __add__ and __mul__, which
+    # return new lists, are redefined so that their signatures match
+    def __add__(self, other: Any) -> Any:
+        return list(self) + other
+
+    def __mul__(self, count: Any) -> Any:
+        return list(self) * count
+
+    def __iadd__(self, other: Any) -> Any:
+        self._read_only()
+
+    def __imul__(self, count: Any) -> Any:
+        self._read_only()
+
+
+def _check_edges(block: 'BasicBlock', attribute: Any, value: Any) -> Any:
+    if isinstance(getattr(block, attribute.name, None), EdgeList):
+        m = "edges of a block within a control-flow graph must be modified via the graph"
+        raise TypeError(m)
+    return value
+
+
 @attr.s(slots=True, auto_attribs=True, eq=False, hash=False)
 class BasicBlock:
+    """Describes a basic block within a control-flow graph.
+
+    Once a block belongs to a :class:`ControlFlowGraph`, its
+    :attr:`predecessors` and :attr:`successors` become read-only (see
+    :class:`EdgeList`).
+    """
     number: int = attr.ib()
     stmts: List[Any] = attr.ib(factory=list)  # TODO: figure out type
-    predecessors: List['BasicBlock'] = attr.ib(factory=list)
-    successors: List['BasicBlock'] = attr.ib(factory=list)
+    predecessors: List['BasicBlock'] = attr.ib(factory=list, on_setattr=_check_edges)
+    successors: List['BasicBlock'] = attr.ib(factory=list, on_setattr=_check_edges)
     terminal: bool = attr.ib(default=False)
 
     @property
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+__all__ = ('ControlFlowGraph',)
+
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Set
+import typing
+
+import attr
+
+from .block import BasicBlock, EdgeList
+
+if typing.TYPE_CHECKING:
+    from ..analysis import DominatorTree, LoopForest, ReachabilityIndex
+    from ..helpers import BlockVisitor
+
+
+def _lock_edges(block: BasicBlock) -> None:
+    if not isinstance(block.successors, EdgeList):
+        block.successors = EdgeList(block.successors)
+    if not isinstance(block.predecessors, EdgeList):
+        block.predecessors = EdgeList(block.predecessors)
+
+
+@attr.s(slots=True, eq=False)
+class ControlFlowGraph:
+    """Describes the control-flow graph for a sequence of statements.
+
+    Derived indexes (e.g., :attr:`reachability`, :attr:`dominators` and
+    :attr:`loops`) are tied to the
+    :attr:`version` of the graph at which they were built. Modifications
+    should therefore be made via :meth:`add_block`, :meth:`add_edge` and
+    :meth:`remove_edge`, or followed by a call to :meth:`invalidate`. To
+    ensure that edges are not modified behind the graph's back, the edge
+    lists of its blocks are read-only (see :class:`EdgeList`).
+
+    Attributes
+    ----------
+    entry: BasicBlock
+        The block at which execution begins.
+    blocks: List[BasicBlock]
+        All blocks that belong to the graph, in creation order, including
+        those that are unreachable from the entry block.
+    version: int
+        Incremented whenever the graph is modified.
+    """
+    entry: BasicBlock = attr.ib()
+    blocks: List[BasicBlock] = attr.ib(repr=False)
+    version: int = attr.ib(default=0, init=False)
+    _derived: Dict[str, Any] = attr.ib(factory=dict, init=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        for block in self.blocks:
+            _lock_edges(block)
+
+    @classmethod
+    def from_visitor(cls, visitor: 'BlockVisitor') -> 'ControlFlowGraph':
+        """Builds a graph from the blocks created by a given visitor."""
+        return ControlFlowGraph(visitor.entry, list(visitor.blocks))
+
+    def __iter__(self) -> Iterator[BasicBlock]:
+        yield from self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(block.successors) for block in self.blocks)
+
+    def invalidate(self) -> None:
+        """Signals that the graph has been modified directly, causing any
+        derived indexes to be rebuilt when they are next used."""
+        self.version += 1
+
+    def add_block(self, block: BasicBlock) -> None:
+        """Adds a given block to this graph."""
+        _lock_edges(block)
+        self.blocks.append(block)
+        self.invalidate()
+
+    def add_edge(self, from_block: BasicBlock, to_block: BasicBlock) -> None:
+        """Adds a control-flow edge between two blocks in this graph."""
+        list.append(from_block.successors, to_block)
+        list.append(to_block.predecessors, from_block)
+        self.invalidate()
+
+    def remove_edge(self, from_block: BasicBlock, to_block: BasicBlock) -> None:
+        """Removes a control-flow edge between two blocks in this graph.
+
+        Raises
+        ------
+        ValueError
+            If there is no such edge.
+        """
+        list.remove(from_block.successors, to_block)
+        if from_block in to_block.predecessors:
+            list.remove(to_block.predecessors, from_block)
+        self.invalidate()
+
+    def _derive(self, name: str, build: Callable[['ControlFlowGraph'], Any]) -> Any:
+        derived = self._derived.get(name)
+        if derived is None or derived.version != self.version:
+            derived = build(self)
+            self._derived[name] = derived
+        return derived
+
+    @property
+    def reachability(self) -> 'ReachabilityIndex':
+        """An index that answers reachability queries over this graph.
+
+        The index is built on first use and rebuilt after the graph has
+        been modified.
+        """
+        from ..analysis import ReachabilityIndex
+        return self._derive('reachability', ReachabilityIndex.build)
+
+    @property
+    def dominators(self) -> 'DominatorTree':
+        """The dominator tree for this graph, rebuilt after modification."""
+        from ..analysis import DominatorTree
+        return self._derive('dominators', DominatorTree.build)
+
+    @property
+    def loops(self) -> 'LoopForest':
+        """The natural loops of this graph, rebuilt after modification."""
+        from ..analysis import LoopForest
+        return self._derive('loops', LoopForest.build)
+
+    def reachable_blocks(self) -> Set[BasicBlock]:
+        """Returns the set of blocks that are reachable from the entry."""
+        return self.entry.descendants()
+
+    def unreachable_blocks(self) -> FrozenSet[BasicBlock]:
+        """Returns the set of blocks that cannot be reached from the entry."""
+        return self.reachability.unreachable_blocks
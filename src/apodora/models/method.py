@@ -1,17 +1,21 @@
 # -*- coding: utf-8 -*-
 __all__ = ('Method', 'Py27Method', 'Py3Method')
 
-from typed_ast import ast27, ast3
 from typing import Generic, TypeVar
 import abc
 import typing
 
 import attr
 
+from .cfg import ControlFlowGraph
+from ..lazy import logger
+
 if typing.TYPE_CHECKING:
+    from typed_ast import ast27, ast3  # noqa: F401
     from .module import Module
+    from ..helpers import Fingerprint
 
-T = TypeVar('T', ast27.FunctionDef, ast3.FunctionDef)
+T = TypeVar('T', 'ast27.FunctionDef', 'ast3.FunctionDef')
 
 
 @attr.s(slots=True, auto_attribs=True, frozen=True)
@@ -33,11 +37,33 @@ class Method(Generic[T], abc.ABC):
     name: str
     qual_name: str
     ast: T
+    _cfg: ControlFlowGraph = attr.ib(init=False, repr=False, eq=False)
+
+    @property
+    def cfg(self) -> ControlFlowGraph:
+        """The control-flow graph for the body of this method."""
+        if not hasattr(self, '_cfg'):
+            # imported here to avoid a cycle between models and helpers
+            from ..helpers import BlockVisitor
+            logger.debug(f'computing CFG for method: {self.qual_name}')
+            visitor = BlockVisitor.for_program(self.module.program)
+            for stmt in self.ast.body:
+                visitor.visit(stmt)
+            cfg = ControlFlowGraph.from_visitor(visitor)
+            object.__setattr__(self, '_cfg', cfg)
+        return self._cfg
+
+    @property
+    def fingerprint(self) -> 'Fingerprint':
+        """The structural fingerprint of this method, which ignores its
+        name, formatting, comments and locations. The fingerprints of all
+        methods within a module are computed together."""
+        return self.module.function_fingerprint(self.ast)
 
 
-class Py27Method(Method[ast27.FunctionDef]):
+class Py27Method(Method['ast27.FunctionDef']):
     """Describes a Python 2.7 method."""
 
 
-class Py3Method(Method[ast3.FunctionDef]):
+class Py3Method(Method['ast3.FunctionDef']):
     """Describes a Python 3 method."""
@@ -1,35 +1,90 @@
 # -*- coding: utf-8 -*-
-__all__ = ('Module', 'Py27Module', 'Py3Module')
+__all__ = ('Module', 'ModuleAnalysis', 'Py27Module', 'Py3Module', 'PASSES',
+           'validate_passes')
 
-from typed_ast import ast27 as _ast27
-from typed_ast import ast3 as _ast3
 from types import MappingProxyType
-from typing import AbstractSet, Generic, Mapping, TypeVar
+from typing import (AbstractSet, Any, Collection, Generic, Mapping, Optional,
+                    Sequence, Tuple, TypeVar)
 import abc
 import typing
 
-from loguru import logger
 import attr
 
+from .cfg import ControlFlowGraph
 from .method import Py27Method, Py3Method
-from ..helpers import Py27ImportVisitor, Py3ImportVisitor
+from .. import lazy
+from ..helpers import (BlockVisitor, Fingerprint, Fingerprinter,
+                       ImportStatement, Py27ImportVisitor, Py3ImportVisitor)
 from ..helpers import Py27MethodCollector, Py3MethodCollector
+from ..lazy import logger
 
 if typing.TYPE_CHECKING:
-    from .program import Program
+    from typed_ast import ast27 as _ast27  # noqa: F401
+    from typed_ast import ast3 as _ast3  # noqa: F401
+    from .program import Program, Py3Program
 
-AT = TypeVar('AT', _ast27.AST, _ast3.AST)
+AT = TypeVar('AT', '_ast27.AST', '_ast3.AST')
 MT = TypeVar('MT', Py27Method, Py3Method)
 
+PASSES: Tuple[str, ...] = ('ast', 'imports', 'methods', 'cfg')
+
+
+def validate_passes(passes: Collection[str]) -> None:
+    """Ensures that all of the given analysis passes are known.
+
+    Raises
+    ------
+    ValueError
+        If an unknown pass is given.
+    """
+    unknown = set(passes) - set(PASSES)
+    if unknown:
+        raise ValueError(f"unknown analysis passes: {', '.join(sorted(unknown))}")
+
+
+@attr.s(slots=True, auto_attribs=True, frozen=True)
+class ModuleAnalysis:
+    """Holds the results of the analysis passes that were run on a module.
+
+    Attributes
+    ----------
+    module: Module
+        The module that was analysed.
+    ast: Optional[Any]
+        The abstract syntax tree for the module, if requested.
+    imports: Optional[AbstractSet[str]]
+        The names of the modules imported by the module, if requested.
+    methods: Optional[Mapping[str, Method]]
+        The methods defined by the module, if requested.
+    cfg: Optional[ControlFlowGraph]
+        The control-flow graph for the module, if requested.
+    error: Optional[Exception]
+        The error that prevented one of the passes from completing, if any.
+        Results for passes that completed before the error are retained.
+    """
+    module: 'Module'
+    ast: Optional[Any] = attr.ib(default=None, repr=False)
+    imports: Optional[AbstractSet[str]] = attr.ib(default=None, repr=False)
+    methods: Optional[Mapping[str, Any]] = attr.ib(default=None, repr=False)
+    cfg: Optional[ControlFlowGraph] = attr.ib(default=None, repr=False)
+    error: Optional[Exception] = None
+
 
 @attr.s(slots=True, auto_attribs=True, frozen=True)
 class Module(Generic[AT, MT], abc.ABC):
     program: 'Program'
     name: str
     source: str = attr.ib(repr=False)
-    _imports: AbstractSet[str] = attr.ib(init=False, repr=False)
-    _ast: AT = attr.ib(init=False, repr=False)
-    _methods: Mapping[str, MT] = attr.ib(init=False, repr=False)
+    is_package: bool = attr.ib(default=False, repr=False)
+    _import_statements: Sequence[ImportStatement] = \
+        attr.ib(init=False, repr=False, eq=False)
+    _imports: AbstractSet[str] = attr.ib(init=False, repr=False, eq=False)
+    _ast: AT = attr.ib(init=False, repr=False, eq=False)
+    _methods: Mapping[str, MT] = attr.ib(init=False, repr=False, eq=False)
+    _cfg: ControlFlowGraph = attr.ib(init=False, repr=False, eq=False)
+    _fingerprint: Fingerprint = attr.ib(init=False, repr=False, eq=False)
+    _function_fingerprints: Mapping[Any, Fingerprint] = \
+        attr.ib(init=False, repr=False, eq=False)
     # TODO: add filepath
 
     @property
@@ -40,30 +95,99 @@ class Module(Generic[AT, MT], abc.ABC):
             object.__setattr__(self, '_ast', ast)
         return self._ast
 
+    @property
+    def import_statements(self) -> Sequence[ImportStatement]:
+        """The individual names imported by this module, in order."""
+        if not hasattr(self, '_import_statements'):
+            logger.debug(f'computing import statements for module: {self}')
+            statements = self._compute_import_statements()
+            object.__setattr__(self, '_import_statements', statements)
+        return self._import_statements
+
     @property
     def imports(self) -> AbstractSet[str]:
+        """The absolute names of the modules imported by this module."""
         if not hasattr(self, '_imports'):
-            logger.debug(f'computing imports for module: {self}')
-            imports = frozenset(self._compute_imports())
+            imports = frozenset(s.module for s in self.import_statements)
             object.__setattr__(self, '_imports', imports)
         return self._imports
 
     @property
     def methods(self) -> Mapping[str, MT]:
+        """The methods defined by this module, indexed by qualified name."""
         if not hasattr(self, '_methods'):
             logger.debug(f'computing methods for module: {self}')
             methods = self._compute_methods()
-            name_to_method: Mapping[str, MT] = {m.name: m for m in methods}
+            name_to_method: Mapping[str, MT] = {m.qual_name: m for m in methods}
             name_to_method = MappingProxyType(name_to_method)
             object.__setattr__(self, '_methods', name_to_method)
         return self._methods
 
+    @property
+    def cfg(self) -> ControlFlowGraph:
+        """The control-flow graph for the top-level body of this module."""
+        if not hasattr(self, '_cfg'):
+            logger.debug(f'computing CFG for module: {self}')
+            visitor = BlockVisitor.for_program(self.program)
+            visitor.visit(self.ast)
+            cfg = ControlFlowGraph.from_visitor(visitor)
+            object.__setattr__(self, '_cfg', cfg)
+        return self._cfg
+
+    @property
+    def fingerprint(self) -> Fingerprint:
+        """The structural fingerprint of this module, which ignores its
+        formatting, comments and locations."""
+        if not hasattr(self, '_fingerprint'):
+            self._compute_fingerprints()
+        return self._fingerprint
+
+    def function_fingerprint(self, node: Any) -> Fingerprint:
+        """Returns the structural fingerprint of a function that is defined
+        by this module, given its node.
+
+        Raises
+        ------
+        KeyError
+            If the node is not a function within this module.
+        """
+        if not hasattr(self, '_function_fingerprints'):
+            self._compute_fingerprints()
+        return self._function_fingerprints[node]
+
+    def _compute_fingerprints(self) -> None:
+        logger.debug(f'computing fingerprints for module: {self}')
+        fingerprint, functions = Fingerprinter.compute(self.ast)
+        object.__setattr__(self, '_fingerprint', fingerprint)
+        object.__setattr__(self, '_function_fingerprints', functions)
+
+    def analyse(self, passes: Collection[str] = PASSES) -> ModuleAnalysis:
+        """Runs the given analysis passes on this module.
+
+        Any exception raised by a pass is recorded by the returned analysis
+        rather than propagated, and prevents subsequent passes from running.
+
+        Raises
+        ------
+        ValueError
+            If an unknown pass is requested.
+        """
+        validate_passes(passes)
+        results = {}
+        try:
+            for name in PASSES:
+                if name in passes:
+                    results[name] = getattr(self, name)
+        except Exception as err:
+            return ModuleAnalysis(self, error=err, **results)
+        return ModuleAnalysis(self, **results)
+
     @abc.abstractmethod
     def _compute_ast(self) -> AT:
         ...
 
     @abc.abstractmethod
-    def _compute_imports(self) -> AbstractSet[str]:
+    def _compute_import_statements(self) -> Sequence[ImportStatement]:
         ...
 
     @abc.abstractmethod
@@ -71,27 +195,44 @@ class Module(Generic[AT, MT], abc.ABC):
         ...
 
 
-class Py27Module(Module[_ast27.AST, Py27Method]):
-    def _compute_ast(self) -> _ast27.AST:
-        return _ast27.parse(self.source)
+class Py27Module(Module['_ast27.AST', Py27Method]):
+    def _compute_ast(self) -> '_ast27.AST':
+        return lazy.ast27().parse(self.source)
 
-    def _compute_imports(self) -> AbstractSet[str]:
-        visitor = Py27ImportVisitor(module=self.name)
-        visitor.visit(self.ast)
-        return visitor.imports
+    def _compute_import_statements(self) -> Sequence[ImportStatement]:
+        return Py27ImportVisitor.collect(self.name,
+                                         self.ast,
+                                         is_package=self.is_package)
 
     def _compute_methods(self) -> AbstractSet[Py27Method]:
         return Py27MethodCollector.collect(self)
 
 
-class Py3Module(Module[_ast3.AST, Py3Method]):
-    def _compute_ast(self) -> _ast3.AST:
-        return _ast3.parse(self.source)
-
-    def _compute_imports(self) -> AbstractSet[str]:
-        visitor = Py3ImportVisitor(module=self.name)
-        visitor.visit(self.ast)
-        return visitor.imports
+class Py3Module(Module['_ast3.AST', Py3Method]):
+    """Describes a Python 3 module.
+
+    Unless the program has opted into the stdlib parser, the module is
+    parsed using typed_ast's ast3 grammar. The two parsers do not produce
+    identical trees: on Python 3.8 and later, the stdlib parser represents
+    all literals as :code:`Constant` nodes (rather than :code:`Str`,
+    :code:`Num`, :code:`Bytes`, :code:`NameConstant` and :code:`Ellipsis`),
+    drops type comments, and may produce nodes that typed_ast does not
+    know (e.g., :code:`Match` and :code:`TryStar`). Code that inspects
+    trees should handle both forms, and the fingerprints of trees produced
+    by different parsers should not be compared (see
+    :attr:`Program.parser`).
+    """
+    program: 'Py3Program'
+
+    def _compute_ast(self) -> '_ast3.AST':
+        if self.program.stdlib_ast:
+            return lazy.stdlib_ast().parse(self.source)
+        return lazy.ast3().parse(self.source)
+
+    def _compute_import_statements(self) -> Sequence[ImportStatement]:
+        return Py3ImportVisitor.collect(self.name,
+                                        self.ast,
+                                        is_package=self.is_package)
 
     def _compute_methods(self) -> AbstractSet[Py3Method]:
         return Py3MethodCollector.collect(self)
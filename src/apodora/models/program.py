@@ -2,18 +2,28 @@
 __all__ = ('Program', 'Py27Program', 'Py3Program')
 
 from types import MappingProxyType
-from typed_ast import ast27, ast3
-from typing import Generic, Mapping, MutableMapping, TypeVar
+from typing import (AsyncIterator, Collection, Generic, Iterable, Iterator,
+                    Mapping, MutableMapping, Optional, Set, TypeVar)
 import abc
+import functools
+import typing
 
 import attr
 
-from .module import Module, Py27Module, Py3Module
+from .module import (PASSES, Module, ModuleAnalysis, Py27Module, Py3Module,
+                     validate_passes)
+from ..helpers import ImportResolver
 
-T = TypeVar('T', ast27.AST, ast3.AST)
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+    from typed_ast import ast27, ast3  # noqa: F401
+    from ..analysis import ProgramDiff
+    from ..memory import MemoryReport
 
+T = TypeVar('T', 'ast27.AST', 'ast3.AST')
 
-@attr.s(slots=True, frozen=True)
+
+@attr.s(slots=True, frozen=True, eq=False)
 class Program(Generic[T], abc.ABC):
     """Describes the program under analysis.
 
@@ -30,6 +40,8 @@ class Program(Generic[T], abc.ABC):
     python: str = attr.ib(validator=attr.validators.instance_of(str))
     modules: Mapping[str, Module] = attr.ib(repr=False, init=False)
     _modules: MutableMapping[str, Module] = attr.ib(repr=False, init=False)
+    _resolver: Optional[ImportResolver] = \
+        attr.ib(repr=False, init=False, default=None)
     main_module: str = attr.ib(default='__main__')
 
     def __attrs_post_init__(self) -> None:
@@ -41,34 +53,73 @@ class Program(Generic[T], abc.ABC):
     @staticmethod
     def from_sources(python: str,
                      module_to_source: Mapping[str, str],
-                     main_module: str = '__main__'
+                     main_module: str = '__main__',
+                     *,
+                     packages: Collection[str] = (),
+                     stdlib_ast: bool = False
                      ) -> 'Program':
         """Builds a program from a set of module sources.
 
+        Parameters
+        ----------
+        packages: Collection[str]
+            The names of the modules that are packages (i.e., whose source
+            was read from an :code:`__init__` file).
+        stdlib_ast: bool
+            If :code:`True`, the modules of a Python 3 program are parsed
+            using the standard library's ast module rather than typed_ast.
+            This avoids loading typed_ast altogether, but the resulting trees
+            use the grammar of the running interpreter, which may differ
+            from that of typed_ast (see :class:`Py3Module`).
+
         Raises
         ------
         ValueError
             If no source code has been provided for the main module.
+        ValueError
+            If the stdlib parser is requested for a Python 2 program.
         """
         if main_module not in module_to_source:
             m = f"source code must be provided for main module: {main_module}"
             raise ValueError(m)
 
-        program: Program
-        if python.startswith('2.'):
-            program = Py27Program(python=python, main_module=main_module)
-        elif python.startswith('3.'):
-            program = Py3Program(python=python, main_module=main_module)
-        else:
-            raise ValueError(f"unsupported Python version: {python}")
+        program = Program.for_python(python, main_module, stdlib_ast=stdlib_ast)
 
         # TODO introduce a proper module loader
         for name, source in module_to_source.items():
-            module = program.load_module(name, source)
+            module = program.load_module(name, source,
+                                         is_package=name in packages)
             program.add_module(module)
 
         return program
 
+    @staticmethod
+    def for_python(python: str,
+                   main_module: str = '__main__',
+                   *,
+                   stdlib_ast: bool = False
+                   ) -> 'Program':
+        """Creates an empty program for a given version of Python, to which
+        modules may then be added.
+
+        Raises
+        ------
+        ValueError
+            If the version of Python is unsupported.
+        ValueError
+            If the stdlib parser is requested for a Python 2 program.
+        """
+        if python.startswith('2.'):
+            if stdlib_ast:
+                m = "stdlib parser cannot be used for Python 2 programs"
+                raise ValueError(m)
+            return Py27Program(python=python, main_module=main_module)
+        if python.startswith('3.'):
+            return Py3Program(python=python,
+                              main_module=main_module,
+                              stdlib_ast=stdlib_ast)
+        raise ValueError(f"unsupported Python version: {python}")
+
     @property
     @abc.abstractmethod
     def is_py2(self) -> bool:
@@ -79,18 +130,189 @@ class Program(Generic[T], abc.ABC):
     def is_py3(self) -> bool:
         ...
 
+    @property
+    @abc.abstractmethod
+    def parser(self) -> str:
+        """The name of the module used to parse the modules of this
+        program (e.g., :code:`typed_ast.ast3`). Trees, and therefore their
+        fingerprints, are only comparable between programs that use the
+        same parser."""
+        ...
+
     @abc.abstractmethod
-    def load_module(self, name: str, source: str) -> Module:
+    def load_module(self,
+                    name: str,
+                    source: str,
+                    is_package: bool = False
+                    ) -> Module:
         """Loads a given module from source."""
         ...
 
+    @property
+    def resolver(self) -> ImportResolver:
+        """Resolves the imports of modules in this program to the modules
+        that they refer to."""
+        if self._resolver is None:
+            object.__setattr__(self, '_resolver', ImportResolver.for_program(self))
+        assert self._resolver is not None
+        return self._resolver
+
     def add_module(self, module: Module) -> None:
-        """Registers a given module with this program."""
+        """Registers a given module with this program, replacing any
+        existing module with the same name."""
         assert module.program == self
         self._modules[module.name] = module
+        if self._resolver is not None:
+            self._resolver.index.add(module)
 
+    def remove_module(self, name: str) -> None:
+        """Removes the module with a given name from this program.
 
-class Py27Program(Program[ast27.AST]):
+        Raises
+        ------
+        KeyError
+            If no module with the given name belongs to this program.
+        """
+        del self._modules[name]
+        if self._resolver is not None:
+            self._resolver.index.remove(name)
+
+    def diff(self,
+             other: 'Program',
+             *,
+             modules: Optional[Iterable[str]] = None
+             ) -> 'ProgramDiff':
+        """Computes the structural differences between this program and a
+        later version of it. If given, only the named modules are compared
+        (see :meth:`ProgramDiff.compute`)."""
+        from ..analysis import ProgramDiff
+        return ProgramDiff.compute(self, other, modules=modules)
+
+    def memory_report(self,
+                      *,
+                      phases: Optional[Collection[str]] = None
+                      ) -> 'MemoryReport':
+        """Attributes the memory retained by this program to its modules
+        and to the kinds of data held for each module.
+
+        Parameters
+        ----------
+        phases: Optional[Collection[str]]
+            If given, these analysis passes are first run for every module
+            while tracemalloc measures the memory allocated by each pass.
+        """
+        from ..memory import MemoryReport
+        return MemoryReport.for_program(self, phases=phases)
+
+    def _modules_to_analyse(self,
+                            modules: Optional[Iterable[str]]
+                            ) -> Iterator[Module]:
+        if modules is None:
+            yield from list(self._modules.values())
+        else:
+            for name in modules:
+                yield self._modules[name]
+
+    def iter_analyses(self,
+                      passes: Collection[str] = PASSES,
+                      executor: Optional['Executor'] = None,
+                      *,
+                      modules: Optional[Iterable[str]] = None,
+                      max_pending: int = 8
+                      ) -> Iterator[ModuleAnalysis]:
+        """Analyses the modules of this program and yields the results for
+        each module as soon as they have been computed.
+
+        Parameters
+        ----------
+        passes: Collection[str]
+            The analysis passes that should be run on each module. Passes
+            may be any of :code:`ast`, :code:`imports`, :code:`methods`, and
+            :code:`cfg`.
+        executor: Optional[Executor]
+            An optional thread-based executor that is used to analyse
+            modules concurrently. If provided, results are yielded in the
+            order in which they complete. Otherwise, modules are analysed
+            one at a time in the calling thread as results are consumed.
+        modules: Optional[Iterable[str]]
+            The names of the modules that should be analysed. By default,
+            all modules in the program are analysed.
+        max_pending: int
+            The maximum number of modules that may be analysed ahead of the
+            consumer when an executor is used. Analysis is paused whenever
+            this limit is reached until the consumer takes another result.
+
+        Raises
+        ------
+        ValueError
+            If an unknown pass is requested.
+        KeyError
+            If a requested module does not belong to this program.
+        """
+        validate_passes(passes)
+        analyse = functools.partial(Module.analyse, passes=passes)
+
+        if executor is None:
+            for module in self._modules_to_analyse(modules):
+                yield analyse(module)
+            return
+
+        # imported lazily, as importing them slows down importing apodora
+        from concurrent.futures import FIRST_COMPLETED, wait
+        pending: Set['Future[ModuleAnalysis]'] = set()
+        try:
+            for module in self._modules_to_analyse(modules):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(analyse, module))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def aiter_analyses(self,
+                             passes: Collection[str] = PASSES,
+                             executor: Optional['Executor'] = None,
+                             *,
+                             modules: Optional[Iterable[str]] = None,
+                             max_pending: int = 8
+                             ) -> AsyncIterator[ModuleAnalysis]:
+        """Provides an asynchronous variant of :meth:`iter_analyses`.
+
+        Modules are analysed using the given executor or, if no executor is
+        given, the default executor of the running event loop. At most
+        :code:`max_pending` modules are analysed ahead of the consumer.
+        """
+        import asyncio  # imported lazily, see iter_analyses
+        validate_passes(passes)
+        analyse = functools.partial(Module.analyse, passes=passes)
+        loop = asyncio.get_event_loop()
+
+        pending: Set['asyncio.Future[ModuleAnalysis]'] = set()
+        try:
+            for module in self._modules_to_analyse(modules):
+                if len(pending) >= max_pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(loop.run_in_executor(executor, analyse, module))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class Py27Program(Program['ast27.AST']):
     """Describes a Python 2.7 program."""
     @property
     def is_py2(self) -> bool:
@@ -100,13 +322,34 @@ class Py27Program(Program[ast27.AST]):
     def is_py3(self) -> bool:
         return False
 
-    def load_module(self, name: str, source: str) -> Module:
+    @property
+    def parser(self) -> str:
+        return 'typed_ast.ast27'
+
+    def load_module(self,
+                    name: str,
+                    source: str,
+                    is_package: bool = False
+                    ) -> Module:
         """Loads a given module from source."""
-        return Py27Module(program=self, name=name, source=source)
+        return Py27Module(program=self,
+                          name=name,
+                          source=source,
+                          is_package=is_package)
+
 
+@attr.s(slots=True, frozen=True, eq=False)
+class Py3Program(Program['ast3.AST']):
+    """Describes a Python 3 program.
+
+    Attributes
+    ----------
+    stdlib_ast: bool
+        If :code:`True`, modules are parsed using the standard library's
+        ast module rather than typed_ast.
+    """
+    stdlib_ast: bool = attr.ib(default=False)
 
-class Py3Program(Program[ast3.AST]):
-    """Describes a Python 3 program."""
     @property
     def is_py2(self) -> bool:
         return False
@@ -115,6 +358,17 @@ class Py3Program(Program[ast3.AST]):
     def is_py3(self) -> bool:
         return True
 
-    def load_module(self, name: str, source: str) -> Module:
+    @property
+    def parser(self) -> str:
+        return 'ast' if self.stdlib_ast else 'typed_ast.ast3'
+
+    def load_module(self,
+                    name: str,
+                    source: str,
+                    is_package: bool = False
+                    ) -> Module:
         """Loads a given module from source."""
-        return Py3Module(program=self, name=name, source=source)
+        return Py3Module(program=self,
+                         name=name,
+                         source=source,
+                         is_package=is_package)
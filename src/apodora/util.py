@@ -1,11 +1,33 @@
 # -*- coding: utf-8 -*-
 __all__ = ('NodeVisitor', 'Py27NodeVisitor', 'Py3NodeVisitor',
-           'StmtVisitor', 'Py27StmtVisitor', 'Py3StmtVisitor')
+           'StmtVisitor', 'Py27StmtVisitor', 'Py3StmtVisitor',
+           'iter_child_nodes')
 
-from typed_ast import ast27, ast3
+from typing import Any, Iterator
 import abc
 
 
+def _is_node(value: Any) -> bool:
+    return hasattr(type(value), '_fields')
+
+
+def iter_child_nodes(node: Any) -> Iterator[Any]:
+    """Iterates over the direct child nodes of a given AST node.
+
+    This works for nodes that belong to any grammar (i.e., typed_ast's
+    ast27 and ast3 as well as the stdlib ast), and thus avoids importing
+    the modules that provide those grammars.
+    """
+    for field in node._fields:
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            for item in value:
+                if _is_node(item):
+                    yield item
+        elif _is_node(value):
+            yield value
+
+
 class NodeVisitor(abc.ABC):
     @abc.abstractmethod
     def visit_children(self, node) -> None:
@@ -20,18 +42,31 @@ class NodeVisitor(abc.ABC):
         ...
 
 
-class Py27NodeVisitor(ast27.NodeVisitor, NodeVisitor):
-    def visit_children(self, node) -> None:
-        for child in ast27.iter_child_nodes(node):
-            self.generic_visit(child)
+class _GrammarAgnosticNodeVisitor(NodeVisitor):
+    """Provides the same dispatch rules as :class:`ast.NodeVisitor` without
+    tying the visitor to a particular grammar module."""
+    def visit(self, node) -> None:
+        method = 'visit_' + node.__class__.__name__
+        visitor = getattr(self, method, self.generic_visit)
+        visitor(node)
 
+    def generic_visit(self, node) -> None:
+        for child in iter_child_nodes(node):
+            self.visit(child)
 
-class Py3NodeVisitor(ast3.NodeVisitor, NodeVisitor):
     def visit_children(self, node) -> None:
-        for child in ast3.iter_child_nodes(node):
+        for child in iter_child_nodes(node):
             self.generic_visit(child)
 
 
+class Py27NodeVisitor(_GrammarAgnosticNodeVisitor):
+    pass
+
+
+class Py3NodeVisitor(_GrammarAgnosticNodeVisitor):
+    pass
+
+
 class StmtVisitor(NodeVisitor, abc.ABC):
     def visit_stmt(self, node) -> None:
         self.generic_visit(node)
@@ -1,28 +1,59 @@
 # -*- coding: utf-8 -*-
+from typing import Set, Tuple
 import tempfile
 import typing
 
 import attr
-import graphviz
 
 if typing.TYPE_CHECKING:
+    import graphviz
     from ..models import Program
 
 
 @attr.s(slots=True, auto_attribs=True)
 class ImportGraph:
-    _dot: graphviz.Digraph
+    _dot: 'graphviz.Digraph'
 
     @classmethod
-    def for_program(cls, program: 'Program') -> 'ImportGraph':
+    def for_program(cls,
+                    program: 'Program',
+                    include_external: bool = False
+                    ) -> 'ImportGraph':
+        """Builds the import graph for a given program.
+
+        Parameters
+        ----------
+        program: Program
+            The program whose imports should be drawn.
+        include_external: bool
+            If :code:`True`, imports of modules that do not belong to the
+            program are drawn as dashed edges to their top-level package.
+            Otherwise, they are omitted.
+        """
+        import graphviz
         dot = graphviz.Digraph(comment='Import Graph')
+        resolver = program.resolver
 
         for module_name in program.modules:
             dot.node(module_name, module_name)
 
+        external: Set[str] = set()
         for module in program.modules.values():
-            for import_name in module.imports:
-                dot.edge(module.name, import_name)
+            edges: Set[Tuple[str, str]] = set()
+            for resolved in resolver.resolve(module):
+                if resolved.module is not None:
+                    edges.add((resolved.module.name, 'solid'))
+                elif include_external:
+                    package = resolved.name
+                    if not package.startswith('.'):
+                        package = package.partition('.')[0]
+                    edges.add((package, 'dashed'))
+                    external.add(package)
+            for import_name, style in sorted(edges):
+                dot.edge(module.name, import_name, style=style)
+
+        for package in sorted(external - set(program.modules)):
+            dot.node(package, package, style='dashed')
 
         return ImportGraph(dot)
 
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from typing import Callable
+import random
+
+import pytest
+
+from apodora.models import BasicBlock, BlockNumbering, ControlFlowGraph
+
+
+def build_random_cfg(rng: random.Random,
+                     size: int,
+                     edge_probability: float
+                     ) -> ControlFlowGraph:
+    """Builds a graph with a given number of blocks whose edges are chosen
+    at random, including self loops and blocks that are unreachable."""
+    numbering = BlockNumbering()
+    blocks = [BasicBlock.create_with_numbering(numbering) for _ in range(size)]
+    cfg = ControlFlowGraph(blocks[0], blocks)
+    for source in blocks:
+        for target in blocks:
+            if rng.random() < edge_probability:
+                cfg.add_edge(source, target)
+    return cfg
+
+
+@pytest.fixture
+def random_cfgs() -> Callable[[int], ControlFlowGraph]:
+    """Provides a factory for random control-flow graphs, seeded by the
+    given number so that failures can be reproduced."""
+    def build(seed: int) -> ControlFlowGraph:
+        rng = random.Random(seed)
+        size = rng.randint(1, 40)
+        edge_probability = rng.choice((0.02, 0.05, 0.1, 0.3))
+        return build_random_cfg(rng, size, edge_probability)
+    return build
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from apodora.cli import _recover_completed_modules, main
+
+
+def _records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'foo.py').write_text('import bar\n\ndef f(x):\n    return bar.g(x)\n')
+    (source / 'bar.py').write_text('def g(x):\n    return x\n')
+    (source / 'baz.py').write_text('def h():\n    pass\n')
+    return source
+
+
+def test_missing_output_has_no_completed_modules(tmp_path):
+    assert _recover_completed_modules(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    output = tmp_path / 'out.jsonl'
+    complete = json.dumps({'module': 'foo'}) + '\n' + json.dumps({'module': 'bar'}) + '\n'
+    output.write_bytes(complete.encode('utf-8') + b'{"module": "ba')
+    assert _recover_completed_modules(str(output)) == {'foo', 'bar'}
+    assert output.read_bytes() == complete.encode('utf-8')
+
+
+def test_unterminated_record_is_dropped(tmp_path):
+    output = tmp_path / 'out.jsonl'
+    complete = json.dumps({'module': 'foo'}) + '\n'
+    output.write_text(complete + json.dumps({'module': 'bar'}))
+    assert _recover_completed_modules(str(output)) == {'foo'}
+    assert output.read_text() == complete
+
+
+def test_resume_skips_completed_modules(tree, tmp_path):
+    output = tmp_path / 'out.jsonl'
+    assert main(['analyse', str(tree), '-j', '1', '-o', str(output),
+                 '--python', '3.6']) == 0
+    first = _records(output)
+    assert sorted(r['module'] for r in first) == ['bar', 'baz', 'foo']
+
+    # simulate a crash partway through writing the record for one module
+    kept = [r for r in first if r['module'] != 'baz']
+    output.write_text(''.join(json.dumps(r) + '\n' for r in kept) + '{"module": "b')
+    assert main(['analyse', str(tree), '-j', '1', '-o', str(output),
+                 '--python', '3.6', '--resume']) == 0
+    resumed = _records(output)
+    assert resumed[:len(kept)] == kept
+    assert [r['module'] for r in resumed[len(kept):]] == ['baz']
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_analyse_writes_one_record_per_module(tree, tmp_path, jobs):
+    output = tmp_path / 'out.jsonl'
+    assert main(['analyse', str(tree), '-j', jobs, '--batch-size', '1',
+                 '-o', str(output), '--python', '3.6']) == 0
+    records = {r['module']: r for r in _records(output)}
+    assert sorted(records) == ['bar', 'baz', 'foo']
+    assert records['foo']['imports'] == ['bar']
+    assert 'error' not in records['foo']
+
+
+def test_resume_requires_output_file(tree):
+    assert main(['analyse', str(tree), '--resume']) == 2
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from apodora.analysis import CloneIndex
+from apodora.models import Program
+
+SOURCE = """
+def f(xs):
+    total = 0
+    for x in xs:
+        if x > 1:
+            total = total + x * 2
+    return total
+"""
+
+
+def _program(**modules: str) -> Program:
+    return Program.from_sources('3.6', dict(modules, __main__='import m'))
+
+
+def test_update_replaces_unchanged_methods():
+    old = _program(m=SOURCE, n=SOURCE.replace('def f', 'def g'))
+    new = _program(m=SOURCE, n='x = 1')
+    index = CloneIndex.for_program(old)
+    assert len(list(index.groups())) == 1
+
+    index.update(old.diff(new))
+    assert list(index.groups()) == []
+    assert index.clones_of(new.modules['m'].methods['f']) == frozenset()
+
+    latest = _program(m=SOURCE, n=SOURCE.replace('def f', 'def h'))
+    index.update(new.diff(latest))
+    group, = index.groups()
+    assert {(m.module.name, m.qual_name) for m in group} == {('m', 'f'), ('n', 'h')}
+    assert all(m.module.program is latest for m in group)
+
+
+def test_programs_with_different_parsers_are_not_compared():
+    typed = _program(m=SOURCE)
+    stdlib = Program.from_sources('3.6', {'__main__': 'import m', 'm': SOURCE},
+                                  stdlib_ast=True)
+    with pytest.raises(ValueError):
+        typed.diff(stdlib)
+    index = CloneIndex.for_program(typed)
+    with pytest.raises(ValueError):
+        index.add_module(stdlib.modules['m'])
+
+
+def test_update_only_visits_modified_modules():
+    old = _program(m=SOURCE, n=SOURCE.replace('def f', 'def g'), o='x = 1')
+    new = _program(m=SOURCE, n=SOURCE.replace('def f', 'def g'), o='x = 2')
+    index = CloneIndex.for_program(old)
+    assert len(index) == 2
+
+    diff = old.diff(new, modules=['o'])
+    assert diff.changed_modules == {'o'}
+    index.update(diff)
+    # unchanged modules are neither parsed nor re-indexed
+    for name in ('m', 'n'):
+        assert not hasattr(new.modules[name], '_ast')
+    assert len(index) == 2
+
+    group, = index.groups()
+    assert {(m.module.name, m.qual_name) for m in group} == {('m', 'f'), ('n', 'g')}
+    assert all(m.module.program is new for m in group)
+
+
+def test_diff_of_named_modules():
+    old = _program(m=SOURCE, n=SOURCE, o='x = 1')
+    new = _program(m=SOURCE.replace('x * 2', 'x * 3'), p=SOURCE, o='x = 2')
+    diff = old.diff(new, modules=['n', 'p', 'o', 'missing'])
+    assert diff.added_modules == {'p'}
+    assert diff.removed_modules == {'n'}
+    assert diff.changed_modules == {'o'}
+    assert diff.added_methods == {('p', 'f')}
+    assert diff.removed_methods == {('n', 'f')}
+
+    full = old.diff(new)
+    assert full.changed_modules == {'m', 'o'}
+    assert full.changed_methods == {('m', 'f')}
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+
+import pytest
+
+from apodora import daemon
+from apodora.daemon import AnalysisServer, QueryError, Workspace, query
+
+
+@pytest.fixture
+def server(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'foo.py').write_text('import bar\n\ndef f(x):\n    return bar.g(x)\n')
+    (source / 'bar.py').write_text('def g(x):\n    return x\n')
+    workspace = Workspace.load(str(source), '3.6')
+    server = AnalysisServer(str(tmp_path / 'apodora.sock'), workspace, interval=60)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _answer(server, request):
+    return server.answer(json.dumps(request).encode('utf-8'))
+
+
+def test_queries_are_answered(server):
+    assert query(server.path, 'methods', module='foo') == ['f']
+    assert query(server.path, 'dependents', module='bar') == ['foo']
+    cfg = query(server.path, 'cfg', module='foo', method='f')
+    assert cfg['entry'] in cfg['blocks']
+
+
+@pytest.mark.parametrize('request_', [
+    {'query': 'imports', 'module': ['foo']},
+    {'query': 'cfg', 'module': 'foo', 'method': ['f']},
+    {'query': 'imports'},
+    {'query': 'methods', 'module': 'missing'},
+    {'query': 'missing'},
+])
+def test_invalid_queries_are_reported(server, request_):
+    response = _answer(server, request_)
+    assert response['ok'] is False
+    assert 'malformed' not in response['error']
+
+
+def test_malformed_requests_are_reported(server):
+    assert server.answer(b'{"query": ')['error'].startswith('malformed request')
+    assert _answer(server, ['status'])['ok'] is False
+
+
+def test_analysis_errors_are_reported(server, monkeypatch):
+    def fail(workspace, request):
+        raise ValueError('relative imports not allowed in __main__ script')
+
+    monkeypatch.setitem(daemon.QUERIES, 'status', fail)
+    response = _answer(server, {'query': 'status'})
+    assert response == {'ok': False,
+                        'error': 'ValueError: relative imports not allowed in __main__ script'}
+
+
+def test_failed_queries_are_answered(server):
+    with pytest.raises(QueryError, match='argument must be a string: module'):
+        query(server.path, 'imports', module=['foo'])
+    assert query(server.path, 'ping') == 'pong'
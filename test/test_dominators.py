@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from typing import Iterable, Set
+import textwrap
+
+import pytest
+
+from apodora.analysis import DominatorTree, LoopForest
+from apodora.models import BasicBlock, ControlFlowGraph, Program
+
+
+def _reachable_without(entry: BasicBlock, removed: BasicBlock) -> Set[BasicBlock]:
+    if entry == removed:
+        return set()
+    seen = {entry}
+    stack = [entry]
+    while stack:
+        for successor in stack.pop().successors:
+            if successor != removed and successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return seen
+
+
+def _natural_loop(header: BasicBlock,
+                  latch: BasicBlock,
+                  reachable: Set[BasicBlock]
+                  ) -> Set[int]:
+    """Returns the numbers of the blocks within the natural loop of a back
+    edge. Numbers are compared rather than blocks, as the representation
+    of a block includes its neighbours."""
+    body = {header, latch}
+    stack = [latch] if latch != header else []
+    while stack:
+        for predecessor in stack.pop().predecessors:
+            if predecessor in reachable and predecessor not in body:
+                body.add(predecessor)
+                stack.append(predecessor)
+    return {block.number for block in body}
+
+
+def _numbers(blocks: Iterable[BasicBlock]) -> Set[int]:
+    return {block.number for block in blocks}
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_dominators_match_definition(random_cfgs, seed):
+    cfg = random_cfgs(seed)
+    tree = DominatorTree.build(cfg)
+    reachable = cfg.entry.descendants()
+    for dominator in cfg:
+        not_dominated = _reachable_without(cfg.entry, dominator)
+        for block in cfg:
+            expected = block in reachable and dominator in reachable \
+                and (block == dominator or block not in not_dominated)
+            assert tree.dominates(dominator, block) == expected
+
+    for block in reachable:
+        idom = tree.immediate_dominator(block)
+        if block == cfg.entry:
+            assert idom is None
+            continue
+        # the immediate dominator is the strict dominator closest to block
+        strict = [d for d in cfg if d != block and tree.dominates(d, block)]
+        assert idom is not None and idom.number in _numbers(strict)
+        assert all(tree.dominates(d, idom) for d in strict)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_dominance_frontiers(random_cfgs, seed):
+    cfg = random_cfgs(seed)
+    tree = DominatorTree.build(cfg)
+    graph = tree.graph
+    frontiers = tree.frontiers()
+    for node in tree.rpo:
+        expected = set()
+        for block in tree.rpo:
+            predecessors = graph.predecessors[block]
+            strictly_dominated = block != node and tree.dominates_index(node, block)
+            if not strictly_dominated and \
+                    any(tree.dominates_index(node, p) for p in predecessors):
+                expected.add(block)
+        assert sorted(frontiers[node]) == sorted(expected)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_loops_match_natural_loops(random_cfgs, seed):
+    cfg = random_cfgs(seed)
+    tree = cfg.dominators
+    forest = LoopForest.build(cfg, tree)
+    reachable = cfg.entry.descendants()
+
+    # loops that share a header are merged
+    expected = {}
+    for latch in reachable:
+        for header in latch.successors:
+            if tree.dominates(header, latch):
+                body = _natural_loop(header, latch, reachable)
+                expected.setdefault(header, set()).update(body)
+
+    assert len(forest) == len(expected)
+    for loop in range(len(forest)):
+        header = forest.header(loop)
+        assert forest.is_header(header)
+        assert _numbers(forest.body(loop)) == expected[header]
+        parent = forest.loop_parent[loop]
+        if parent != -1:
+            assert parent > loop
+            assert _numbers(forest.body(loop)) < _numbers(forest.body(parent))
+
+    for block in cfg:
+        containing = [h for h, body in expected.items() if block.number in body]
+        assert forest.depth(block) == len(containing)
+        innermost = forest.innermost_loop(block)
+        if containing:
+            assert innermost is not None
+            innermost_body = min((expected[h] for h in containing), key=len)
+            assert _numbers(forest.body(innermost)) == innermost_body
+        else:
+            assert innermost is None
+    assert forest.max_depth == max(forest.loop_depth, default=0)
+
+
+def _assigned_in(cfg: ControlFlowGraph, name: str) -> BasicBlock:
+    """Returns the block that contains the assignment to a given name."""
+    for block in cfg:
+        for stmt in block.stmts:
+            targets = getattr(stmt, 'targets', ())
+            if any(getattr(target, 'id', None) == name for target in targets):
+                return block
+    raise KeyError(name)
+
+
+@pytest.mark.parametrize('python', ['2.7', '3.6'])
+def test_loop_depths_of_nested_loops(python):
+    source = textwrap.dedent("""
+        def f(rows, n):
+            total = 0
+            for row in rows:
+                outer = row
+                while n:
+                    for x in row:
+                        inner = x
+                    middle = n
+                    n = n - 1
+                after_while = n
+            after_for = total
+            return after_for
+        """)
+    program = Program.from_sources(python, {'__main__': source})
+    cfg = program.modules['__main__'].methods['f'].cfg
+    forest = cfg.loops
+
+    expected = {'total': 0, 'outer': 1, 'inner': 3, 'middle': 2,
+                'after_while': 1, 'after_for': 0}
+    for name, depth in expected.items():
+        assert forest.depth(_assigned_in(cfg, name)) == depth, name
+    assert _assigned_in(cfg, 'total') is cfg.entry
+    assert forest.depth(cfg.entry) == 0
+    assert forest.innermost_loop(cfg.entry) is None
+    assert len(forest) == 3
+    assert forest.max_depth == 3
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import json
+import sys
+
+import pytest
+
+from apodora.memory import CATEGORIES, MemoryReport, PhaseUsage, deep_sizeof
+from apodora.models import Program
+
+
+@pytest.fixture
+def program():
+    sources = {'__main__': 'import foo\n\ndef f(x):\n    return foo.g(x)\n',
+               'foo': 'def g(x):\n    if x:\n        return 1\n    return 2\n'}
+    return Program.from_sources('3.6', sources)
+
+
+def test_report_does_not_force_analysis(program):
+    report = program.memory_report()
+    for module in program.modules.values():
+        assert not hasattr(module, '_ast')
+        assert not hasattr(module, '_methods')
+        assert not hasattr(module, '_cfg')
+    for name, usage in report.modules.items():
+        assert usage['source'] > 0
+        assert all(usage[c] == 0 for c in CATEGORIES[1:]), name
+    assert report.phases == {}
+
+
+def test_computed_analyses_are_counted(program):
+    before = program.memory_report()
+    for module in program.modules.values():
+        module.cfg
+    after = program.memory_report()
+    assert after.totals['ast'] > 0
+    assert after.totals['cfg'] > 0
+    assert after.total > before.total
+
+    change = after.diff(before)
+    assert change.totals['source'] == 0
+    assert change.totals['ast'] == after.totals['ast']
+    assert change.total == after.total - before.total
+
+
+def test_diff_covers_modules_and_phases_in_either_report():
+    before = MemoryReport({'a': {'source': 10}, 'gone': {'source': 4}},
+                          {'ast': PhaseUsage(100, 150), 'cfg': PhaseUsage(5, 5)})
+    after = MemoryReport({'a': {'source': 10, 'ast': 30}, 'new': {'source': 7}},
+                         {'ast': PhaseUsage(120, 140)})
+    change = after.diff(before)
+    assert change.modules == {'a': {'source': 0, 'ast': 30},
+                              'gone': {'source': -4},
+                              'new': {'source': 7}}
+    assert change.phases == {'ast': PhaseUsage(20, -10)}
+    assert 'gone' in change.format()
+
+
+def test_round_trip_through_json(program):
+    report = program.memory_report(phases=['ast', 'cfg'])
+    assert set(report.phases) == {'ast', 'cfg'}
+    assert report.phases['ast'].allocated > 0
+    loaded = MemoryReport.from_dict(json.loads(json.dumps(report.to_dict())))
+    assert loaded == report
+    assert loaded.format() == report.format()
+
+
+def test_shared_objects_are_counted_once():
+    shared = ['x' * 100]
+    seen = set()
+    first = deep_sizeof([shared], seen)
+    second = deep_sizeof([shared], seen)
+    # only the new outer list is counted by the second call
+    assert second == sys.getsizeof([shared])
+    assert first == second + deep_sizeof(shared)
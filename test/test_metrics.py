@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+from array import array
+import textwrap
+
+import pytest
+
+from apodora.analysis import MetricsTable, metrics
+from apodora.models import Program
+
+
+def _metrics(source: str, python: str = '3.6'):
+    program = Program.from_sources(python, {'__main__': textwrap.dedent(source)})
+    table = MetricsTable.for_program(program)
+    return {method.qual_name: table.row(method) for method in table.methods}
+
+
+@pytest.mark.parametrize('python', ['2.7', '3.6'])
+def test_complexity_counts_decision_points(python):
+    metrics = _metrics("""
+        def f(n):
+            while n:
+                if n > 3 and n < 10:
+                    n = n - 2
+                try:
+                    n = int(n)
+                except ValueError:
+                    n = 0
+            return [x for x in range(n) if x] or None
+        """, python)
+    # while, if, and, except, for, if, or
+    assert metrics['f']['complexity'] == 8
+
+
+def test_complexity_of_straight_line_code():
+    metrics = _metrics("""
+        def f(x):
+            y = x + 1
+            return y
+        """)
+    assert metrics['f']['complexity'] == 1
+    assert metrics['f']['depth'] == 0
+
+
+def test_elif_chain_is_not_nested():
+    metrics = _metrics("""
+        def f(x):
+            if x == 1:
+                return 'a'
+            elif x == 2:
+                return 'b'
+            elif x == 3:
+                return 'c'
+            else:
+                return 'd'
+
+        def g(x):
+            if x == 1:
+                return 'a'
+            else:
+                y = x
+                if y == 2:
+                    return 'b'
+        """)
+    assert metrics['f']['depth'] == 1
+    assert metrics['f']['complexity'] == 4
+    assert metrics['g']['depth'] == 2
+
+
+@pytest.mark.parametrize('python', ['2.7', '3.6'])
+def test_size_does_not_count_operators(python):
+    metrics = _metrics("""
+        def compare(a, b):
+            return a < b
+
+        def add(a, b):
+            return a + b
+
+        def chain(a, b, c):
+            return a < b <= c
+        """, python)
+    # Return, the expression, and one Name per operand
+    assert metrics['compare']['size'] == 4
+    assert metrics['add']['size'] == 4
+    assert metrics['chain']['size'] == 5
+
+
+def _table():
+    sources = {'__main__': ''}
+    for number in range(12):
+        lines = []
+        for method in range(number % 5 + 1):
+            body = '\n'.join(f'    x{i} = f(x)' for i in range((number * 7 + method * 3) % 6))
+            lines.append(f'def m{method}(x):\n{body}\n    return x\n')
+        sources[f'pkg{number % 3}.mod{number}'] = '\n'.join(lines)
+    program = Program.from_sources('3.6', sources)
+    return MetricsTable.for_program(program)
+
+
+def _reference(table, metric, by):
+    names = table.modules if by == 'module' else table.packages
+    groups = table.module if by == 'module' else table.package
+    column = table.column(metric)
+    grouped = {}
+    for row in range(len(table)):
+        grouped.setdefault(names[groups[row]], []).append(row)
+    return column, grouped
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def aggregation(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(metrics, '_numpy', lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize('by', ['module', 'package'])
+def test_grouped_aggregates(aggregation, by):
+    table = _table()
+    column, grouped = _reference(table, 'calls', by)
+    percentiles = table.grouped_percentiles('calls', (0, 25, 50, 90, 100), by=by)
+    top = table.grouped_top('calls', 2, by=by)
+    assert set(percentiles) == set(top) == set(grouped)
+    for name, rows in grouped.items():
+        ordered = sorted(column[r] for r in rows)
+        assert percentiles[name][0] == ordered[0]
+        assert percentiles[name][-1] == ordered[-1]
+        assert percentiles[name] == \
+            pytest.approx(_percentiles(ordered, (0, 25, 50, 90, 100)))
+        expected = sorted(rows, key=lambda r: -column[r])[:2]
+        assert top[name] == [(table.methods[r], column[r]) for r in expected]
+    # results are cached, and must not change when queried again
+    assert table.grouped_percentiles('calls', (0, 25, 50, 90, 100), by=by) == percentiles
+    assert table.grouped_top('calls', 2, by=by) == top
+
+
+def test_aggregates(aggregation):
+    table = _table()
+    column = table.column('calls')
+    ordered = sorted(column)
+    assert table.percentiles('calls', (0, 50, 99)) == \
+        pytest.approx(_percentiles(ordered, (0, 50, 99)))
+    expected = sorted(range(len(table)), key=lambda r: -column[r])[:5]
+    assert table.top('calls', 5) == [(table.methods[r], column[r]) for r in expected]
+    assert len(table.top('calls', 1000)) == len(table)
+    with pytest.raises(ValueError):
+        table.grouped_top('calls', by='function')
+
+
+def test_unavailable_values_are_ignored(aggregation):
+    # the control-flow metrics of methods without a CFG are -1
+    blocks = array('i', [3, -1, 5, -1])
+    table = MetricsTable(methods=('a.f', 'a.g', 'b.f', 'b.g'),
+                         modules=('a', 'b'),
+                         packages=('a', 'b'),
+                         module=array('i', [0, 0, 1, 1]),
+                         package=array('i', [0, 0, 1, 1]),
+                         columns={'blocks': blocks},
+                         rows={})
+    assert table.percentiles('blocks', (0, 100)) == (3, 5)
+    assert table.top('blocks') == [('b.f', 5), ('a.f', 3)]
+    assert table.grouped_top('blocks') == {'a': [('a.f', 3)], 'b': [('b.f', 5)]}
+    assert table.grouped_percentiles('blocks', (50,)) == {'a': (3,), 'b': (5,)}
+
+    empty = MetricsTable.for_program(Program.from_sources('3.6', {'__main__': ''}))
+    assert len(empty) == 0
+    with pytest.raises(ValueError, match='no values'):
+        empty.percentiles('blocks')
+
+
+def _percentiles(ordered, qs):
+    return tuple(metrics._percentile(ordered, q) for q in qs)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+import pytest
+
+from apodora.models import Program
+
+_NAMES = ('a', 'b', 'c', 'd', 'e')
+
+
+class _GatedExecutor(ThreadPoolExecutor):
+    """A thread pool that only lets the analysis of a module finish once
+    its gate has been opened, and that records every submission."""
+    def __init__(self, max_workers=len(_NAMES), opened=()):
+        super().__init__(max_workers=max_workers)
+        self.gates = {name: threading.Event() for name in _NAMES + ('bad',)}
+        self.futures = []
+        self.started = []
+        for name in opened:
+            self.open(name)
+
+    def open(self, *names):
+        for name in names:
+            self.gates[name].set()
+
+    def submit(self, fn, *args, **kwargs):
+        module = args[0]
+
+        def gated():
+            self.started.append(module.name)
+            self.gates[module.name].wait(10)
+            return fn(*args, **kwargs)
+
+        future = super().submit(gated)
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def program():
+    sources = {name: f'def {name}():\n    return 1\n' for name in _NAMES}
+    sources['bad'] = 'def broken(:\n'
+    return Program.from_sources('3.6', sources, main_module='a')
+
+
+def test_results_are_yielded_as_they_complete(program):
+    with _GatedExecutor() as executor:
+        analyses = program.iter_analyses(executor=executor, modules=['a', 'b', 'c'])
+        executor.open('c')
+        assert next(analyses).module.name == 'c'
+        executor.open('a')
+        assert next(analyses).module.name == 'a'
+        executor.open('b')
+        assert next(analyses).module.name == 'b'
+        assert list(analyses) == []
+
+
+def test_pending_analyses_are_bounded(program):
+    with _GatedExecutor(opened=_NAMES) as executor:
+        consumed = 0
+        for analysis in program.iter_analyses(executor=executor,
+                                              modules=_NAMES,
+                                              max_pending=2):
+            consumed += 1
+            assert len(executor.futures) - consumed < 2
+            assert analysis.error is None
+        assert consumed == len(_NAMES)
+
+
+@pytest.mark.parametrize('use_executor', [False, True])
+def test_failures_do_not_end_the_stream(program, use_executor):
+    with _GatedExecutor(opened=_NAMES + ('bad',)) as executor:
+        analyses = {a.module.name: a
+                    for a in program.iter_analyses(
+                        executor=executor if use_executor else None)}
+    assert sorted(analyses) == sorted(_NAMES + ('bad',))
+    assert isinstance(analyses['bad'].error, SyntaxError)
+    assert analyses['bad'].ast is None
+    assert all(analyses[name].error is None for name in _NAMES)
+    assert sorted(analyses['a'].methods) == ['a']
+
+
+def test_closing_cancels_pending_analyses(program):
+    with _GatedExecutor(max_workers=1, opened=['a']) as executor:
+        analyses = program.iter_analyses(executor=executor, modules=_NAMES)
+        assert next(analyses).module.name == 'a'
+        analyses.close()
+        # the analysis of b may already have started, but no others
+        assert all(f.cancelled() for f in executor.futures[2:])
+        executor.open(*_NAMES)
+    assert executor.started in (['a'], ['a', 'b'])
+
+
+def test_unknown_modules_are_rejected(program):
+    with pytest.raises(KeyError):
+        list(program.iter_analyses(modules=['missing']))
+    with pytest.raises(ValueError):
+        list(program.iter_analyses(passes=['missing']))
+
+
+def test_async_analyses(program):
+    async def collect(executor):
+        names = []
+        async for analysis in program.aiter_analyses(executor=executor,
+                                                     max_pending=2):
+            names.append(analysis.module.name)
+            assert len(executor.futures) - len(names) < 2
+        return names
+
+    with _GatedExecutor(opened=_NAMES + ('bad',)) as executor:
+        names = asyncio.run(collect(executor))
+    assert sorted(names) == sorted(_NAMES + ('bad',))
+
+
+def test_async_close_cancels_pending_analyses(program):
+    async def first(executor):
+        analyses = program.aiter_analyses(executor=executor, modules=_NAMES)
+        analysis = await analyses.__anext__()
+        await analyses.aclose()
+        return analysis
+
+    with _GatedExecutor(max_workers=1, opened=['a']) as executor:
+        assert asyncio.run(first(executor)).module.name == 'a'
+        executor.open(*_NAMES)
+    assert executor.started in (['a'], ['a', 'b'])
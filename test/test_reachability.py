@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import pytest
+
+from apodora.analysis import ReachabilityIndex
+from apodora.models import BasicBlock
+
+
+@pytest.mark.parametrize('closure_limit', [64, 0])
+@pytest.mark.parametrize('seed', range(50))
+def test_reaches_matches_descendants(random_cfgs, seed, closure_limit):
+    cfg = random_cfgs(seed)
+    index = ReachabilityIndex.build(cfg, closure_limit=closure_limit)
+    for source in cfg:
+        descendants = source.descendants()
+        assert index.reachable_from(source) == descendants
+        for target in cfg:
+            assert index.reaches(source, target) == (target in descendants)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_unreachable_blocks(random_cfgs, seed):
+    cfg = random_cfgs(seed)
+    reachable = cfg.entry.descendants()
+    assert cfg.unreachable_blocks() == frozenset(cfg) - reachable
+    for block in cfg:
+        assert cfg.reachability.is_reachable(block) == (block in reachable)
+
+
+def test_stale_index_is_rejected(random_cfgs):
+    cfg = random_cfgs(0)
+    index = cfg.reachability
+    cfg.add_edge(cfg.entry, cfg.entry)
+    assert index.is_stale
+    with pytest.raises(ValueError):
+        index.reaches(cfg.entry, cfg.entry)
+    assert not cfg.reachability.is_stale
+
+
+def _append(edges, block):
+    edges.append(block)
+
+
+def _extend(edges, block):
+    edges += [block]
+
+
+def _assign(edges, block):
+    edges[:] = [block]
+
+
+def _remove(edges, block):
+    del edges[:]
+
+
+@pytest.mark.parametrize('modify', [_append, _extend, _assign, _remove])
+def test_edges_cannot_be_modified_behind_the_graph(random_cfgs, modify):
+    cfg = random_cfgs(3)
+    before = [list(block.successors) for block in cfg]
+    index = cfg.reachability
+    with pytest.raises(TypeError):
+        modify(cfg.entry.successors, cfg.entry)
+    with pytest.raises(TypeError):
+        modify(cfg.entry.predecessors, cfg.entry)
+    with pytest.raises(TypeError):
+        cfg.entry.successors = [cfg.entry]
+    assert [list(block.successors) for block in cfg] == before
+    assert not index.is_stale
+
+
+def test_edges_of_added_blocks_are_read_only(random_cfgs):
+    cfg = random_cfgs(3)
+    block = BasicBlock(len(cfg))
+    block.successors.append(cfg.entry)
+    cfg.add_block(block)
+    with pytest.raises(TypeError):
+        block.successors.append(block)
+    cfg.add_edge(block, block)
+    cfg.remove_edge(block, cfg.entry)
+    assert block.successors == [block]
+    assert block.predecessors == [block]
+    assert pickle.loads(pickle.dumps(block.successors)) == [block]
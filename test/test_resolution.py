@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import textwrap
+
+import pytest
+
+from apodora.helpers.resolution import ModuleIndex
+from apodora.models import Program
+
+
+@pytest.fixture(params=['2.7', '3.6'])
+def program(request):
+    sources = {
+        '__main__': textwrap.dedent("""
+            from pkg import sub
+            from pkg import helper
+            import pkg.sub as alias
+            from pkg.sub import thing as other
+            import rospy.greg
+            from rospy import greg
+            """),
+        'pkg': textwrap.dedent("""
+            from . import sub
+            from .sub import thing
+            from .. import outside
+            from ...deep import name
+            """),
+        'pkg.sub': 'thing = 1\n',
+    }
+    return Program.from_sources(request.param, sources, packages=['pkg'])
+
+
+def _bindings(program, name):
+    module = program.modules[name]
+    return program.resolver.bindings(module)
+
+
+def test_submodule_and_attribute(program):
+    bindings = _bindings(program, '__main__')
+    sub = bindings['sub']
+    assert sub.name == 'pkg.sub'
+    assert sub.module is program.modules['pkg.sub']
+    assert sub.attribute is None
+
+    helper = bindings['helper']
+    assert helper.name == 'pkg.helper'
+    assert helper.module is program.modules['pkg']
+    assert helper.attribute == 'helper'
+
+
+def test_aliases(program):
+    bindings = _bindings(program, '__main__')
+    assert bindings['alias'].module is program.modules['pkg.sub']
+    other = bindings['other']
+    assert other.name == 'pkg.sub.thing'
+    assert other.module is program.modules['pkg.sub']
+    assert other.attribute == 'thing'
+    assert 'thing' not in bindings
+
+
+def test_relative_imports_from_package_init(program):
+    bindings = _bindings(program, 'pkg')
+    assert bindings['sub'].module is program.modules['pkg.sub']
+    assert bindings['sub'].attribute is None
+    assert bindings['thing'].module is program.modules['pkg.sub']
+    assert bindings['thing'].attribute == 'thing'
+
+
+def test_relative_imports_beyond_top_level_package(program):
+    bindings = _bindings(program, 'pkg')
+    outside = bindings['outside']
+    assert outside.name == '..outside'
+    assert outside.is_external
+    name = bindings['name']
+    assert name.name == '...deep.name'
+    assert name.is_external
+
+
+def test_external_names(program):
+    resolved = program.resolver.resolve(program.modules['__main__'])
+    by_name = {r.name: r for r in resolved}
+    assert by_name['rospy.greg'].is_external
+    assert by_name['rospy.greg'].attribute is None
+    assert _bindings(program, '__main__')['rospy'].is_external
+    assert _bindings(program, '__main__')['greg'].is_external
+    imported = program.resolver.imported_modules(program.modules['__main__'])
+    assert sorted(m.name for m in imported) == ['pkg', 'pkg.sub']
+
+
+def test_cache_is_invalidated_by_add_and_remove(program):
+    resolver = program.resolver
+    assert _bindings(program, '__main__')['helper'].attribute == 'helper'
+    assert _bindings(program, '__main__')['greg'].is_external
+
+    program.add_module(program.load_module('pkg.helper', 'x = 1\n'))
+    helper = _bindings(program, '__main__')['helper']
+    assert helper.module is program.modules['pkg.helper']
+    assert helper.attribute is None
+
+    program.add_module(program.load_module('rospy', '', is_package=True))
+    greg = _bindings(program, '__main__')['greg']
+    assert greg.module is program.modules['rospy']
+    assert greg.attribute == 'greg'
+
+    program.remove_module('pkg.helper')
+    helper = _bindings(program, '__main__')['helper']
+    assert helper.module is program.modules['pkg']
+    assert helper.attribute == 'helper'
+    assert program.resolver is resolver
+
+
+def test_index_prunes_removed_modules():
+    index = ModuleIndex()
+    program = Program.from_sources('3.6', {'__main__': '', 'a.b.c': ''})
+    index.add(program.modules['a.b.c'])
+    assert index.is_package('a.b')
+    assert index.find_longest_prefix('a.b.c.d') == (program.modules['a.b.c'], 3)
+    index.remove('a.b.c')
+    assert len(index) == 0
+    assert not index.is_package('a')
+    with pytest.raises(KeyError):
+        index.remove('a.b.c')
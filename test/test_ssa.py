@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import textwrap
+
+import pytest
+
+from apodora.analysis import SSAForm, build_ssa
+from apodora.analysis.ssa import ASSIGN, PARAM, PHI
+from apodora.models import Program
+
+_SCOPES = ('FunctionDef', 'AsyncFunctionDef', 'ClassDef', 'Lambda')
+
+
+def _build(source: str, python: str = '3.6'):
+    source = textwrap.dedent(source)
+    program = Program.from_sources(python, {'__main__': source})
+    method = next(iter(program.modules['__main__'].methods.values()))
+    ssa = SSAForm.build(method.cfg, method.ast, is_py2=program.is_py2)
+    return method.ast, ssa
+
+
+def _returned(function, ssa: SSAForm) -> int:
+    """Returns the definition that reaches the name returned by the last
+    statement of a function."""
+    statement = function.body[-1]
+    assert statement.__class__.__name__ == 'Return'
+    return ssa.reaching_definition(ssa.use_of_node(statement.value))
+
+
+def _operands(ssa: SSAForm, phi: int):
+    assert ssa.def_kind[phi] == PHI
+    return sorted(ssa.name(ssa.reaching_definition(use))
+                  for use in ssa.phi_operands(phi))
+
+
+def _names(node):
+    """Yields the names within a function body, outside of nested scopes."""
+    stack = list(node.body)
+    while stack:
+        node = stack.pop()
+        if node.__class__.__name__ == 'Name':
+            yield node
+        if node.__class__.__name__ in _SCOPES:
+            continue
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                stack += (v for v in value if hasattr(v, '_fields'))
+            elif hasattr(value, '_fields'):
+                stack.append(value)
+
+
+def test_while_body_is_renamed():
+    function, ssa = _build("""
+        def f(n):
+            y = 0
+            while n:
+                y = n
+                n = n - 1
+            return y
+        """)
+    kinds = {ssa.name(d): ssa.def_kind[d] for d in range(ssa.num_defs)}
+    assert sorted(k for k, kind in kinds.items() if kind == ASSIGN) == \
+        ['n.2', 'y.1', 'y.2']
+    assert [k for k, kind in kinds.items() if kind == PARAM] == ['n.1']
+
+    returned = _returned(function, ssa)
+    assert _operands(ssa, returned) == ['y.1', 'y.2']
+
+
+def test_while_else_and_break():
+    function, ssa = _build("""
+        def f(n):
+            while n:
+                if n > 3:
+                    break
+                n = n - 1
+            else:
+                n = -1
+            return n
+        """)
+    returned = _returned(function, ssa)
+    operands = [ssa.reaching_definition(u) for u in ssa.phi_operands(returned)]
+    kinds = sorted(ssa.def_kind[d] for d in operands)
+    # the value from the break, and the value assigned by the else clause
+    assert kinds == [ASSIGN, PHI]
+    header_phi = next(d for d in operands if ssa.def_kind[d] == PHI)
+    assert len(_operands(ssa, header_phi)) == 2
+
+
+@pytest.mark.parametrize('python', ['2.7', '3.6'])
+def test_every_name_is_renamed(python):
+    function, ssa = _build("""
+        def f(xs, n):
+            total = 0
+            while n:
+                for x in xs:
+                    if x:
+                        total = total + x
+                    else:
+                        break
+                with open(n) as handle:
+                    total = total + len(handle.read())
+                n = n - 1
+            return total
+        """, python)
+    for name in _names(function):
+        is_def = ssa.definition_of_node(name) is not None
+        is_use = ssa.use_of_node(name) is not None
+        assert is_def != is_use, name.id
+
+
+def test_def_use_chains_are_consistent():
+    _, ssa = _build("""
+        def f(a, b):
+            while a:
+                if b:
+                    a = a - b
+                else:
+                    b = b - a
+            return a + b
+        """)
+    for use in range(ssa.num_uses):
+        definition = ssa.reaching_definition(use)
+        if definition != -1:
+            assert use in ssa.uses_of(definition)
+            assert ssa.def_var[definition] == ssa.use_var[use]
+
+
+def test_for_loop_accumulator():
+    function, ssa = _build("""
+        def acc(xs):
+            total = 0
+            for x in xs:
+                total = total + x
+            return total
+        """)
+    returned = _returned(function, ssa)
+    assert ssa.def_kind[returned] == PHI
+    assert _operands(ssa, returned) == ['total.1', 'total.2']
+
+    # the use within the body reads the same phi at the loop header
+    loop = function.body[1]
+    body_use = ssa.use_of_node(loop.body[0].value.left)
+    assert ssa.reaching_definition(body_use) == returned
+    # the iterable is read once, before the loop
+    iter_use = ssa.use_of_node(loop.iter)
+    assert ssa.def_kind[ssa.reaching_definition(iter_use)] == PARAM
+
+
+def test_continue_returns_to_header():
+    function, ssa = _build("""
+        def f(xs):
+            y = 0
+            for x in xs:
+                if x:
+                    y = x
+                    continue
+                y = -x
+            return y
+        """)
+    # the header merges the value before the loop, the value at the
+    # continue, and the value at the end of the body
+    returned = _returned(function, ssa)
+    assert _operands(ssa, returned) == ['y.1', 'y.2', 'y.3']
+
+
+def test_with_body_is_in_enclosing_flow():
+    function, ssa = _build("""
+        def f(path, flag):
+            y = 0
+            with open(path) as handle:
+                if flag:
+                    y = handle.read()
+            return y
+        """)
+    returned = _returned(function, ssa)
+    assert _operands(ssa, returned) == ['y.1', 'y.2']
+    handle = function.body[1].items[0].optional_vars
+    assert ssa.definition_of_node(handle) is not None
+
+
+@pytest.mark.parametrize('python', ['2.7', '3.6'])
+def test_try_is_not_supported(python):
+    source = """
+        def f(n):
+            try:
+                n = n - 1
+            except ValueError:
+                n = 0
+            return n
+        """
+    with pytest.raises(NotImplementedError):
+        _build(source, python)
+
+    program = Program.from_sources(python, {'__main__': textwrap.dedent(source)})
+    methods = list(program.modules['__main__'].methods.values())
+    assert build_ssa(methods) == {}
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import textwrap
+
+import pytest
+
+from apodora.analysis import Summaries, SummaryAnalysis, SummaryCache
+from apodora.models import Program
+
+_SOURCE = """
+    import rospy
+
+    def leaf():
+        return rospy.get_param('~rate')
+
+    def middle():
+        return leaf()
+
+    def top():
+        return middle()
+
+    def unrelated():
+        return rospy.get_param('~name')
+    """
+
+
+class _ExternalCalls(SummaryAnalysis):
+    """Summarises each method by the external objects that it may call,
+    directly or through its callees."""
+    def __init__(self):
+        self.summarised = 0
+
+    @property
+    def name(self):
+        return 'external-calls'
+
+    def initial(self, method):
+        return frozenset()
+
+    def summarise(self, method, calls):
+        self.summarised += 1
+        names = set()
+        for call, summary in calls:
+            if summary is None:
+                names.add(call.name)
+            else:
+                names |= summary
+        return frozenset(names)
+
+
+class _Diverging(_ExternalCalls):
+    """Produces a different summary each time a method is summarised."""
+    def initial(self, method):
+        return 0
+
+    def summarise(self, method, calls):
+        self.summarised += 1
+        return self.summarised
+
+
+def _program(source=_SOURCE, **kwargs):
+    return Program.from_sources('3.6', {'m': textwrap.dedent(source)},
+                                main_module='m', **kwargs)
+
+
+def _keys(summaries):
+    return {method.qual_name: key
+            for (method, _), key in zip(summaries.items(), summaries.keys)}
+
+
+def _by_name(summaries):
+    return {method.qual_name: summary for method, summary in summaries.items()}
+
+
+def test_changed_callee_rekeys_transitive_callers():
+    cache = SummaryCache()
+    before = Summaries.compute(_program(), _ExternalCalls(), cache=cache)
+    assert _by_name(before)['top'] == {'rospy.get_param'}
+
+    changed = _SOURCE.replace("rospy.get_param('~rate')", "rospy.sleep(1)")
+    after = Summaries.compute(_program(changed), _ExternalCalls(), cache=cache)
+    old_keys, new_keys = _keys(before), _keys(after)
+    for name in ('leaf', 'middle', 'top'):
+        assert old_keys[name] != new_keys[name], name
+    assert old_keys['unrelated'] == new_keys['unrelated']
+    assert after.computed == 3
+    assert after.reused == 1
+    assert _by_name(after)['top'] == {'rospy.sleep'}
+
+
+def test_recursive_component_reaches_fixed_point():
+    source = """
+        def even(n):
+            if n:
+                return odd(n - 1)
+            return found_even()
+
+        def odd(n):
+            if n:
+                return even(n - 1)
+            return found_odd()
+        """
+    analysis = _ExternalCalls()
+    summaries = _by_name(Summaries.compute(_program(source), analysis))
+    assert summaries['even'] == summaries['odd'] == {'found_even', 'found_odd'}
+    # the first round sees only the initial summary of the other method
+    assert analysis.summarised > 2
+
+    with pytest.raises(RuntimeError, match='did not converge'):
+        Summaries.compute(_program(source), _Diverging())
+
+
+def test_reloaded_cache_is_reused(tmp_path):
+    filename = str(tmp_path / 'summaries.cache')
+    cache = SummaryCache.load(filename)
+    first = Summaries.compute(_program(), _ExternalCalls(), cache=cache)
+    assert first.computed == 4
+    cache.save()
+
+    analysis = _ExternalCalls()
+    second = Summaries.compute(_program(), analysis,
+                               cache=SummaryCache.load(filename))
+    assert second.computed == 0
+    assert second.reused == 4
+    assert analysis.summarised == 0
+    assert _by_name(second) == _by_name(first)
+
+
+def test_corrupt_cache_is_rejected(tmp_path):
+    filename = tmp_path / 'summaries.cache'
+    filename.write_bytes(b'not a pickle')
+    with pytest.raises(ValueError):
+        SummaryCache.load(str(filename))
+
+
+def test_parser_is_part_of_key():
+    cache = SummaryCache()
+    typed = Summaries.compute(_program(), _ExternalCalls(), cache=cache)
+    stdlib = Summaries.compute(_program(stdlib_ast=True), _ExternalCalls(),
+                               cache=cache)
+    assert set(typed.keys).isdisjoint(stdlib.keys)
+    assert stdlib.computed == 4
+    assert _by_name(stdlib) == _by_name(typed)